@@ -30,18 +30,26 @@ def create_app(testing=False):
     
     if not testing:
         # Import services and routes after config is loaded
-        from services.db_service import init_db, create_indexes
+        from services.db_service import init_db
+        from services.index_service import reconcile_indexes
+        from services.catalog_service import load_catalog
+        from services.contest_catalog_service import load_contests
         from routes import register_routes
         from routes.problems import register_problem_routes
         from routes.contests import register_contest_routes
         from routes.sessions import register_session_routes
         from routes.user_stats import register_user_stats_routes
         from routes.user_progress import register_user_progress_routes
+        from routes.bundles import register_bundle_routes
+        from routes.admin import register_admin_routes
+        from routes.assets import register_asset_routes
     
         # Initialize database
         try:
             init_db()
-            create_indexes()
+            reconcile_indexes()
+            load_catalog()
+            load_contests()
             print("Database initialization successful")
         except Exception as e:
             print(f"ERROR: Database initialization failed: {e}")
@@ -55,6 +63,9 @@ def create_app(testing=False):
         register_session_routes(app)
         register_user_stats_routes(app)
         register_user_progress_routes(app)
+        register_bundle_routes(app)
+        register_admin_routes(app)
+        register_asset_routes(app)
         
         # Register maintenance routes if in development mode
         if os.environ.get('FLASK_ENV') == 'development':
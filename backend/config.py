@@ -31,11 +31,32 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'dev-secret-key-change-in-production')
     JWT_EXPIRATION_HOURS = int(os.environ.get('JWT_EXPIRATION_HOURS', 24))
     
+    # Password hashing pool (bcrypt runs in these processes, not on request threads)
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+    # Hashes running or queued before logins are turned away with 503
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 32))
+    
+    # Asset storage backend: 's3' or 'local' (see services/storage_backends.py)
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 's3')
+    LOCAL_STORAGE_ROOT = os.environ.get('LOCAL_STORAGE_ROOT', os.path.join(os.path.dirname(__file__), 'storage'))
+    # Where the API serves locally stored assets (routes/assets.py)
+    LOCAL_STORAGE_URL_PREFIX = os.environ.get('LOCAL_STORAGE_URL_PREFIX', '/api/assets/files')
+    
     # AWS S3
     S3_BUCKET_NAME = os.environ.get('S3_BUCKET_NAME', 'goaime-users')
     AWS_ACCESS_KEY_ID = os.environ.get('AWS_ACCESS_KEY_ID')
     AWS_SECRET_ACCESS_KEY = os.environ.get('AWS_SECRET_ACCESS_KEY')
     AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
+    # S3-compatible endpoint (e.g. a local MinIO); unset for AWS
+    S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL')
+    # Connections kept open by the shared S3 client (upload threads and request threads share them)
+    S3_MAX_POOL_CONNECTIONS = int(os.environ.get('S3_MAX_POOL_CONNECTIONS', 32))
+    # Uploads larger than this are sent as multipart uploads of S3_MULTIPART_CHUNKSIZE_MB parts
+    S3_MULTIPART_THRESHOLD_MB = int(os.environ.get('S3_MULTIPART_THRESHOLD_MB', 8))
+    S3_MULTIPART_CHUNKSIZE_MB = int(os.environ.get('S3_MULTIPART_CHUNKSIZE_MB', 8))
+    # Largest asset a client may upload directly, and how long its presigned upload stays valid
+    ASSET_MAX_UPLOAD_MB = int(os.environ.get('ASSET_MAX_UPLOAD_MB', 20))
+    ASSET_UPLOAD_EXPIRES_SECONDS = int(os.environ.get('ASSET_UPLOAD_EXPIRES_SECONDS', 600))
     
     # API settings
     PAGE_SIZE = int(os.environ.get('PAGE_SIZE', 20))
@@ -43,11 +64,13 @@ class Config:
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'local')
     
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     MONGODB_DB = 'goaime_test'
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'local')
     
 class ProductionConfig(Config):
     """Production configuration"""
@@ -8,6 +8,9 @@ Usage:
 Examples:
     python manage.py session standardize
     python manage.py diagnostic db_state
+    python manage.py grading worker
+    python manage.py users import students.csv
+    python manage.py storage gc
     python manage.py help
 """
 
@@ -49,6 +52,23 @@ def setup_session_parser(subparsers):
         help='Username to fix stats for (if omitted, fixes all users)'
     )
 
+    # Migrate dates command
+    migrate_dates_parser = session_subparsers.add_parser(
+        'migrate_dates', 
+        help='Convert session created_at/completed_at strings to dates (resumable)'
+    )
+    migrate_dates_parser.add_argument(
+        '--batch-size', 
+        type=int,
+        default=1000,
+        help='Sessions per batch'
+    )
+    migrate_dates_parser.add_argument(
+        '--restart', 
+        action='store_true',
+        help='Ignore the checkpoint and start from the first session'
+    )
+
 def setup_diagnostic_parser(subparsers):
     """Set up the parser for diagnostic commands"""
     diag_parser = subparsers.add_parser(
@@ -75,6 +95,76 @@ def setup_diagnostic_parser(subparsers):
         help='Check detailed stats for a specific user'
     )
     user_stats_parser.add_argument('username', help='Username to check stats for')
+    
+    # Index usage command
+    indexes_parser = diag_subparsers.add_parser(
+        'indexes', 
+        help='Report index usage and drift from the declared indexes'
+    )
+    indexes_parser.add_argument(
+        '--build', 
+        action='store_true',
+        help='Build missing declared indexes first'
+    )
+
+def setup_users_parser(subparsers):
+    """Set up the parser for user commands"""
+    users_parser = subparsers.add_parser(
+        'users', 
+        help='Commands for managing user accounts'
+    )
+    users_subparsers = users_parser.add_subparsers(dest='users_command')
+    
+    # Import command
+    import_parser = users_subparsers.add_parser(
+        'import', 
+        help='Bulk import users from CSV (username,email,password[,role]) or JSONL'
+    )
+    import_parser.add_argument('path', help='CSV or JSONL file to import')
+    import_parser.add_argument('--format', choices=['csv', 'jsonl'], help='Input format (default: from file extension)')
+    import_parser.add_argument('--role', choices=['user', 'admin'], default='user', help='Role for rows without one')
+    import_parser.add_argument('--batch-size', type=int, default=500, help='Users hashed and inserted per batch')
+    import_parser.add_argument('--workers', type=int, help='Password hashing processes (default: all CPUs)')
+    import_parser.add_argument('--report', help='Write per-row results to this CSV file')
+
+def setup_grading_parser(subparsers):
+    """Set up the parser for grading commands"""
+    grading_parser = subparsers.add_parser(
+        'grading', 
+        help='Commands for grading contest submissions'
+    )
+    grading_subparsers = grading_parser.add_subparsers(dest='grading_command')
+    
+    # Worker command
+    worker_parser = grading_subparsers.add_parser(
+        'worker', 
+        help='Run a grading worker (start several processes to scale out)'
+    )
+    worker_parser.add_argument('--batch-size', type=int, default=100, help='Submissions claimed per batch')
+    worker_parser.add_argument('--lease-seconds', type=int, default=60, help='Lease duration for claimed submissions')
+    worker_parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to wait when the queue is empty')
+    worker_parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+    
+    # Status command
+    grading_subparsers.add_parser(
+        'status', 
+        help='Show grading queue depth, throughput and lag'
+    )
+
+def setup_storage_parser(subparsers):
+    """Set up the parser for storage commands"""
+    storage_parser = subparsers.add_parser(
+        'storage', 
+        help='Commands for asset storage'
+    )
+    storage_subparsers = storage_parser.add_subparsers(dest='storage_command')
+    
+    # Garbage collection command
+    gc_parser = storage_subparsers.add_parser(
+        'gc', 
+        help='Delete stored blobs that no asset references'
+    )
+    gc_parser.add_argument('--grace-hours', type=float, default=24, help='Keep blobs unreferenced for less than this')
 
 def main():
     """Main entry point for the CLI"""
@@ -84,6 +174,9 @@ def main():
     # Set up command parsers
     setup_session_parser(subparsers)
     setup_diagnostic_parser(subparsers)
+    setup_grading_parser(subparsers)
+    setup_users_parser(subparsers)
+    setup_storage_parser(subparsers)
     
     # Add help command
     subparsers.add_parser('help', help='Show this help message')
@@ -101,7 +194,8 @@ def main():
         from management.commands.session_commands import (
             standardize_session_modes,
             check_user_sessions,
-            fix_user_stats
+            fix_user_stats,
+            migrate_session_dates
         )
         
         if args.session_command == 'standardize':
@@ -110,6 +204,8 @@ def main():
             check_user_sessions(args.username)
         elif args.session_command == 'fix_stats':
             fix_user_stats(args.username)
+        elif args.session_command == 'migrate_dates':
+            migrate_session_dates(args.batch_size, args.restart)
         else:
             parser.parse_args(['session', '--help'])
             
@@ -117,7 +213,8 @@ def main():
         from management.commands.diagnostic_commands import (
             debug_peer_metrics,
             debug_database_state,
-            check_user_stats
+            check_user_stats,
+            check_index_usage
         )
         
         if args.diag_command == 'peer_metrics':
@@ -126,8 +223,46 @@ def main():
             debug_database_state()
         elif args.diag_command == 'user_stats':
             check_user_stats(args.username)
+        elif args.diag_command == 'indexes':
+            check_index_usage(args.build)
         else:
             parser.parse_args(['diagnostic', '--help'])
+            
+    elif args.command == 'grading':
+        from management.commands.grading_commands import (
+            run_grading_worker,
+            show_grading_status
+        )
+        
+        if args.grading_command == 'worker':
+            run_grading_worker(args.batch_size, args.lease_seconds, args.poll_interval, args.once)
+        elif args.grading_command == 'status':
+            show_grading_status()
+        else:
+            parser.parse_args(['grading', '--help'])
+            
+    elif args.command == 'users':
+        from management.commands.user_commands import import_users
+        
+        if args.users_command == 'import':
+            import_users(
+                args.path,
+                file_format=args.format,
+                default_role=args.role,
+                batch_size=args.batch_size,
+                workers=args.workers,
+                report_path=args.report
+            )
+        else:
+            parser.parse_args(['users', '--help'])
+            
+    elif args.command == 'storage':
+        from management.commands.storage_commands import collect_blobs
+        
+        if args.storage_command == 'gc':
+            collect_blobs(args.grace_hours)
+        else:
+            parser.parse_args(['storage', '--help'])
 
 if __name__ == '__main__':
     main()
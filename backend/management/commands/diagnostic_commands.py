@@ -262,6 +262,40 @@ def check_user_stats(username):
     
     return result
 
+def check_index_usage(build_missing=False):
+    """
+    Report index usage from $indexStats and drift from the declared indexes.
+    
+    Args:
+        build_missing (bool): Build missing declared indexes before reporting
+        
+    Returns:
+        dict: Usage report per collection
+    """
+    from services.index_service import reconcile_indexes, diff_indexes, get_index_report
+    
+    plan = reconcile_indexes(background=False) if build_missing else diff_indexes()
+    report = get_index_report()
+    
+    print(f"Index Usage ({datetime.now().isoformat()})")
+    print("=============================================")
+    for collection, entries in report.items():
+        print(f"\n{collection}:")
+        for entry in entries:
+            flag = "" if entry["declared"] else "  [undeclared]"
+            print(f"  {entry['ops']:>10} ops  {entry['name']}{flag}")
+        
+        changes = plan.get(collection)
+        if changes and changes["missing"] and not build_missing:
+            for index in changes["missing"]:
+                print(f"  {'missing':>14}  {dict(index['keys'])}")
+        if changes:
+            for _, name in changes["conflicting"]:
+                print(f"  {'conflicting':>14}  {name} (options differ from the declaration)")
+    
+    print("\nUndeclared indexes with 0 ops are candidates for dropping; counters reset on server restart.")
+    return report
+
 if __name__ == "__main__":
     # This section allows running the commands directly
     import sys
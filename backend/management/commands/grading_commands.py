@@ -0,0 +1,66 @@
+"""
+Contest submission grading commands.
+
+This module contains commands for:
+- Running a grading worker (start several for more throughput)
+- Reporting on the grading queue
+"""
+
+import signal
+import threading
+from services.grading_service import run_worker, get_queue_metrics
+from utils.logging_utils import log_event
+
+def run_grading_worker(batch_size, lease_seconds, poll_interval, once=False):
+    """
+    Run a grading worker in the foreground until interrupted
+
+    Args:
+        batch_size (int): Submissions claimed per batch
+        lease_seconds (int): Lease duration for claimed submissions
+        poll_interval (float): Seconds to wait when the queue is empty
+        once (bool): Drain the queue once and exit
+
+    Returns:
+        dict: Worker metrics at shutdown
+    """
+    stop_event = threading.Event()
+    # Finish the current batch on Ctrl-C / SIGTERM instead of abandoning its leases
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop_event.set())
+
+    print(f"Grading worker started (batch size {batch_size}, lease {lease_seconds}s)"
+          f"{'; draining queue once' if once else '; press Ctrl-C to stop'}")
+
+    metrics = run_worker(
+        batch_size=batch_size,
+        lease_seconds=lease_seconds,
+        poll_interval=poll_interval,
+        stop_event=stop_event,
+        once=once
+    )
+
+    print(f"Graded {metrics['graded']} submissions ({metrics['errors']} errors) in {metrics['batches']} batches")
+    return metrics
+
+def show_grading_status():
+    """
+    Print the grading queue depth, lag and recent throughput
+
+    Returns:
+        dict: Queue metrics
+    """
+    metrics = get_queue_metrics()
+
+    print("Grading Queue")
+    print("=============")
+    print(f"Pending:               {metrics['pending']}")
+    print(f"In progress:           {metrics['in_progress']}")
+    print(f"Oldest pending (s):    {metrics['oldest_pending_seconds']}")
+    print(f"Graded (last {metrics['window_seconds']}s):   {metrics['graded_in_window']}")
+    print(f"Throughput (/s):       {metrics['submissions_per_second']}")
+    print(f"Average lag (s):       {metrics['average_lag_seconds']}")
+    print(f"Max lag (s):           {metrics['max_lag_seconds']}")
+
+    log_event('admin.grading_status', metrics)
+    return metrics
@@ -5,11 +5,14 @@ This module contains commands for:
 - Standardizing session modes (contest -> competition)
 - Fixing session-related database issues
 - Analyzing and reporting on session data
+- Migrating session date fields to native dates
 """
 
 import os
 from datetime import datetime
+from pymongo import UpdateOne
 from services.db_service import get_db
+from utils.date_utils import to_utc_datetime
 from utils.logging_utils import log_event, log_exception
 
 def standardize_session_modes():
@@ -162,6 +165,106 @@ def fix_user_stats(username=None):
         print(f"Error fixing user stats: {str(e)}")
         return {"error": str(e), "users_processed": results["users_processed"]}
 
+# Session date fields converted by migrate_session_dates
+SESSION_DATE_FIELDS = ("created_at", "completed_at")
+# Checkpoint document in the migrations collection
+SESSION_DATES_MIGRATION = "session_dates"
+
+def migrate_session_dates(batch_size=1000, restart=False):
+    """
+    Convert session date fields stored as ISO strings to native BSON dates.
+    
+    Sessions are processed in _id order, one batch per bulk_write, and the last
+    processed _id is checkpointed in the migrations collection after every
+    batch, so an interrupted run resumes where it stopped. Each update is
+    conditional on the field still holding the string that was read, so it
+    never overwrites a concurrent change. Unparseable values are left as they
+    are and reported.
+    
+    Args:
+        batch_size (int): Sessions read and written per batch
+        restart (bool): Ignore the checkpoint and start from the beginning
+        
+    Returns:
+        dict: Sessions scanned, fields converted, unparseable values and batches
+    """
+    db = get_db()
+    
+    checkpoint = None if restart else db.migrations.find_one({"_id": SESSION_DATES_MIGRATION})
+    last_id = checkpoint.get("last_id") if checkpoint else None
+    results = {"scanned": 0, "converted": 0, "unparseable": 0, "batches": 0}
+    
+    if last_id:
+        print(f"Resuming session date migration after {last_id}")
+    else:
+        print("Starting session date migration...")
+    
+    string_query = {"$or": [{field: {"$type": "string"}} for field in SESSION_DATE_FIELDS]}
+    
+    try:
+        while True:
+            query = dict(string_query)
+            if last_id:
+                query["_id"] = {"$gt": last_id}
+            
+            batch = list(
+                db.sessions.find(query, {field: 1 for field in SESSION_DATE_FIELDS})
+                .sort("_id", 1)
+                .limit(batch_size)
+            )
+            if not batch:
+                break
+            
+            operations = []
+            for session in batch:
+                update = {}
+                condition = {"_id": session["_id"]}
+                for field in SESSION_DATE_FIELDS:
+                    value = session.get(field)
+                    if not isinstance(value, str):
+                        continue
+                    converted = to_utc_datetime(value)
+                    if converted is None:
+                        results["unparseable"] += 1
+                        print(f"  Could not parse {field}={value!r} on session {session['_id']}")
+                        continue
+                    update[field] = converted
+                    condition[field] = value
+                
+                if update:
+                    operations.append(UpdateOne(condition, {"$set": update}))
+            
+            if operations:
+                result = db.sessions.bulk_write(operations, ordered=False)
+                results["converted"] += result.modified_count
+            
+            last_id = batch[-1]["_id"]
+            results["scanned"] += len(batch)
+            results["batches"] += 1
+            db.migrations.update_one(
+                {"_id": SESSION_DATES_MIGRATION},
+                {"$set": {"last_id": last_id, "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+            print(f"  Batch {results['batches']}: {results['scanned']} sessions scanned, {results['converted']} converted")
+        
+        db.migrations.update_one(
+            {"_id": SESSION_DATES_MIGRATION},
+            {"$set": {"completed_at": datetime.utcnow(), **results}},
+            upsert=True
+        )
+    except Exception as e:
+        log_exception(e, {"migration": SESSION_DATES_MIGRATION, "last_id": str(last_id)})
+        print(f"Migration interrupted: {str(e)}. Run it again to resume from the last checkpoint.")
+        return {**results, "error": str(e)}
+    
+    print(f"Session date migration complete: {results['converted']} sessions converted, "
+          f"{results['unparseable']} unparseable values left unchanged")
+    
+    log_event('admin.migrate_session_dates', results)
+    
+    return results
+
 
 if __name__ == "__main__":
     # This section allows running the commands directly
@@ -0,0 +1,24 @@
+"""
+Asset storage commands.
+
+This module contains commands for:
+- Deleting content-addressed blobs no asset references any more
+"""
+
+from datetime import timedelta
+from services.storage_service import collect_unreferenced_blobs
+
+def collect_blobs(grace_hours=24):
+    """
+    Delete blobs that have had no references for longer than the grace period
+
+    Args:
+        grace_hours (float): Hours a blob must have been unreferenced
+
+    Returns:
+        int: Number of blobs deleted
+    """
+    print(f"Deleting blobs unreferenced for more than {grace_hours} hours...")
+    deleted = collect_unreferenced_blobs(timedelta(hours=grace_hours))
+    print(f"Deleted {deleted} blobs")
+    return deleted
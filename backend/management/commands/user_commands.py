@@ -0,0 +1,221 @@
+"""
+User management commands.
+
+This module contains commands for:
+- Bulk importing users from CSV or JSONL (e.g. onboarding a school)
+"""
+
+import csv
+import json
+import os
+import time
+from pymongo.errors import BulkWriteError
+from models.user import User
+from services.db_service import get_db
+from services.index_service import ensure_indexes
+from services.password_service import bulk_hasher
+from utils.validators import is_valid_email, is_valid_username, is_strong_password
+from utils.logging_utils import log_event, log_exception
+
+IMPORT_ROLES = ('user', 'admin')
+DUPLICATE_KEY_ERROR = 11000
+
+def _read_rows(path, file_format):
+    """Yield (row_number, record) from a CSV (with header) or JSONL file"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if file_format == 'csv':
+            # Row 1 is the header
+            for row_number, record in enumerate(csv.DictReader(f), start=2):
+                yield row_number, record
+        else:
+            for row_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield row_number, {'_error': f"Invalid JSON: {e.msg}"}
+                    continue
+                if not isinstance(record, dict):
+                    yield row_number, {'_error': "Line is not a JSON object"}
+                    continue
+                yield row_number, record
+
+def _validate(record, default_role, seen_emails, seen_usernames):
+    """Normalize a record, returning (user fields, None) or (None, error message)"""
+    if record.get('_error'):
+        return None, record['_error']
+
+    for field in ('username', 'email', 'password', 'role'):
+        if record.get(field) is not None and not isinstance(record[field], str):
+            return None, f"{field} must be a string"
+
+    username = (record.get('username') or '').strip()
+    email = (record.get('email') or '').lower().strip()
+    password = record.get('password') or ''
+    role = (record.get('role') or default_role).strip()
+
+    if not is_valid_username(username):
+        return None, "Username must be 3-30 characters and contain only letters, numbers, and underscores"
+    if not is_valid_email(email):
+        return None, "Invalid email format"
+    if not is_strong_password(password):
+        return None, "Password must be at least 8 characters and contain uppercase, lowercase, and numbers"
+    if role not in IMPORT_ROLES:
+        return None, f"Invalid role: {role}"
+    if email in seen_emails:
+        return None, "Email appears earlier in the file"
+    if username in seen_usernames:
+        return None, "Username appears earlier in the file"
+
+    seen_emails.add(email)
+    seen_usernames.add(username)
+    return {'username': username, 'email': email, 'password': password, 'role': role}, None
+
+def _duplicate_message(error):
+    key = error.get('keyPattern') or error.get('keyValue') or {}
+    if 'email' in key or 'email' in error.get('errmsg', ''):
+        return "Email already registered"
+    if 'username' in key or 'username' in error.get('errmsg', ''):
+        return "Username already taken"
+    return "Duplicate user"
+
+def _insert_batch(db, batch, hash_many, results):
+    """Hash and insert one batch; duplicates are left to the unique email/username indexes"""
+    hashes = hash_many([fields['password'] for _, fields in batch])
+    documents = [
+        User(username=fields['username'], email=fields['email'], password=hashed, role=fields['role'])
+        .to_dict(include_password=True)
+        for (_, fields), hashed in zip(batch, hashes)
+    ]
+
+    failed = {}
+    try:
+        db.users.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        for error in e.details.get('writeErrors', []):
+            if error.get('code') == DUPLICATE_KEY_ERROR:
+                failed[error['index']] = ('duplicate', _duplicate_message(error))
+            else:
+                failed[error['index']] = ('error', error.get('errmsg', 'Insert failed'))
+
+    created = 0
+    for index, ((row_number, fields), document) in enumerate(zip(batch, documents)):
+        status, message = failed.get(index, ('created', None))
+        created += status == 'created'
+        results.append({
+            'row': row_number,
+            'username': fields['username'],
+            'email': fields['email'],
+            'status': status,
+            'user_id': str(document['_id']) if status == 'created' else None,
+            'message': message
+        })
+    return created
+
+def _write_report(path, results):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['row', 'username', 'email', 'status', 'user_id', 'message'])
+        writer.writeheader()
+        writer.writerows(results)
+
+def import_users(path, file_format=None, default_role='user', batch_size=500, workers=None, report_path=None):
+    """
+    Import users from a CSV (header: username,email,password[,role]) or JSONL file.
+
+    Rows are validated up front, passwords are hashed on a process pool, and
+    users are inserted with unordered insert_many batches. Existing emails and
+    usernames are rejected by the unique indexes, so no per-row lookups are
+    made and re-running an import only creates the rows that failed before.
+    The indexes are checked (and built if missing) before anything is
+    imported; without them the import is aborted.
+
+    Args:
+        path (str): Input file
+        file_format (str): 'csv' or 'jsonl' (inferred from the extension if omitted)
+        default_role (str): Role for rows without one
+        batch_size (int): Users hashed and inserted per batch
+        workers (int): Hashing processes (defaults to every CPU)
+        report_path (str): Write per-row results to this CSV file (optional)
+
+    Returns:
+        dict: Counts per status, elapsed seconds, users per second and per-row results,
+            or None if the unique indexes are missing and could not be built
+    """
+    file_format = file_format or ('jsonl' if path.lower().endswith(('.jsonl', '.ndjson')) else 'csv')
+
+    try:
+        ensure_indexes('users')
+    except Exception as e:
+        log_exception(e, {'path': path})
+        print(f"Import aborted: the unique email/username indexes are missing ({str(e)}). "
+              f"Nothing was imported.")
+        return None
+
+    print(f"Importing users from {path} ({file_format}, batches of {batch_size})...")
+
+    db = get_db()
+    results = []
+    seen_emails, seen_usernames = set(), set()
+    created = 0
+    batch = []
+    started = time.monotonic()
+
+    try:
+        with bulk_hasher(workers) as hash_many:
+            for row_number, record in _read_rows(path, file_format):
+                fields, error = _validate(record, default_role, seen_emails, seen_usernames)
+                if error:
+                    results.append({
+                        'row': row_number,
+                        'username': record.get('username'),
+                        'email': record.get('email'),
+                        'status': 'invalid',
+                        'user_id': None,
+                        'message': error
+                    })
+                    continue
+
+                batch.append((row_number, fields))
+                if len(batch) >= batch_size:
+                    created += _insert_batch(db, batch, hash_many, results)
+                    batch = []
+                    elapsed = time.monotonic() - started
+                    print(f"  {created} users created ({created / elapsed:.1f} users/sec)")
+
+            if batch:
+                created += _insert_batch(db, batch, hash_many, results)
+    except Exception as e:
+        log_exception(e, {'path': path})
+        print(f"Import stopped: {str(e)}. Users created so far are kept; re-run to import the rest.")
+
+    elapsed = time.monotonic() - started
+    results.sort(key=lambda result: result['row'])
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+
+    for result in results:
+        if result['status'] != 'created':
+            print(f"  Row {result['row']}: {result['status']} - {result['message']}")
+
+    summary = {
+        'rows': len(results),
+        'created': counts.get('created', 0),
+        'duplicate': counts.get('duplicate', 0),
+        'invalid': counts.get('invalid', 0),
+        'error': counts.get('error', 0),
+        'elapsed_seconds': round(elapsed, 2),
+        'users_per_second': round(created / elapsed, 1) if elapsed > 0 else None
+    }
+    print(f"Imported {summary['created']} of {summary['rows']} users in {summary['elapsed_seconds']}s "
+          f"({summary['users_per_second']} users/sec); {summary['duplicate']} duplicates, "
+          f"{summary['invalid']} invalid, {summary['error']} errors")
+
+    if report_path:
+        _write_report(report_path, results)
+        print(f"Per-row results written to {os.path.abspath(report_path)}")
+
+    log_event('admin.import_users', {'path': path, **summary})
+
+    return {**summary, 'results': results}
@@ -0,0 +1,124 @@
+"""
+Slotted model base with generated converters.
+
+Models declare their fields once; from_dict, to_dict and to_json are generated
+from that declaration as straight-line code (one dict literal, conversions
+inlined), the same way dataclasses generate __init__. Instances use __slots__
+instead of a per-instance __dict__.
+"""
+
+# Field kinds and how to_json converts them
+ID = 'id'             # ObjectId -> str
+ID_LIST = 'id_list'   # list of ObjectId -> list of str
+DATETIME = 'datetime' # datetime -> ISO 8601 string
+
+
+class Field:
+    """
+    Declaration of a model field
+
+    Args:
+        name (str): Attribute name on the instance
+        key (str): Document key (defaults to name)
+        arg (str): Constructor keyword (defaults to name)
+        kind (str): ID, ID_LIST or DATETIME for to_json conversion (optional)
+        default: Value from_dict uses when the key is missing; must be immutable
+        private (bool): Left out of to_json, and of to_dict unless include_private
+    """
+
+    __slots__ = ('name', 'key', 'arg', 'kind', 'default', 'private')
+
+    def __init__(self, name, key=None, arg=None, kind=None, default=None, private=False):
+        self.name = name
+        self.key = key or name
+        self.arg = arg or name
+        self.kind = kind
+        self.default = default
+        self.private = private
+
+
+def _json_expression(field):
+    value = f"self.{field.name}"
+    if field.kind == ID:
+        return f"(str({value}) if {value} is not None else None)"
+    if field.kind == ID_LIST:
+        return f"[str(p) for p in {value}]"
+    if field.kind == DATETIME:
+        return f"({value}.isoformat() if {value} else None)"
+    return value
+
+
+def _compile(name, source, namespace):
+    exec(source, namespace)
+    return namespace[name]
+
+
+class Model:
+    """
+    Base class for slotted models; subclasses set __slots__ and fields
+
+    private_flag names to_dict's keyword for including private fields.
+    """
+
+    __slots__ = ()
+    fields = ()
+    private_flag = 'include_private'
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.fields:
+            cls._generate_converters()
+
+    @classmethod
+    def _generate_converters(cls):
+        namespace = {}
+        public = [f for f in cls.fields if not f.private]
+        private = [f for f in cls.fields if f.private]
+
+        # from_dict: a single constructor call with every argument mapped
+        arguments = []
+        for i, field in enumerate(cls.fields):
+            if field.default is None:
+                arguments.append(f"{field.arg}=get({field.key!r})")
+            elif isinstance(field.default, (bool, int, float, str)):
+                arguments.append(f"{field.arg}=get({field.key!r}, {field.default!r})")
+            else:
+                namespace[f"_default_{i}"] = field.default
+                arguments.append(f"{field.arg}=get({field.key!r}, _default_{i})")
+        from_dict = _compile('from_dict', (
+            "def from_dict(cls, data):\n"
+            "    if data is None:\n"
+            "        return None\n"
+            "    get = data.get\n"
+            f"    return cls({', '.join(arguments)})\n"
+        ), namespace)
+
+        # to_dict: one dict literal, private fields added on request
+        flag = cls.private_flag
+        lines = [
+            f"def to_dict(self, {flag}=False):\n",
+            "    result = {" + ", ".join(f"{f.key!r}: self.{f.name}" for f in public) + "}\n"
+        ]
+        for field in private:
+            lines.append(f"    if {flag} and self.{field.name}:\n")
+            lines.append(f"        result[{field.key!r}] = self.{field.name}\n")
+        lines.append("    return result\n")
+        to_dict = _compile('to_dict', ''.join(lines), namespace)
+
+        # to_json: one dict literal with conversions inlined
+        to_json = _compile('to_json', (
+            "def to_json(self):\n"
+            "    return {" + ", ".join(f"{f.key!r}: {_json_expression(f)}" for f in public) + "}\n"
+        ), namespace)
+
+        cls.from_dict = classmethod(from_dict)
+        cls._fields_to_dict = to_dict
+        cls._fields_to_json = to_json
+        # Classes may wrap the generated converters with their own signatures
+        if 'to_dict' not in cls.__dict__:
+            cls.to_dict = to_dict
+        if 'to_json' not in cls.__dict__:
+            cls.to_json = to_json
+
+    def __repr__(self):
+        return f"{type(self).__name__}(_id={getattr(self, '_id', None)!r})"
@@ -1,9 +1,37 @@
 from datetime import datetime
 from bson import ObjectId
+from models.base import Model, Field, ID, DATETIME
 
-class Problem:
+class Problem(Model):
     """Problem model representing a coding challenge"""
 
+    __slots__ = (
+        '_id', 'title', 'description', 'difficulty', 'year', 'contest', 'problem_number',
+        'solution', 'similar_questions', 'category', 'content', 'test_cases', 'created_by',
+        'published', 'created_at', 'updated_at'
+    )
+
+    # Stored documents use problem_statement / detailed_solution; the API uses
+    # description / solution, so to_dict is written by hand below
+    fields = (
+        Field('_id', kind=ID),
+        Field('title'),
+        Field('description', key='problem_statement'),
+        Field('difficulty'),
+        Field('year'),
+        Field('contest'),
+        Field('problem_number'),
+        Field('solution', key='detailed_solution', arg='detailed_solution'),
+        Field('similar_questions'),
+        Field('category'),
+        Field('content'),
+        Field('test_cases'),
+        Field('created_by', kind=ID),
+        Field('published', default=False),
+        Field('created_at', kind=DATETIME),
+        Field('updated_at', kind=DATETIME)
+    )
+
     def __init__(
         self,
         # existing args…
@@ -47,29 +75,6 @@ class Problem:
         self.created_at = created_at or datetime.utcnow()
         self.updated_at = updated_at or datetime.utcnow()
 
-    @classmethod
-    def from_dict(cls, data):
-        if data is None:
-            return None
-        return cls(
-            _id=data.get('_id'),
-            title=data.get('title'),
-            description=data.get('problem_statement'),
-            difficulty=data.get('difficulty'),
-            year=data.get('year'),
-            contest=data.get('contest'),
-            problem_number=data.get('problem_number'),
-            detailed_solution=data.get('detailed_solution'),
-            similar_questions=data.get('similar_questions', []),
-            category=data.get('category'),
-            content=data.get('content'),
-            test_cases=data.get('test_cases', []),
-            created_by=data.get('created_by'),
-            published=data.get('published', False),
-            created_at=data.get('created_at'),
-            updated_at=data.get('updated_at'),
-        )
-
     def to_dict(self, include_solution=False):
         result = {
             "_id": str(self._id),
@@ -97,4 +102,8 @@ class Problem:
         }
         if include_solution and self.solution:
             result["solution"] = self.solution
-        return result
\ No newline at end of file
+        return result
+
+    def to_json(self):
+        """API representation (the same as to_dict)"""
+        return self.to_dict()
@@ -1,9 +1,27 @@
 from datetime import datetime
 from bson import ObjectId
+from models.base import Model, Field, ID, DATETIME
 
-class Submission:
+class Submission(Model):
     """Submission model representing a user's solution to a problem"""
     
+    __slots__ = (
+        '_id', 'user_id', 'problem_id', 'solution', 'status', 'results',
+        'contest_id', 'submitted_at', 'execution_time'
+    )
+    
+    fields = (
+        Field('_id', kind=ID),
+        Field('user_id', kind=ID),
+        Field('problem_id', kind=ID),
+        Field('solution'),
+        Field('status', default='pending'),
+        Field('results'),
+        Field('contest_id', kind=ID),
+        Field('submitted_at', kind=DATETIME),
+        Field('execution_time')
+    )
+    
     def __init__(
         self,
         user_id,
@@ -25,52 +43,3 @@ class Submission:
         self.contest_id = contest_id
         self.submitted_at = submitted_at or datetime.utcnow()
         self.execution_time = execution_time
-    
-    @classmethod
-    def from_dict(cls, data):
-        """Create a Submission instance from a dictionary"""
-        if data is None:
-            return None
-            
-        return cls(
-            _id=data.get('_id'),
-            user_id=data.get('user_id'),
-            problem_id=data.get('problem_id'),
-            solution=data.get('solution'),
-            status=data.get('status', 'pending'),
-            results=data.get('results', {}),
-            contest_id=data.get('contest_id'),
-            submitted_at=data.get('submitted_at'),
-            execution_time=data.get('execution_time')
-        )
-    
-    def to_dict(self):
-        """Convert Submission to dictionary"""
-        return {
-            "_id": self._id,
-            "user_id": self.user_id,
-            "problem_id": self.problem_id,
-            "solution": self.solution,
-            "status": self.status,
-            "results": self.results,
-            "contest_id": self.contest_id,
-            "submitted_at": self.submitted_at,
-            "execution_time": self.execution_time
-        }
-    
-    def to_json(self):
-        """Convert Submission to JSON-serializable dict (for API responses)"""
-        result = self.to_dict()
-        
-        # Convert ObjectId to string
-        result["_id"] = str(result["_id"])
-        result["user_id"] = str(result["user_id"])
-        result["problem_id"] = str(result["problem_id"])
-        if result.get("contest_id"):
-            result["contest_id"] = str(result["contest_id"])
-        
-        # Convert datetime objects to ISO format strings
-        if result["submitted_at"]:
-            result["submitted_at"] = result["submitted_at"].isoformat()
-            
-        return result
\ No newline at end of file
@@ -1,9 +1,24 @@
 from datetime import datetime
 from bson import ObjectId
+from models.base import Model, Field, ID, DATETIME
 
-class User:
+class User(Model):
     """User model for authentication and profile information"""
     
+    __slots__ = ('_id', 'username', 'email', 'password', 'role', 'created_at', 'last_login')
+    
+    private_flag = 'include_password'
+    
+    fields = (
+        Field('_id', kind=ID),
+        Field('username'),
+        Field('email'),
+        Field('role', default='user'),
+        Field('created_at', kind=DATETIME),
+        Field('last_login', kind=DATETIME),
+        Field('password', private=True)  # Stored as hashed value
+    )
+    
     def __init__(
         self, 
         username, 
@@ -21,48 +36,3 @@ class User:
         self.role = role
         self.created_at = created_at or datetime.utcnow()
         self.last_login = last_login
-    
-    @classmethod
-    def from_dict(cls, data):
-        """Create a User instance from a dictionary"""
-        if data is None:
-            return None
-            
-        return cls(
-            _id=data.get('_id'),
-            username=data.get('username'),
-            email=data.get('email'),
-            password=data.get('password'),
-            role=data.get('role', 'user'),
-            created_at=data.get('created_at'),
-            last_login=data.get('last_login')
-        )
-    
-    def to_dict(self, include_password=False):
-        """Convert User to dictionary, optionally excluding password"""
-        result = {
-            "_id": self._id,
-            "username": self.username,
-            "email": self.email,
-            "role": self.role,
-            "created_at": self.created_at,
-            "last_login": self.last_login
-        }
-        
-        if include_password and self.password:
-            result["password"] = self.password
-            
-        return result
-    
-    def to_json(self):
-        """Convert User to JSON-serializable dict (for API responses)"""
-        result = self.to_dict(include_password=False)
-        result["_id"] = str(result["_id"])
-        
-        # Convert datetime objects to ISO format strings
-        if result["created_at"]:
-            result["created_at"] = result["created_at"].isoformat()
-        if result["last_login"]:
-            result["last_login"] = result["last_login"].isoformat()
-            
-        return result
\ No newline at end of file
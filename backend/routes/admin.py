@@ -0,0 +1,59 @@
+from flask import request
+from services.auth_service import admin_required
+from services.user_service import update_user_role
+from services.grading_service import get_queue_metrics, get_worker_metrics
+from services.index_service import diff_indexes, get_index_report
+from services.password_service import get_hasher_metrics
+from services.write_buffer_service import get_buffer_metrics
+from utils.response_utils import success_response, error_response
+
+def register_admin_routes(app):
+    """Register routes for operational metrics"""
+
+    @app.route('/api/admin/grading/metrics', methods=['GET'])
+    @admin_required
+    def grading_metrics():
+        """Get grading queue depth, throughput and lag"""
+        return success_response({
+            # Across all worker processes, from the submissions collection
+            'queue': get_queue_metrics(),
+            # Workers running inside this API process, if any
+            'workers': get_worker_metrics()
+        })
+
+    @app.route('/api/admin/password-hashing/metrics', methods=['GET'])
+    @admin_required
+    def password_hashing_metrics():
+        """Get password hashing pool size, queue depth and rejections"""
+        return success_response(get_hasher_metrics())
+
+    @app.route('/api/admin/write-buffer/metrics', methods=['GET'])
+    @admin_required
+    def write_buffer_metrics():
+        """Get write-behind buffer depth and flush statistics"""
+        return success_response(get_buffer_metrics())
+
+    @app.route('/api/admin/indexes', methods=['GET'])
+    @admin_required
+    def index_report():
+        """Get index usage and any drift from the declared indexes"""
+        drift = {
+            collection: {
+                'missing': [dict(index['keys']) for index in changes['missing']],
+                'conflicting': [name for _, name in changes['conflicting']],
+                'undeclared': changes['undeclared']
+            }
+            for collection, changes in diff_indexes().items()
+        }
+        return success_response({'usage': get_index_report(), 'drift': drift})
+
+    @app.route('/api/admin/users/<user_id>/role', methods=['PUT'])
+    @admin_required
+    def set_user_role(user_id):
+        """Change a user's role"""
+        data = request.get_json() or {}
+        success, message = update_user_role(user_id, data.get('role'))
+        if not success:
+            return error_response(message, 404 if message == "User not found" else 400)
+        
+        return success_response(message=message)
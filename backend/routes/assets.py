@@ -0,0 +1,81 @@
+from flask import request
+from services.auth_service import login_required
+from services.storage_service import (
+    ASSET_CONTENT_TYPES,
+    UPLOAD_FAILED_MESSAGE,
+    upload_asset,
+    start_direct_upload,
+    complete_direct_upload,
+    serve_object
+)
+from utils.response_utils import success_response, error_response
+
+def register_asset_routes(app):
+    """Register routes for user asset uploads and locally stored files"""
+
+    @app.route('/api/assets', methods=['POST'])
+    @login_required
+    def upload_user_asset():
+        """
+        Upload an asset through the API (multipart form: file, type, name)
+
+        Works with every storage backend; with S3 prefer the direct upload below.
+        """
+        file = request.files.get('file')
+        asset_type = request.form.get('type')
+        asset_name = request.form.get('name')
+
+        if not file or not file.filename:
+            return error_response("No file selected", 400)
+        if asset_type not in ASSET_CONTENT_TYPES or not asset_name:
+            return error_response("type must be 'image' or 'sound' and name is required", 400)
+
+        success, message, asset = upload_asset(request.user_id, file, asset_type, asset_name)
+        if not success:
+            return error_response(message, 500 if message == UPLOAD_FAILED_MESSAGE else 400)
+
+        return success_response(asset, message, 201)
+
+    @app.route('/api/assets/uploads', methods=['POST'])
+    @login_required
+    def start_asset_upload():
+        """
+        Start a direct-to-storage asset upload
+
+        Body: filename, type ('image' or 'sound'), name (slot, e.g. 'correct'),
+        size (bytes) and content_hash (hex SHA-256). The response holds either
+        the stored asset (identical content already exists) or a presigned POST
+        to send the file to, followed by POST .../<upload_id>/complete.
+        """
+        data = request.get_json() or {}
+        success, message, result = start_direct_upload(
+            request.user_id,
+            data.get('filename'),
+            data.get('type'),
+            data.get('name'),
+            data.get('size'),
+            data.get('content_hash')
+        )
+        if not success:
+            return error_response(message, 400)
+
+        return success_response(result, message, 200 if 'asset' in result else 201)
+
+    @app.route('/api/assets/uploads/<upload_id>/complete', methods=['POST'])
+    @login_required
+    def complete_asset_upload(upload_id):
+        """Record the asset once the client has uploaded the file"""
+        success, message, asset = complete_direct_upload(request.user_id, upload_id)
+        if not success:
+            return error_response(message, 404 if message == "Upload not found" else 400)
+
+        return success_response(asset, message, 201)
+
+    @app.route('/api/assets/files/<path:key>', methods=['GET'])
+    def get_asset_file(key):
+        """Serve a stored asset (supports Range and conditional requests)"""
+        response = serve_object(key)
+        if response is None:
+            return error_response("Asset not found", 404)
+
+        return response
@@ -0,0 +1,58 @@
+from flask import request, Response
+from services.bundle_service import get_contest_bundle
+from utils.response_utils import success_response, error_response
+
+# Versioned bundle URLs never change content, so they can be cached forever
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+def register_bundle_routes(app):
+    """Register routes for precompressed contest bundles"""
+
+    @app.route('/api/bundles/contests/<contest_id>', methods=['GET'])
+    def get_contest_bundle_manifest(contest_id):
+        """Get the current version of a contest bundle"""
+        bundle = get_contest_bundle(contest_id)
+        if not bundle:
+            return error_response("Contest bundle not found", 404)
+
+        response, status_code = success_response({
+            'contest_id': contest_id,
+            'version': bundle['version'],
+            'problem_count': bundle['problem_count'],
+            'url': f"/api/bundles/contests/{contest_id}/{bundle['version']}"
+        })
+        # The manifest points at the current version, so it must be revalidated
+        response.headers['Cache-Control'] = 'no-cache'
+        return response, status_code
+
+    @app.route('/api/bundles/contests/<contest_id>/<version>', methods=['GET'])
+    def get_contest_bundle_version(contest_id, version):
+        """Serve a precompressed contest bundle by content version"""
+        bundle = get_contest_bundle(contest_id)
+        if not bundle or bundle['version'] != version:
+            return error_response("Contest bundle version not found", 404)
+
+        accepted = request.accept_encodings
+        if bundle['br'] is not None and accepted['br']:
+            encoding = 'br'
+        elif accepted['gzip']:
+            encoding = 'gzip'
+        else:
+            encoding = 'identity'
+
+        # Each encoding is its own representation and gets its own strong ETag
+        etags = {name: f'{version}-{name}' for name in ('identity', 'gzip', 'br')}
+        headers = {
+            'Cache-Control': IMMUTABLE_CACHE_CONTROL,
+            'ETag': f'"{etags[encoding]}"',
+            'Vary': 'Accept-Encoding'
+        }
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+
+        # Every encoding decodes to the same bundle, so any of them is a match
+        if any(etag in request.if_none_match for etag in etags.values()):
+            return Response(status=304, headers=headers)
+
+        # A Content-Encoding header also tells Flask-Compress to leave the body alone
+        return Response(bundle[encoding], mimetype='application/json', headers=headers)
@@ -1,36 +1,46 @@
-from flask import request, jsonify
-from services.contest_service import get_all_contests, get_contest_by_id, create_new_contest, update_contest_by_id
+from flask import request, jsonify, Response
+from services.contest_service import get_contest_by_id, create_new_contest, update_contest_by_id
 from services.contest_service import delete_contest_by_id, register_user_for_contest, submit_contest_solution
+from services.contest_catalog_service import list_published_contests, CONTEST_STATUSES
+from services.leaderboard_service import get_board, get_leaderboard, stream_leaderboard, DEFAULT_TOP_K
 from services.auth_service import login_required, admin_required
+from utils.validators import parse_field_list
 from datetime import datetime
 
+# Upper bound on ?k= for leaderboard reads
+MAX_LEADERBOARD_ENTRIES = 500
+
+# Contest fields that can be requested with ?fields=
+CONTEST_FIELDS = (
+    '_id', 'title', 'description', 'start_time', 'end_time', 'problems',
+    'created_by', 'published', 'registration_end', 'created_at', 'updated_at'
+)
+
 def register_contest_routes(app):
     """Register routes for contest management"""
     
     @app.route('/api/contests', methods=['GET'])
     def list_contests():
         """Get all contests with optional filtering"""
-        filters = {}
-        
-        # Filter by status (upcoming, active, completed)
+        # Filter by status (upcoming, active, completed), computed from the in-memory catalog
         status = request.args.get('status')
-        if status:
-            now = datetime.now()
-            if status == 'upcoming':
-                filters['start_time'] = {'$gt': now}
-            elif status == 'active':
-                filters['start_time'] = {'$lte': now}
-                filters['end_time'] = {'$gte': now}
-            elif status == 'completed':
-                filters['end_time'] = {'$lt': now}
-        
-        contests = get_all_contests(filters)
+        if status not in CONTEST_STATUSES:
+            status = None
+        
+        # Sparse fieldsets: ?fields=title,start_time,end_time
+        fields, invalid = parse_field_list(request.args.get('fields'), CONTEST_FIELDS)
+        if invalid:
+            return jsonify({"error": f"Unknown contest fields: {', '.join(invalid)}"}), 400
+        contests = list_published_contests(status, fields=fields)
         return jsonify({"contests": contests})
     
     @app.route('/api/contests/<contest_id>', methods=['GET'])
     def get_contest(contest_id):
         """Get a specific contest by ID"""
-        contest = get_contest_by_id(contest_id)
+        fields, invalid = parse_field_list(request.args.get('fields'), CONTEST_FIELDS)
+        if invalid:
+            return jsonify({"error": f"Unknown contest fields: {', '.join(invalid)}"}), 400
+        contest = get_contest_by_id(contest_id, fields=fields)
         if not contest:
             return jsonify({"error": "Contest not found"}), 404
         
@@ -118,4 +128,40 @@ def register_contest_routes(app):
         return jsonify({
             "message": message,
             "submission_id": submission_id
-        })
\ No newline at end of file
+        })
+    
+    @app.route('/api/contests/<contest_id>/leaderboard', methods=['GET'])
+    def get_contest_leaderboard(contest_id):
+        """Get the top of a contest leaderboard, optionally with one user's rank"""
+        try:
+            k = min(max(int(request.args.get('k', DEFAULT_TOP_K)), 1), MAX_LEADERBOARD_ENTRIES)
+        except ValueError:
+            return jsonify({"error": "k must be an integer"}), 400
+        
+        leaderboard = get_leaderboard(contest_id, k=k, user_id=request.args.get('user_id'))
+        if leaderboard is None:
+            return jsonify({"error": "Contest not found"}), 404
+        
+        return jsonify(leaderboard)
+    
+    @app.route('/api/contests/<contest_id>/leaderboard/stream', methods=['GET'])
+    def stream_contest_leaderboard(contest_id):
+        """
+        Follow a contest leaderboard as server-sent events
+
+        Each open stream holds a server thread; serve this endpoint with an
+        async worker class (see leaderboard_service).
+        """
+        if get_board(contest_id) is None:
+            return jsonify({"error": "Contest not found"}), 404
+        
+        stream = stream_leaderboard(contest_id, user_id=request.args.get('user_id'))
+        if stream is None:
+            return jsonify({"error": "Too many leaderboard streams, retry later"}), 503
+        
+        # Not wrapped in stream_with_context: the server must close the stream itself to free its slot
+        response = Response(stream, mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        # Stop reverse proxies (nginx) from buffering the stream
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
@@ -1,17 +1,34 @@
 from flask import request, session
 from services.db_service import get_db  # Import the function that provides MongoDB access
-from services.problem_service import get_all_problems, get_problem_by_id, create_new_problem, update_problem_by_id, delete_problem_by_id
+from services.problem_service import get_all_problems, get_problems_after, count_problems, get_problem_by_id, create_new_problem, update_problem_by_id, delete_problem_by_id
 from services.auth_service import login_required, admin_required
-from utils.validators import validate_required_fields, is_valid_object_id
-from utils.response_utils import success_response, error_response, paginated_response
+from services import catalog_service
+from services.practice_session_service import create_session_token, decode_session_token, advance_session
+from services.search_service import search_problems
+from services.similarity_service import get_similar_problems
+from services.problem_json_cache import get_problem_json
+from utils.validators import validate_required_fields, is_valid_object_id, parse_field_list
+from utils.response_utils import success_response, error_response, paginated_response, cursor_paginated_response, raw_json_response
 from utils.logging_utils import log_event, log_exception
 from utils.response_utils import success_response, error_response
 from utils.logging_utils import log_exception
+from pymongo import ReturnDocument
 import random  # For random.choice()
 import uuid
 from datetime import datetime, timedelta # Add datetime for TTL
 import logging
 
+# Fields withheld when a client asks for a problem set without answers
+ANSWER_FIELDS = ('correct_answer', 'solution')
+
+# Problem fields that can be requested with ?fields=
+PROBLEM_FIELDS = (
+    '_id', 'title', 'description', 'problem_statement', 'problem_text', 'difficulty',
+    'category', 'topics', 'year', 'contest', 'contest_id', 'problem_number', 'content',
+    'test_cases', 'similar_questions', 'detailed_solution', 'solution', 'correct_answer',
+    'created_by', 'published', 'created_at', 'updated_at'
+)
+
 def register_problem_routes(app):
     """Register routes for problem management"""
     
@@ -35,6 +52,10 @@ def register_problem_routes(app):
             category = request.args.get('category')
             contest_id = request.args.get('contest_id')
             problem_number = request.args.get('problem_number')
+            # Sparse fieldsets: ?fields=problem_number,difficulty,topics for list views
+            fields, invalid = parse_field_list(request.args.get('fields'), PROBLEM_FIELDS)
+            if invalid:
+                return error_response(f"Unknown problem fields: {', '.join(invalid)}", 400)
             
             filters = {}
             if difficulty:
@@ -53,11 +74,32 @@ def register_problem_routes(app):
                 
             logging.info(f"Filters constructed: {filters}")
             
+            # Keyset pagination: pass ?cursor= (empty for the first page) or ?pagination=cursor
+            if 'cursor' in request.args or request.args.get('pagination') == 'cursor':
+                try:
+                    problems, next_cursor = get_problems_after(
+                        filters=filters,
+                        cursor=request.args.get('cursor'),
+                        per_page=per_page,
+                        fields=fields
+                    )
+                except ValueError:
+                    return error_response("Invalid cursor", 400)
+                
+                total = None
+                if request.args.get('include_total', 'false').lower() == 'true':
+                    total = count_problems(filters)
+                
+                return success_response(
+                    cursor_paginated_response(problems, next_cursor, per_page, total)
+                )
+            
             # Get paginated problems from problems_regularized
             problems, total = get_all_problems(
                 filters=filters,
                 page=page,
-                per_page=per_page
+                per_page=per_page,
+                fields=fields
             )
             
             return success_response(
@@ -134,6 +176,31 @@ def register_problem_routes(app):
             log_exception(e)
             return error_response(f"Error retrieving random problem: {str(e)}", 500)
     
+    @app.route('/api/problems/search', methods=['GET'])
+    def search():
+        """Ranked full-text search over the problem catalog with topic and difficulty facets"""
+        try:
+            query = request.args.get('q', '').strip()
+            if not query:
+                return error_response("Search query (q) is required", 400)
+            
+            limit = min(int(request.args.get('limit', 20)), 100)
+            offset = max(int(request.args.get('offset', 0)), 0)
+            
+            results = search_problems(
+                query,
+                topic=request.args.get('topic'),
+                difficulty=request.args.get('difficulty'),
+                limit=limit,
+                offset=offset
+            )
+            return success_response(results)
+        except ValueError:
+            return error_response("limit and offset must be integers", 400)
+        except Exception as e:
+            log_exception(e, {'query': request.args.get('q')})
+            return error_response("Failed to search problems", 500)
+    
     # MOVED DOWN: Now this generic route won't capture /api/problems/random
     @app.route('/api/problems/<problem_id>', methods=['GET'])
     def get_problem(problem_id):
@@ -141,8 +208,17 @@ def register_problem_routes(app):
             return error_response("Invalid problem ID format", 400)
         
         try:
-            # Fetch problem by ID from problems_regularized
-            problem = get_problem_by_id(problem_id, collection_name="problems_regularized")
+            fields, invalid = parse_field_list(request.args.get('fields'), PROBLEM_FIELDS)
+            if invalid:
+                return error_response(f"Unknown problem fields: {', '.join(invalid)}", 400)
+            if not fields:
+                # Full documents are served from pre-serialized bytes
+                body = get_problem_json(problem_id)
+                if body is None:
+                    return error_response("Problem not found", 404)
+                return raw_json_response(body)
+            
+            problem = get_problem_by_id(problem_id, fields=fields)
             if not problem:
                 return error_response("Problem not found", 404)
             
@@ -151,6 +227,23 @@ def register_problem_routes(app):
             log_exception(e, {'problem_id': problem_id})
             return error_response("Failed to retrieve problem", 500)
     
+    @app.route('/api/problems/<problem_id>/similar', methods=['GET'])
+    def get_similar(problem_id):
+        """Get the catalog problems closest to a problem by TF-IDF similarity"""
+        try:
+            k = min(max(int(request.args.get('k', 5)), 1), 20)
+            
+            similar = get_similar_problems(problem_id, k=k)
+            if similar is None:
+                return error_response("Problem not found", 404)
+            
+            return success_response({'problem_id': problem_id, 'similar': similar})
+        except ValueError:
+            return error_response("k must be an integer", 400)
+        except Exception as e:
+            log_exception(e, {'problem_id': problem_id})
+            return error_response("Failed to retrieve similar problems", 500)
+    
     @app.route('/api/problems', methods=['POST'])
     @admin_required
     def create_problem():
@@ -193,6 +286,18 @@ def register_problem_routes(app):
             shuffle = data.get('shuffle', False)
             contest = data.get('contest')
             year = data.get('year')
+            # Optionally return the whole ordered problem set so a timed test
+            # does not need one /api/problems/next round trip per question
+            include_problems = data.get('include_problems', False)
+            include_answers = data.get('include_answers', True)
+            
+            if data.get('stateless'):
+                return _initialize_stateless_session(contest, year, shuffle, include_problems, include_answers)
+            
+            # Problem numbers are only unique within one contest; without a filter
+            # the set would mix contests and return the whole collection
+            if include_problems and not (contest and year):
+                return error_response("include_problems requires contest and year", 400)
             
             db = get_db()
             
@@ -201,8 +306,17 @@ def register_problem_routes(app):
                 contest_prefix = contest.replace(' ', '')
                 query['contest_id'] = f"{contest_prefix}_{year}"
             
-            problems_cursor = db.problems.find(query, {"problem_number": 1, "_id": 0}) # Fetch only problem_number
-            problem_numbers = [str(p.get('problem_number')) for p in problems_cursor if p.get('problem_number') is not None]
+            if include_problems:
+                projection = None if include_answers else {field: 0 for field in ANSWER_FIELDS}
+                problems_by_number = {
+                    str(p['problem_number']): p
+                    for p in db.problems.find(query, projection)
+                    if p.get('problem_number') is not None
+                }
+                problem_numbers = list(problems_by_number)
+            else:
+                problems_cursor = db.problems.find(query, {"problem_number": 1, "_id": 0}) # Fetch only problem_number
+                problem_numbers = [str(p.get('problem_number')) for p in problems_cursor if p.get('problem_number') is not None]
             
             if not problem_numbers:
                 return error_response("No problems found for the specified criteria", 404)
@@ -228,68 +342,146 @@ def register_problem_routes(app):
                 upsert=True
             )
             
-            return success_response({
+            response_data = {
                 'session_id': session_id, 
                 'total_problems': len(problem_numbers),
                 'shuffle': shuffle
-            })
+            }
+            
+            if include_problems:
+                problems = []
+                for problem_number in problem_numbers:
+                    problem = problems_by_number[problem_number]
+                    problem['_id'] = str(problem['_id'])
+                    problems.append(problem)
+                response_data['problems'] = problems
+            
+            return success_response(response_data)
             
         except Exception as e:
             log_exception(e)
             return error_response(f"Error initializing session: {str(e)}", 500)
 
+    def _initialize_stateless_session(contest, year, shuffle, include_problems, include_answers):
+        """Start a session whose state lives in a signed token instead of problem_sessions"""
+        if not contest or not year:
+            return error_response("Stateless sessions require contest and year", 400)
+        
+        session_token, problem_numbers = create_session_token(contest, year, shuffle)
+        if not session_token:
+            return error_response("No problems found for the specified criteria", 404)
+        
+        response_data = {
+            'session_token': session_token,
+            'total_problems': len(problem_numbers),
+            'shuffle': shuffle
+        }
+        
+        if include_problems:
+            contest_id = f"{contest.replace(' ', '')}_{year}"
+            problems = []
+            for problem_number in problem_numbers:
+                problem = catalog_service.get_contest_problem(contest_id, problem_number)
+                if not include_answers:
+                    for field in ANSWER_FIELDS:
+                        problem.pop(field, None)
+                problems.append(problem)
+            response_data['problems'] = problems
+        
+        return success_response(response_data)
+    
+    def _next_stateless_problem(session_token):
+        """Resolve the next problem of a stateless session without touching the database"""
+        state = decode_session_token(session_token)
+        if not state:
+            return error_response("Invalid or expired session", 400)
+        
+        problem, session_progress, next_token = advance_session(state)
+        if session_progress is None:
+            return error_response("End of problem set reached", 404)
+        if not problem:
+            log_event('problem.next.not_found', {'session_index': state['i'], 'contest': state['c'], 'year': state['y']})
+            return error_response("Problem not found for session's criteria", 404)
+        
+        problem['session_progress'] = session_progress
+        problem['session_token'] = next_token
+        
+        return success_response(problem)
+
     @app.route('/api/problems/next', methods=['GET'])
     def get_next_problem():
         """Get the next problem in the session order"""
         try:
+            session_token = request.args.get('session_token')
+            if session_token:
+                return _next_stateless_problem(session_token)
+            
             session_id = request.args.get('session_id')
             if not session_id:
                 return error_response("Session ID is required", 400)
+            
+            # Clients that loaded the whole set at session start only record progress
+            record_only = request.args.get('record_only', 'false').lower() == 'true'
                 
             db = get_db()
             
-            # NEW LOGIC: Fetch session from 'problem_sessions' collection
-            session_doc = db.problem_sessions.find_one({'_id': session_id})
+            # Advance atomically: one round trip, and concurrent clicks each get
+            # their own index instead of reading the same one
+            session_doc = db.problem_sessions.find_one_and_update(
+                {
+                    '_id': session_id,
+                    '$expr': {'$lt': ['$current_index', {'$size': '$problem_numbers'}]}
+                },
+                {
+                    '$inc': {'current_index': 1},
+                    '$set': {'last_updated_at': datetime.utcnow()}
+                },
+                return_document=ReturnDocument.AFTER
+            )
             
             if not session_doc:
+                # Only reached on the error path: tell a finished set from a missing session
+                if db.problem_sessions.count_documents({'_id': session_id}, limit=1):
+                    return error_response("End of problem set reached", 404)
                 return error_response("Invalid or expired session", 400) # Or 404
                 
             problem_numbers = session_doc['problem_numbers']
-            current_index = session_doc['current_index']
-            
-            if current_index >= len(problem_numbers):
-                return error_response("End of problem set reached", 404)
-                
+            current_index = session_doc['current_index'] - 1
             problem_number_str = problem_numbers[current_index]
             
-            # Increment the index and update last_updated_at for the session
-            db.problem_sessions.update_one(
-                {'_id': session_id},
-                {'$set': {'current_index': current_index + 1, 'last_updated_at': datetime.utcnow()}}
-            )
-            
-            # Get the problem details
-            problem_query = {
-                'problem_number': int(problem_number_str) if problem_number_str.isdigit() else problem_number_str
+            session_progress = {
+                'current': current_index + 1, # User-facing index is 1-based
+                'total': len(problem_numbers),
+                'remaining': len(problem_numbers) - (current_index + 1)
             }
+            
+            if record_only:
+                return success_response({
+                    'problem_number': problem_number_str,
+                    'session_progress': session_progress
+                })
+            
+            # Resolve the problem from the in-memory catalog
+            contest_id = None
             if session_doc.get('contest') and session_doc.get('year'):
                 contest_prefix = session_doc['contest'].replace(' ', '')
-                problem_query['contest_id'] = f"{contest_prefix}_{session_doc['year']}"
+                contest_id = f"{contest_prefix}_{session_doc['year']}"
             
-            problem = db.problems.find_one(problem_query)
+            problem_number = int(problem_number_str) if problem_number_str.isdigit() else problem_number_str
+            if contest_id:
+                problem = catalog_service.get_contest_problem(contest_id, problem_number_str)
+            else:
+                # Sessions without a contest span the whole collection; fall back to a query
+                problem = db.problems.find_one({'problem_number': problem_number})
+                if problem:
+                    problem['_id'] = str(problem['_id'])
             
             if not problem:
                  # This case should ideally not happen if problem_numbers are sourced correctly
-                log_event('problem.next.not_found', {'session_id': session_id, 'problem_number_str': problem_number_str, 'query': problem_query})
+                log_event('problem.next.not_found', {'session_id': session_id, 'problem_number_str': problem_number_str, 'contest_id': contest_id})
                 return error_response(f"Problem {problem_number_str} not found for session's criteria", 404)
-                
-            problem['_id'] = str(problem['_id'])
             
-            problem['session_progress'] = {
-                'current': current_index + 1, # User-facing index is 1-based
-                'total': len(problem_numbers),
-                'remaining': len(problem_numbers) - (current_index + 1)
-            }
+            problem['session_progress'] = session_progress
             
             return success_response(problem)
             
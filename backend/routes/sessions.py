@@ -1,8 +1,9 @@
 from flask import request, session
 from services.user_service import authenticate_user, get_user_by_id, create_user
 from services.auth_service import generate_token, verify_token, login_required
+from services.password_service import PasswordHasherBusy
 from utils.validators import validate_required_fields, is_valid_email, is_strong_password
-from utils.response_utils import success_response, error_response
+from utils.response_utils import success_response, error_response, unavailable_response
 from utils.logging_utils import log_event, log_exception
 from utils.security_utils import sanitize_html
 from services.db_service import get_db, save_user_session
@@ -59,6 +60,9 @@ def register_session_routes(app):
                 "User registered successfully", 
                 201
             )
+        except PasswordHasherBusy as e:
+            log_event('user.register.throttled', {'email': email}, level='warning')
+            return unavailable_response("Server is busy, please retry shortly", e.retry_after)
         except Exception as e:
             log_exception(e)
             return error_response("Registration failed", 500)
@@ -97,6 +101,9 @@ def register_session_routes(app):
                     "role": user.get('role', 'user')
                 }
             }, "Login successful")
+        except PasswordHasherBusy as e:
+            log_event('user.login.throttled', {'email': email}, level='warning')
+            return unavailable_response("Server is busy, please retry shortly", e.retry_after)
         except Exception as e:
             log_exception(e)
             return error_response("Login failed", 500)
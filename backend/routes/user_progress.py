@@ -9,8 +9,25 @@ from services.db_service import get_db
 from utils.response_utils import success_response, error_response
 from utils.logging_utils import log_event, log_exception
 from utils.security_utils import sanitize_html
+from utils.date_utils import to_iso_utc
+from utils.validators import parse_field_list
+from utils.progress_utils import aggregate_performance
+from services.recommendation_service import recommend_problems
 from datetime import datetime
 
+# Sessions whose problems count as recently seen for recommendations
+RECENT_SESSION_COUNT = 5
+
+# Sections of the progress payload that can be requested with ?include=
+PROGRESS_SECTIONS = (
+    "topicPerformance",
+    "difficultyPerformance",
+    "overallPerformance",
+    "recentSessions",
+    "trendData",
+    "cohortComparison"
+)
+
 def register_user_progress_routes(app):
     """Register routes for user progress tracking"""
     
@@ -24,24 +41,32 @@ def register_user_progress_routes(app):
             # Sanitize username
             username = sanitize_html(username)
             
+            # Sparse sections: ?include=overallPerformance,recentSessions computes only those
+            include, invalid = parse_field_list(request.args.get('include'), PROGRESS_SECTIONS)
+            if invalid:
+                return error_response(f"Unknown progress sections: {', '.join(invalid)}", 400)
+            sections = set(include or PROGRESS_SECTIONS)
+            
             # Get the database connection
             db = get_db()
             
+            # Only fetch the session fields the requested sections need
+            projection = {
+                "completed_at": 1,
+                "score": 1,
+                "total_attempted": 1
+            }
+            if "recentSessions" in sections:
+                projection.update({"year": 1, "contest": 1, "mode": 1})
+            if "topicPerformance" in sections:
+                projection["topic_performance"] = 1
+            if "difficultyPerformance" in sections:
+                projection["difficulty_performance"] = 1
+            
             # Query to find all sessions for the user
             user_sessions = list(db.sessions.find(
                 {"username": username},
-                {
-                    "session_id": 1,
-                    "completed_at": 1,
-                    "year": 1,
-                    "contest": 1,
-                    "mode": 1,
-                    "score": 1,
-                    "total_attempted": 1,
-                    "topic_performance": 1,
-                    "difficulty_performance": 1,
-                    "performance_metrics": 1
-                }
+                projection
             ).sort("completed_at", -1))  # Sort by completion date, newest first
             
             # Initialize the response data
@@ -72,88 +97,34 @@ def register_user_progress_routes(app):
             
             # Process sessions to aggregate data
             if user_sessions:
-                # Calculate aggregate performance metrics
-                total_problems = 0
-                total_correct = 0
-                total_score = 0
-                
-                # Aggregate topic performance across all sessions
-                all_topics = {}
-                all_difficulties = {}
-                
-                # Process each session
-                for session in user_sessions:
-                    # Basic session data for recent sessions list
-                    session_data = {
-                        "completedAt": session.get("completed_at"),
-                        "year": session.get("year"),
-                        "contest": session.get("contest"),
-                        "mode": session.get("mode"),
-                        "score": session.get("score", 0),
-                        "totalAttempted": session.get("total_attempted", 0),
-                        "accuracy": 0
-                    }
-                    
-                    # Calculate accuracy for the session
-                    if session_data["totalAttempted"] > 0:
-                        session_data["accuracy"] = (session_data["score"] / session_data["totalAttempted"]) * 100
-                    
-                    # Add to recent sessions list (limit to first 5)
-                    if len(progress_data["recentSessions"]) < 5:
-                        progress_data["recentSessions"].append(session_data)
-                    
-                    # Aggregate topic performance
-                    session_topics = session.get("topic_performance", {})
-                    for topic, data in session_topics.items():
-                        if topic not in all_topics:
-                            all_topics[topic] = {"attempted": 0, "correct": 0}
-                        
-                        all_topics[topic]["attempted"] += data.get("attempted", 0)
-                        all_topics[topic]["correct"] += data.get("correct", 0)
-                    
-                    # Aggregate difficulty performance
-                    session_difficulties = session.get("difficulty_performance", {})
-                    for difficulty, data in session_difficulties.items():
-                        if difficulty not in all_difficulties:
-                            all_difficulties[difficulty] = {"attempted": 0, "correct": 0}
+                # Add to recent sessions list (limit to first 5)
+                if "recentSessions" in sections:
+                    for session in user_sessions[:5]:
+                        score = session.get("score", 0)
+                        total_attempted = session.get("total_attempted", 0)
                         
-                        all_difficulties[difficulty]["attempted"] += data.get("attempted", 0)
-                        all_difficulties[difficulty]["correct"] += data.get("correct", 0)
-                    
-                    # Aggregate overall metrics
-                    total_problems += session_data["totalAttempted"]
-                    total_correct += session_data["score"]
-                    total_score += session_data["score"]
-                
-                # Calculate accuracy for topics with improved weighting
-                for topic, data in all_topics.items():
-                    if data["attempted"] > 0:
-                        # Base calculation
-                        raw_accuracy = (data["correct"] / data["attempted"]) * 100
+                        # Basic session data for recent sessions list
+                        session_data = {
+                            "completedAt": to_iso_utc(session.get("completed_at")),
+                            "year": session.get("year"),
+                            "contest": session.get("contest"),
+                            "mode": session.get("mode"),
+                            "score": score,
+                            "totalAttempted": total_attempted,
+                            "accuracy": 0
+                        }
                         
-                        # Apply weight adjustment for topics with few attempts
-                        # This helps align with overall accuracy by giving more confidence to topics with more attempts
-                        attempt_weight = min(1.0, data["attempted"] / 10)  # Full weight at 10+ attempts
+                        # Calculate accuracy for the session
+                        if total_attempted > 0:
+                            session_data["accuracy"] = (score / total_attempted) * 100
                         
-                        # Calculate weighted accuracy that's closer to overall accuracy
-                        # For topics with very few attempts, this will pull values closer to the overall accuracy
-                        overall_accuracy = (total_correct / total_problems * 100) if total_problems > 0 else 0
-                        data["accuracy"] = (raw_accuracy * attempt_weight) + (overall_accuracy * (1 - attempt_weight))
-                        
-                        # Ensure we log both values for diagnostic purposes
-                        data["raw_accuracy"] = raw_accuracy
-                        data["weighted_factor"] = attempt_weight
-                    else:
-                        data["accuracy"] = 0
-                        data["raw_accuracy"] = 0
-                        data["weighted_factor"] = 0
+                        progress_data["recentSessions"].append(session_data)
                 
-                # Calculate accuracy for difficulties
-                for difficulty, data in all_difficulties.items():
-                    if data["attempted"] > 0:
-                        data["accuracy"] = (data["correct"] / data["attempted"]) * 100
-                    else:
-                        data["accuracy"] = 0
+                # Aggregate topic, difficulty and overall performance across all sessions
+                performance = aggregate_performance(user_sessions)
+                total_problems = performance["total_problems"]
+                total_correct = performance["total_correct"]
+                total_score = performance["total_score"]
                 
                 # Set overall performance metrics
                 progress_data["overallPerformance"]["totalProblems"] = total_problems
@@ -168,21 +139,22 @@ def register_user_progress_routes(app):
                     progress_data["overallPerformance"]["averageScore"] = total_score / len(user_sessions)
                 
                 # Set aggregated topic and difficulty performance
-                progress_data["topicPerformance"] = all_topics
-                progress_data["difficultyPerformance"] = all_difficulties
+                progress_data["topicPerformance"] = performance["topics"]
+                progress_data["difficultyPerformance"] = performance["difficulties"]
                 
                 # Populate trend data from recent sessions (up to 10)
-                for session in user_sessions[:10]:
-                    accuracy = 0
-                    if session.get("total_attempted", 0) > 0:
-                        accuracy = (session.get("score", 0) / session.get("total_attempted", 0)) * 100
-                    
-                    progress_data["trendData"]["accuracy"].append(accuracy)
-                    progress_data["trendData"]["score"].append(session.get("score", 0))
-                    progress_data["trendData"]["dates"].append(session.get("completed_at"))
+                if "trendData" in sections:
+                    for session in user_sessions[:10]:
+                        accuracy = 0
+                        if session.get("total_attempted", 0) > 0:
+                            accuracy = (session.get("score", 0) / session.get("total_attempted", 0)) * 100
+                        
+                        progress_data["trendData"]["accuracy"].append(accuracy)
+                        progress_data["trendData"]["score"].append(session.get("score", 0))
+                        progress_data["trendData"]["dates"].append(to_iso_utc(session.get("completed_at")))
                 
                 # Populate cohort comparison (basic implementation)
-                if total_problems > 0:
+                if "cohortComparison" in sections and total_problems > 0:
                     user_accuracy = (total_correct / total_problems) * 100
                     progress_data["cohortComparison"]["userAccuracy"] = user_accuracy
                     progress_data["cohortComparison"]["averageAccuracy"] = 60  # Default value
@@ -196,6 +168,9 @@ def register_user_progress_routes(app):
                     else:
                         progress_data["cohortComparison"]["userPercentile"] = 70 + (user_accuracy - 75) / 25 * 30
             
+            # Drop sections that were not requested
+            progress_data = {key: value for key, value in progress_data.items() if key in sections}
+            
             log_event('user.progress.retrieved', {
                 'username': username,
                 'session_count': len(user_sessions)
@@ -209,6 +184,62 @@ def register_user_progress_routes(app):
             log_exception(e)
             return error_response(f"Failed to get user progress: {str(e)}", 500)
             
+    @app.route('/api/user/recommendations/<username>', methods=['GET'])
+    def get_user_recommendations(username):
+        """Recommend practice problems targeting a user's weak topics"""
+        try:
+            if not username:
+                return error_response("Username is required", 400)
+                
+            # Sanitize username
+            username = sanitize_html(username)
+            k = min(max(int(request.args.get('k', 10)), 1), 50)
+            contest = request.args.get('contest')
+            
+            # Get the database connection
+            db = get_db()
+            
+            user_sessions = list(db.sessions.find(
+                {"username": username},
+                {
+                    "score": 1,
+                    "total_attempted": 1,
+                    "topic_performance": 1,
+                    "difficulty_performance": 1,
+                    "problems_attempted.problem_id": 1
+                }
+            ).sort("completed_at", -1))
+            
+            recent_problem_ids = {
+                str(problem.get("problem_id"))
+                for session in user_sessions[:RECENT_SESSION_COUNT]
+                for problem in session.get("problems_attempted", [])
+                if problem.get("problem_id")
+            }
+            
+            recommendations = recommend_problems(
+                user_sessions,
+                recent_problem_ids=recent_problem_ids,
+                k=k,
+                contest_prefix=contest.replace(' ', '') if contest else None
+            )
+            
+            log_event('user.recommendations.retrieved', {
+                'username': username,
+                'session_count': len(user_sessions),
+                'recommendation_count': len(recommendations)
+            })
+            
+            return success_response(
+                data={"recommendations": recommendations},
+                message='Recommendations retrieved successfully'
+            )
+        except ValueError:
+            return error_response("k must be an integer", 400)
+        except Exception as e:
+            log_exception(e)
+            return error_response(f"Failed to get recommendations: {str(e)}", 500)
+            
     @app.route('/api/cohort/metrics/<username>', methods=['GET'])
     def get_cohort_metrics(username):
         """Get cohort comparison metrics for a user"""
@@ -7,6 +7,7 @@ from services.db_service import get_db
 from utils.response_utils import success_response, error_response
 from utils.logging_utils import log_event, log_exception
 from utils.security_utils import sanitize_html
+from utils.date_utils import to_iso_utc
 
 def register_user_stats_routes(app):
     """Register routes for user statistics"""
@@ -32,12 +33,15 @@ def register_user_stats_routes(app):
             last_session = None
             
             # Sort by completed_at in descending order to get the most recent session first
-            cursor = db.sessions.find({"username": username}).sort("completed_at", -1)
+            cursor = db.sessions.find(
+                {"username": username},
+                {"completed_at": 1, "score": 1}
+            ).sort("completed_at", -1)
             
             for i, session in enumerate(cursor):
                 # Get the most recent session date (first in the sorted cursor)
                 if i == 0 and session.get('completed_at'):
-                    last_session = session.get('completed_at')
+                    last_session = to_iso_utc(session.get('completed_at'))
                 
                 # Find best score across all sessions
                 score = session.get('score', 0)
@@ -91,12 +91,17 @@ def register_user_routes(app):
         if not file:
             return jsonify({'error': 'No file selected'}), 400
         
-        from services.storage_service import upload_asset
+        from services.storage_service import UPLOAD_FAILED_MESSAGE, upload_asset
         
-        # Upload to S3
-        asset_url = upload_asset(username, file, asset_type, asset_name)
-        if not asset_url:
-            return jsonify({'error': 'Failed to upload asset'}), 500
+        user = users.find_one({'username': username.lower()}, {'_id': 1})
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        # Upload to storage (assets are owned by user ID)
+        success, message, asset = upload_asset(str(user['_id']), file, asset_type, asset_name)
+        if not success:
+            return jsonify({'error': message}), 500 if message == UPLOAD_FAILED_MESSAGE else 400
+        asset_url = asset['url']
         
         # Update user's asset URL in MongoDB
         update_field = f'assets.{asset_type}s.{asset_name}'
@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Benchmark construction and serialization throughput of the slotted models
+against the previous dict-based model classes (reproduced below as Legacy*).
+
+Slotted instances are about half the size. Conversion throughput is on par
+with the previous classes: measured differences are mostly within the
+run-to-run noise of roughly +/-10%, so compare several runs before reading
+anything into a single speedup figure.
+
+Usage:
+    python scripts/benchmark_models.py [--iterations N]
+"""
+
+import argparse
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+from bson import ObjectId
+
+# Add the backend directory to the path so we can import models
+script_dir = Path(__file__).resolve().parent
+backend_dir = script_dir.parent
+sys.path.append(str(backend_dir))
+
+from models.asset import Asset
+from models.contest import Contest
+from models.problem import Problem
+from models.submission import Submission
+from models.user import User
+
+
+class LegacyUser:
+    """User model as it was before the slotted model layer"""
+
+    def __init__(self, username, email, password=None, role="user", created_at=None, last_login=None, _id=None):
+        self._id = _id or ObjectId()
+        self.username = username
+        self.email = email
+        self.password = password
+        self.role = role
+        self.created_at = created_at or datetime.utcnow()
+        self.last_login = last_login
+
+    @classmethod
+    def from_dict(cls, data):
+        if data is None:
+            return None
+        return cls(
+            _id=data.get('_id'),
+            username=data.get('username'),
+            email=data.get('email'),
+            password=data.get('password'),
+            role=data.get('role', 'user'),
+            created_at=data.get('created_at'),
+            last_login=data.get('last_login')
+        )
+
+    def to_dict(self, include_password=False):
+        result = {
+            "_id": self._id,
+            "username": self.username,
+            "email": self.email,
+            "role": self.role,
+            "created_at": self.created_at,
+            "last_login": self.last_login
+        }
+        if include_password and self.password:
+            result["password"] = self.password
+        return result
+
+    def to_json(self):
+        result = self.to_dict(include_password=False)
+        result["_id"] = str(result["_id"])
+        if result["created_at"]:
+            result["created_at"] = result["created_at"].isoformat()
+        if result["last_login"]:
+            result["last_login"] = result["last_login"].isoformat()
+        return result
+
+
+class LegacyAsset:
+    """Asset model as it was before the slotted model layer (with content_hash added)"""
+
+    def __init__(self, filename, asset_type, path, url, user_id, size=None, content_hash=None,
+                 metadata=None, created_at=None, _id=None):
+        self._id = _id or ObjectId()
+        self.filename = filename
+        self.asset_type = asset_type
+        self.path = path
+        self.url = url
+        self.user_id = user_id
+        self.size = size
+        self.content_hash = content_hash
+        self.metadata = metadata or {}
+        self.created_at = created_at or datetime.utcnow()
+
+    @classmethod
+    def from_dict(cls, data):
+        if data is None:
+            return None
+        return cls(
+            _id=data.get('_id'),
+            filename=data.get('filename'),
+            asset_type=data.get('asset_type'),
+            path=data.get('path'),
+            url=data.get('url'),
+            user_id=data.get('user_id'),
+            size=data.get('size'),
+            content_hash=data.get('content_hash'),
+            metadata=data.get('metadata', {}),
+            created_at=data.get('created_at')
+        )
+
+    def to_dict(self):
+        return {
+            "_id": self._id,
+            "filename": self.filename,
+            "asset_type": self.asset_type,
+            "path": self.path,
+            "url": self.url,
+            "user_id": self.user_id,
+            "size": self.size,
+            "content_hash": self.content_hash,
+            "metadata": self.metadata,
+            "created_at": self.created_at
+        }
+
+    def to_json(self):
+        result = self.to_dict()
+        result["_id"] = str(result["_id"])
+        result["user_id"] = str(result["user_id"])
+        if result["created_at"]:
+            result["created_at"] = result["created_at"].isoformat()
+        return result
+
+
+class LegacyProblem:
+    """Problem model as it was before the slotted model layer"""
+
+    def __init__(self, title, description, difficulty, year=None, contest=None, problem_number=None,
+                 detailed_solution=None, similar_questions=None, category=None, content=None,
+                 test_cases=None, created_by=None, published=False, created_at=None, updated_at=None,
+                 _id=None):
+        self._id = _id or ObjectId()
+        self.title = title
+        self.description = description
+        self.difficulty = difficulty
+        self.year = year
+        self.contest = contest
+        self.problem_number = problem_number
+        self.solution = detailed_solution
+        self.similar_questions = similar_questions or []
+        self.category = category
+        self.content = content or {}
+        self.test_cases = test_cases or []
+        self.created_by = created_by
+        self.published = published
+        self.created_at = created_at or datetime.utcnow()
+        self.updated_at = updated_at or datetime.utcnow()
+
+    @classmethod
+    def from_dict(cls, data):
+        if data is None:
+            return None
+        return cls(
+            _id=data.get('_id'),
+            title=data.get('title'),
+            description=data.get('problem_statement'),
+            difficulty=data.get('difficulty'),
+            year=data.get('year'),
+            contest=data.get('contest'),
+            problem_number=data.get('problem_number'),
+            detailed_solution=data.get('detailed_solution'),
+            similar_questions=data.get('similar_questions', []),
+            category=data.get('category'),
+            content=data.get('content'),
+            test_cases=data.get('test_cases', []),
+            created_by=data.get('created_by'),
+            published=data.get('published', False),
+            created_at=data.get('created_at'),
+            updated_at=data.get('updated_at'),
+        )
+
+    def to_dict(self, include_solution=False):
+        result = {
+            "_id": str(self._id),
+            "title": self.title,
+            "description": self.description,
+            "difficulty": self.difficulty,
+            "year": self.year,
+            "contest": self.contest,
+            "problem_number": self.problem_number,
+            "content": self.content,
+            "test_cases": self.test_cases,
+            "similar_questions": [
+                {
+                    "difficulty": p.get("difficulty"),
+                    "question": p.get("question"),
+                    "detailed_solution": p.get("detailed_solution")
+                }
+                for p in self.similar_questions
+            ],
+            "created_by": str(self.created_by) if self.created_by else None,
+            "published": self.published,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+        }
+        if include_solution and self.solution:
+            result["solution"] = self.solution
+        return result
+
+    def to_json(self):
+        # The previous class had no to_json; its API representation was to_dict
+        return self.to_dict()
+
+
+class LegacyContest:
+    """Contest model as it was before the slotted model layer"""
+
+    def __init__(self, title, description, start_time, end_time, problems=None, created_by=None,
+                 published=False, registration_end=None, created_at=None, updated_at=None, _id=None):
+        self._id = _id or ObjectId()
+        self.title = title
+        self.description = description
+        self.start_time = start_time
+        self.end_time = end_time
+        self.problems = problems or []
+        self.created_by = created_by
+        self.published = published
+        self.registration_end = registration_end
+        self.created_at = created_at or datetime.utcnow()
+        self.updated_at = updated_at or datetime.utcnow()
+
+    @classmethod
+    def from_dict(cls, data):
+        if data is None:
+            return None
+        return cls(
+            _id=data.get('_id'),
+            title=data.get('title'),
+            description=data.get('description'),
+            start_time=data.get('start_time'),
+            end_time=data.get('end_time'),
+            problems=data.get('problems', []),
+            created_by=data.get('created_by'),
+            published=data.get('published', False),
+            registration_end=data.get('registration_end'),
+            created_at=data.get('created_at'),
+            updated_at=data.get('updated_at')
+        )
+
+    def to_dict(self):
+        return {
+            "_id": self._id,
+            "title": self.title,
+            "description": self.description,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "problems": self.problems,
+            "created_by": self.created_by,
+            "published": self.published,
+            "registration_end": self.registration_end,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+
+    def to_json(self):
+        result = self.to_dict()
+        result["_id"] = str(result["_id"])
+        if result.get("created_by"):
+            result["created_by"] = str(result["created_by"])
+        result["problems"] = [str(p) for p in result["problems"]]
+        for date_field in ["start_time", "end_time", "registration_end", "created_at", "updated_at"]:
+            if result.get(date_field):
+                result[date_field] = result[date_field].isoformat()
+        return result
+
+
+class LegacySubmission:
+    """Submission model as it was before the slotted model layer"""
+
+    def __init__(self, user_id, problem_id, solution, status="pending", results=None,
+                 contest_id=None, submitted_at=None, execution_time=None, _id=None):
+        self._id = _id or ObjectId()
+        self.user_id = user_id
+        self.problem_id = problem_id
+        self.solution = solution
+        self.status = status
+        self.results = results or {}
+        self.contest_id = contest_id
+        self.submitted_at = submitted_at or datetime.utcnow()
+        self.execution_time = execution_time
+
+    @classmethod
+    def from_dict(cls, data):
+        if data is None:
+            return None
+        return cls(
+            _id=data.get('_id'),
+            user_id=data.get('user_id'),
+            problem_id=data.get('problem_id'),
+            solution=data.get('solution'),
+            status=data.get('status', 'pending'),
+            results=data.get('results', {}),
+            contest_id=data.get('contest_id'),
+            submitted_at=data.get('submitted_at'),
+            execution_time=data.get('execution_time')
+        )
+
+    def to_dict(self):
+        return {
+            "_id": self._id,
+            "user_id": self.user_id,
+            "problem_id": self.problem_id,
+            "solution": self.solution,
+            "status": self.status,
+            "results": self.results,
+            "contest_id": self.contest_id,
+            "submitted_at": self.submitted_at,
+            "execution_time": self.execution_time
+        }
+
+    def to_json(self):
+        result = self.to_dict()
+        result["_id"] = str(result["_id"])
+        result["user_id"] = str(result["user_id"])
+        result["problem_id"] = str(result["problem_id"])
+        if result.get("contest_id"):
+            result["contest_id"] = str(result["contest_id"])
+        if result["submitted_at"]:
+            result["submitted_at"] = result["submitted_at"].isoformat()
+        return result
+
+
+def sample_documents():
+    now = datetime.utcnow()
+    contest = {
+        '_id': ObjectId(),
+        'title': 'AMC 10A 2022',
+        'description': 'Practice contest',
+        'start_time': now,
+        'end_time': now,
+        'problems': [ObjectId() for _ in range(25)],
+        'created_by': ObjectId(),
+        'published': True,
+        'created_at': now,
+        'updated_at': now
+    }
+    submission = {
+        '_id': ObjectId(),
+        'user_id': ObjectId(),
+        'problem_id': ObjectId(),
+        'contest_id': ObjectId(),
+        'solution': 'D',
+        'status': 'pending',
+        'submitted_at': now
+    }
+    user = {
+        '_id': ObjectId(),
+        'username': 'student',
+        'email': 'student@example.com',
+        'password': 'hash',
+        'role': 'user',
+        'created_at': now,
+        'last_login': now
+    }
+    asset = {
+        '_id': ObjectId(),
+        'filename': 'correct.mp3',
+        'asset_type': 'sound',
+        'path': 'blobs/sha256/ab/cd/abcd',
+        'url': '/api/assets/files/blobs/sha256/ab/cd/abcd',
+        'user_id': ObjectId(),
+        'size': 20480,
+        'content_hash': 'abcd',
+        'metadata': {'name': 'correct'},
+        'created_at': now
+    }
+    problem = {
+        '_id': ObjectId(),
+        'title': 'AMC 10A 2022 Problem 5',
+        'problem_statement': 'Find the number of ordered pairs.',
+        'difficulty': 'medium',
+        'year': 2022,
+        'contest': 'AMC 10A',
+        'problem_number': 5,
+        'detailed_solution': 'Count the cases.',
+        'similar_questions': [
+            {'difficulty': 'easy', 'question': 'Find x.', 'detailed_solution': 'x = 2'}
+            for _ in range(3)
+        ],
+        'created_at': now,
+        'updated_at': now
+    }
+    return {'Contest': contest, 'Submission': submission, 'User': user, 'Asset': asset, 'Problem': problem}
+
+
+def measure(operation, legacy_call, model_call, iterations, repeat=7):
+    """Time both implementations in alternating rounds so load changes hit them equally"""
+    legacy_times, model_times = [], []
+    for _ in range(repeat):
+        legacy_times.append(timeit.timeit(legacy_call, number=iterations))
+        model_times.append(timeit.timeit(model_call, number=iterations))
+
+    before, after = iterations / min(legacy_times), iterations / min(model_times)
+    print(f"  {operation + ' (legacy)':<28} {before:>12,.0f} ops/s")
+    print(f"  {operation + ' (slotted)':<28} {after:>12,.0f} ops/s")
+    print(f"  {'speedup':<28} {after / before:>12.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark model construction and serialization')
+    parser.add_argument('--iterations', type=int, default=50000, help='Operations per measurement')
+    args = parser.parse_args()
+
+    documents = sample_documents()
+    cases = [
+        ('Contest', LegacyContest, Contest),
+        ('Submission', LegacySubmission, Submission),
+        ('User', LegacyUser, User),
+        ('Asset', LegacyAsset, Asset),
+        ('Problem', LegacyProblem, Problem)
+    ]
+
+    for name, legacy_cls, model_cls in cases:
+        doc = documents[name]
+        print(f"\n{name}")
+        legacy, model = legacy_cls.from_dict(doc), model_cls.from_dict(doc)
+        assert legacy.to_json() == model.to_json(), f"{name} serialization differs"
+
+        for operation, legacy_call, model_call in (
+            ('from_dict', lambda: legacy_cls.from_dict(doc), lambda: model_cls.from_dict(doc)),
+            ('to_dict', legacy.to_dict, model.to_dict),
+            ('to_json', legacy.to_json, model.to_json),
+            ('from_dict + to_json', lambda: legacy_cls.from_dict(doc).to_json(),
+                lambda: model_cls.from_dict(doc).to_json())
+        ):
+            measure(operation, legacy_call, model_call, args.iterations)
+
+        print(f"  {'instance size (legacy)':<28} {sys.getsizeof(legacy) + sys.getsizeof(legacy.__dict__):>12} bytes")
+        print(f"  {'instance size (slotted)':<28} {sys.getsizeof(model):>12} bytes")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,8 +2,7 @@ import jwt
 from datetime import datetime, timedelta
 from functools import wraps
 from flask import request, jsonify, current_app
-from services.user_service import get_user_by_id
-from utils.validators import is_valid_object_id
+from services.identity_service import verify_token_claims, get_user_role
 from utils.logging_utils import log_event, log_exception
 
 # Add any missing imports and functions if needed
@@ -24,18 +23,9 @@ def generate_token(user_id):
     return token
 
 def verify_token(token):
-    """Verify and decode a JWT token"""
-    try:
-        payload = jwt.decode(
-            token, 
-            current_app.config.get('JWT_SECRET_KEY', 'dev-secret-key'), 
-            algorithms=['HS256']
-        )
-        return payload.get('user_id')
-    except jwt.ExpiredSignatureError:
-        return None
-    except jwt.InvalidTokenError:
-        return None
+    """Verify and decode a JWT token (verified tokens are cached until they expire)"""
+    claims = verify_token_claims(token)
+    return claims.get('user_id') if claims else None
 
 def login_required(f):
     """Decorator for routes that require authentication"""
@@ -82,8 +72,7 @@ def admin_required(f):
             
         # Check if user is an admin
         try:
-            user_data = get_user_by_id(user_id)
-            if not user_data or user_data.get('role') != 'admin':
+            if get_user_role(user_id) != 'admin':
                 log_event('auth.admin_access_denied', {'endpoint': request.path}, user_id)
                 return jsonify({'error': 'Admin privileges required'}), 403
                 
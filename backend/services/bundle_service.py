@@ -0,0 +1,110 @@
+"""
+Precompressed, versioned contest bundles.
+
+Each contest's problem set is serialized once when the catalog loads or a
+problem changes, and kept as raw JSON plus gzip and (if available) brotli
+encodings. Bundles are addressed by a hash of their content, so a version
+never changes and can be cached by clients and proxies indefinitely; serving
+one is a dictionary lookup with no encoding or compression work.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from datetime import datetime
+from services import catalog_service
+from utils.logging_utils import log_event
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+_lock = threading.Lock()
+_bundles = {}   # contest_id -> bundle dict
+_problem_contests = {}   # problem _id -> contest_id of the bundle it is in
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def build_contest_bundle(contest_id):
+    """
+    Serialize and compress the problem set of a contest
+
+    Returns:
+        dict: Bundle with 'version', 'identity', 'gzip' and 'br' (None without brotli)
+            bodies, or None if the contest has no problems
+    """
+    problems = [
+        catalog_service.get_contest_problem(contest_id, number)
+        for number in catalog_service.get_contest_problem_numbers(contest_id)
+    ]
+    problems = [p for p in problems if p]
+    if not problems:
+        return None
+
+    body = json.dumps(
+        {'contest_id': contest_id, 'problems': problems},
+        default=_json_default,
+        sort_keys=True,
+        separators=(',', ':')
+    ).encode('utf-8')
+
+    bundle = {
+        'contest_id': contest_id,
+        'version': hashlib.sha256(body).hexdigest()[:20],
+        'identity': body,
+        'gzip': gzip.compress(body, compresslevel=9, mtime=0),
+        'br': brotli.compress(body, quality=11) if brotli else None,
+        'problem_count': len(problems)
+    }
+
+    with _lock:
+        _bundles[contest_id] = bundle
+        for problem in problems:
+            _problem_contests[str(problem['_id'])] = contest_id
+
+    return bundle
+
+def build_all_bundles():
+    """Rebuild the bundles of every contest in the catalog"""
+    contest_ids = {p.get('contest_id') for p in catalog_service.list_problems() if p.get('contest_id')}
+
+    with _lock:
+        _bundles.clear()
+        _problem_contests.clear()
+
+    for contest_id in contest_ids:
+        build_contest_bundle(contest_id)
+
+    log_event('bundles.built', {'contest_count': len(contest_ids)})
+    return len(contest_ids)
+
+def get_contest_bundle(contest_id):
+    """Get the current bundle of a contest, building it on first use"""
+    bundle = _bundles.get(contest_id)
+    if bundle is None:
+        bundle = build_contest_bundle(contest_id)
+    return bundle
+
+def _rebuild_or_drop(contest_id):
+    if build_contest_bundle(contest_id) is None:
+        with _lock:
+            _bundles.pop(contest_id, None)
+
+def _on_catalog_change(event, problem_id, problem):
+    if event == 'reload':
+        build_all_bundles()
+        return
+
+    # A problem moved to another contest must also leave its old bundle
+    with _lock:
+        previous_contest = _problem_contests.pop(str(problem_id), None)
+    contest_ids = {previous_contest, problem.get('contest_id') if problem else None} - {None}
+    for contest_id in contest_ids:
+        _rebuild_or_drop(contest_id)
+
+catalog_service.add_catalog_listener(_on_catalog_change)
@@ -0,0 +1,234 @@
+"""
+In-memory problem catalog.
+
+The problem set changes rarely (ingest and admin edits) but is read on every
+practice step, so the whole `problems` collection is kept in process memory,
+indexed by _id and by (contest_id, problem_number). Writes go through the
+problem service, which refreshes the affected entry here; other in-process
+indexes (search, bundles, similarity) subscribe with add_catalog_listener.
+
+Every process keeps its own copy, so writes made by other workers, the
+grading worker or scripts are picked up by polling: at most every
+SYNC_INTERVAL_SECONDS a read re-fetches the problems whose updated_at moved
+(one indexed query) and compares the collection's count to detect deletes.
+Writes that change neither (direct edits without updated_at) are picked up
+by the full reload every MAX_AGE_SECONDS.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from bson.objectid import ObjectId
+from services.db_service import get_db
+from utils.logging_utils import log_event, log_exception
+
+# How often each process looks for problems changed by other processes
+SYNC_INTERVAL_SECONDS = 5
+# Changes this recent are re-read on every sync, covering writers whose clocks lag ours
+CLOCK_SKEW = timedelta(seconds=30)
+# Age after which the whole catalog is reloaded
+MAX_AGE_SECONDS = 300
+
+_lock = threading.RLock()
+_sync_lock = threading.Lock()
+_problems = {}        # str(_id) -> problem document (with string _id)
+_contest_index = {}   # contest_id -> {str(problem_number): str(_id)}
+_loaded = False
+_loaded_at = 0.0      # time.monotonic() of the last full load
+_synced_at = None     # datetime.utcnow() when the last sync started
+_next_sync = 0.0      # time.monotonic() of the next sync
+_listeners = []
+
+def _add_problem(problem, problems, contest_index):
+    problem = dict(problem)
+    problem['_id'] = str(problem['_id'])
+    problems[problem['_id']] = problem
+
+    contest_id = problem.get('contest_id')
+    if contest_id and problem.get('problem_number') is not None:
+        contest_index.setdefault(contest_id, {})[str(problem['problem_number'])] = problem['_id']
+
+    return problem
+
+def _index_problem(problem):
+    """Add or replace a problem document in the catalog (caller holds the lock)"""
+    _unindex_problem(str(problem['_id']))
+    return _add_problem(problem, _problems, _contest_index)
+
+def _unindex_problem(problem_id):
+    """Remove a problem document from the catalog (caller holds the lock)"""
+    problem = _problems.pop(problem_id, None)
+    if not problem:
+        return None
+
+    numbers = _contest_index.get(problem.get('contest_id'))
+    if numbers is not None:
+        numbers.pop(str(problem.get('problem_number')), None)
+        if not numbers:
+            del _contest_index[problem.get('contest_id')]
+
+    return problem
+
+def _notify(event, problem_id, problem=None):
+    """Notify catalog listeners of a change"""
+    for callback in list(_listeners):
+        try:
+            callback(event, problem_id, problem)
+        except Exception as e:
+            log_exception(e, {'event': event, 'problem_id': problem_id})
+
+def load_catalog(force=False):
+    """
+    Load every problem into memory
+
+    Args:
+        force (bool): Reload even if the catalog is already loaded
+
+    Returns:
+        int: Number of problems in the catalog
+    """
+    global _problems, _contest_index, _loaded, _loaded_at, _synced_at, _next_sync
+
+    with _lock:
+        if _loaded and not force:
+            return len(_problems)
+
+        db = get_db()
+        started = datetime.utcnow()
+        # Built aside and swapped in, so lock-free readers never see a partial catalog
+        problems, contest_index = {}, {}
+        for problem in db.problems.find({}):
+            _add_problem(problem, problems, contest_index)
+        _problems, _contest_index = problems, contest_index
+        _loaded = True
+        _loaded_at = time.monotonic()
+        _synced_at = started
+        _next_sync = _loaded_at + SYNC_INTERVAL_SECONDS
+
+        log_event('catalog.loaded', {'problem_count': len(_problems)})
+
+    _notify('reload', None)
+    return len(_problems)
+
+def sync_catalog():
+    """
+    Apply changes other processes made to the problems collection
+
+    Re-reads problems updated since the last sync; a count that no longer
+    matches (deleted, or inserted without updated_at) or a catalog older
+    than MAX_AGE_SECONDS triggers a full reload instead.
+
+    Returns:
+        int: Number of problems that changed, or None after a full reload
+    """
+    global _synced_at, _next_sync
+
+    if not _loaded or time.monotonic() - _loaded_at >= MAX_AGE_SECONDS:
+        load_catalog(force=True)
+        return None
+
+    db = get_db()
+    started = datetime.utcnow()
+    changed = []
+    with _lock:
+        for problem in db.problems.find({'updated_at': {'$gte': _synced_at - CLOCK_SKEW}}):
+            cached = _problems.get(str(problem['_id']))
+            if cached is None or cached != {**problem, '_id': str(problem['_id'])}:
+                changed.append(_index_problem(problem))
+        in_sync = db.problems.estimated_document_count() == len(_problems)
+        if in_sync:
+            _synced_at = started
+            _next_sync = time.monotonic() + SYNC_INTERVAL_SECONDS
+
+    if not in_sync:
+        load_catalog(force=True)
+        return None
+
+    for problem in changed:
+        _notify('upsert', problem['_id'], problem)
+    if changed:
+        log_event('catalog.synced', {'changed': len(changed)})
+    return len(changed)
+
+def _ensure_loaded():
+    global _next_sync
+
+    if not _loaded:
+        load_catalog()
+    elif time.monotonic() >= _next_sync and _sync_lock.acquire(blocking=False):
+        # One thread syncs; the others keep reading the current copy meanwhile
+        try:
+            if time.monotonic() >= _next_sync:
+                sync_catalog()
+        except Exception as e:
+            log_exception(e, {'operation': 'sync_catalog'})
+            _next_sync = time.monotonic() + SYNC_INTERVAL_SECONDS
+        finally:
+            _sync_lock.release()
+
+def add_catalog_listener(callback):
+    """
+    Subscribe to catalog changes
+
+    Args:
+        callback (callable): Called as callback(event, problem_id, problem) where
+            event is 'upsert', 'delete' or 'reload' (problem_id is None for reloads)
+    """
+    _listeners.append(callback)
+
+def get_problem(problem_id):
+    """Get a copy of a problem by ID, or None"""
+    _ensure_loaded()
+    problem = _problems.get(str(problem_id))
+    return dict(problem) if problem else None
+
+def get_contest_problem(contest_id, problem_number):
+    """Get a copy of a contest problem by its number, or None"""
+    _ensure_loaded()
+    problem_id = _contest_index.get(contest_id, {}).get(str(problem_number))
+    return get_problem(problem_id) if problem_id else None
+
+def get_contest_problem_numbers(contest_id):
+    """Get the canonical (ascending) problem numbers of a contest as strings"""
+    _ensure_loaded()
+    with _lock:
+        numbers = list(_contest_index.get(contest_id, {}))
+    numbers.sort(key=lambda x: int(x) if x.isdigit() else 0)
+    return numbers
+
+def list_problems():
+    """Get all catalog problem documents (shared, do not mutate)"""
+    _ensure_loaded()
+    with _lock:
+        return list(_problems.values())
+
+def refresh_problem(problem_id):
+    """
+    Re-read a single problem from the database after it was created or updated
+
+    Returns:
+        dict: The refreshed problem, or None if it no longer exists
+    """
+    if not _loaded:
+        # Nothing cached yet; the next read loads the current state
+        return None
+
+    db = get_db()
+    problem = db.problems.find_one({'_id': ObjectId(problem_id)})
+    if not problem:
+        return remove_problem(problem_id)
+
+    with _lock:
+        problem = _index_problem(problem)
+
+    _notify('upsert', problem['_id'], problem)
+    return problem
+
+def remove_problem(problem_id):
+    """Drop a deleted problem from the catalog"""
+    with _lock:
+        problem = _unindex_problem(str(problem_id))
+
+    if problem:
+        _notify('delete', str(problem_id), problem)
+    return None
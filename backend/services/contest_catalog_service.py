@@ -0,0 +1,194 @@
+"""
+In-memory contest catalog.
+
+Contests are listed far more often than they change, and which of them are
+upcoming, active or completed depends only on the clock. Every contest is
+kept in process memory in its serialized form (string _id and problem IDs),
+and the published ones are additionally kept in two sorted lists, by
+start_time and by end_time, so a status view is a bisect instead of a query.
+The contest service refreshes entries here on create, update and delete.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from bson.objectid import ObjectId
+from services.db_service import get_db
+from utils.date_utils import parse_iso
+from utils.logging_utils import log_event
+
+CONTEST_STATUSES = ('upcoming', 'active', 'completed')
+
+_lock = threading.RLock()
+_contests = {}      # str(_id) -> serialized contest document
+_windows = {}       # str(_id) -> (start_time, end_time, registration_end) as naive UTC datetimes
+_problem_sets = {}  # str(_id) -> frozenset of str problem IDs
+_by_start = []      # sorted [(start_time, str(_id))] of published contests
+_by_end = []        # sorted [(end_time, str(_id))] of published contests
+_loaded = False
+
+def _as_utc(value):
+    """Normalize a stored contest time (datetime or ISO string) to naive UTC, or None"""
+    if isinstance(value, str):
+        value = parse_iso(value)
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _serialize(contest):
+    contest = dict(contest)
+    contest['_id'] = str(contest['_id'])
+    if 'problems' in contest:
+        contest['problems'] = [str(p) if isinstance(p, ObjectId) else p for p in contest['problems']]
+    return contest
+
+def _rebuild_views():
+    """Rebuild the sorted status lists (caller holds the lock)"""
+    global _by_start, _by_end
+
+    by_start, by_end = [], []
+    for contest_id, (start_time, end_time, _) in _windows.items():
+        if not _contests[contest_id].get('published') or start_time is None or end_time is None:
+            continue
+        by_start.append((start_time, contest_id))
+        by_end.append((end_time, contest_id))
+    by_start.sort()
+    by_end.sort()
+    _by_start, _by_end = by_start, by_end
+
+def _store(contest):
+    """Add or replace a contest (caller holds the lock)"""
+    contest = _serialize(contest)
+    _contests[contest['_id']] = contest
+    _windows[contest['_id']] = (
+        _as_utc(contest.get('start_time')),
+        _as_utc(contest.get('end_time')),
+        _as_utc(contest.get('registration_end'))
+    )
+    _problem_sets[contest['_id']] = frozenset(str(p) for p in contest.get('problems') or [])
+    return contest
+
+def _drop(contest_id):
+    """Remove a contest (caller holds the lock)"""
+    _windows.pop(contest_id, None)
+    _problem_sets.pop(contest_id, None)
+    return _contests.pop(contest_id, None)
+
+def load_contests(force=False):
+    """
+    Load every contest into memory
+
+    Args:
+        force (bool): Reload even if the catalog is already loaded
+
+    Returns:
+        int: Number of contests in the catalog
+    """
+    global _loaded
+
+    with _lock:
+        if _loaded and not force:
+            return len(_contests)
+
+        db = get_db()
+        _contests.clear()
+        _windows.clear()
+        _problem_sets.clear()
+        for contest in db.contests.find({}):
+            _store(contest)
+        _rebuild_views()
+        _loaded = True
+
+        log_event('contest_catalog.loaded', {'contest_count': len(_contests)})
+        return len(_contests)
+
+def _ensure_loaded():
+    if not _loaded:
+        load_contests()
+
+def refresh_contest(contest_id):
+    """Re-read a single contest from the database after it was created or updated"""
+    with _lock:
+        if not _loaded:
+            # Nothing cached yet; the next read loads the current state
+            return
+
+        contest = get_db().contests.find_one({'_id': ObjectId(contest_id)})
+        if contest:
+            _store(contest)
+        else:
+            _drop(str(contest_id))
+        _rebuild_views()
+
+def remove_contest(contest_id):
+    """Drop a deleted contest from the catalog"""
+    with _lock:
+        if _drop(str(contest_id)) is not None:
+            _rebuild_views()
+
+def _project(contest, fields):
+    if not fields:
+        return contest
+    # Mirror a Mongo inclusion projection: _id is always returned
+    return {key: value for key, value in contest.items() if key == '_id' or key in fields}
+
+def list_published_contests(status=None, fields=None, now=None):
+    """
+    Get published contests ordered by start time
+
+    Args:
+        status (str): 'upcoming', 'active' or 'completed' (optional, all when omitted)
+        fields (list): Fields to return (optional, all when omitted)
+        now (datetime): Reference time as naive UTC (defaults to the current time)
+
+    Returns:
+        list: Serialized contest documents (shared when fields is None, do not mutate)
+    """
+    _ensure_loaded()
+    now = now or datetime.utcnow()
+
+    with _lock:
+        by_start, by_end = _by_start, _by_end
+
+        if status == 'upcoming':
+            # start_time > now
+            ids = [contest_id for _, contest_id in by_start[bisect_right(by_start, (now, chr(0x10FFFF))):]]
+        elif status == 'completed':
+            # end_time < now
+            ids = [contest_id for _, contest_id in by_end[:bisect_left(by_end, (now, ''))]]
+            ids.sort(key=lambda contest_id: _windows[contest_id][0])
+        elif status == 'active':
+            # end_time >= now (the short tail of the end-sorted list), then start_time <= now
+            ids = [
+                contest_id for _, contest_id in by_end[bisect_left(by_end, (now, '')):]
+                if _windows[contest_id][0] <= now
+            ]
+            ids.sort(key=lambda contest_id: _windows[contest_id][0])
+        else:
+            ids = [contest_id for _, contest_id in by_start]
+
+        return [_project(_contests[contest_id], fields) for contest_id in ids]
+
+def get_contest_window(contest_id):
+    """
+    Get a contest's schedule
+
+    Returns:
+        tuple: (start_time, end_time, registration_end) as naive UTC datetimes (None where
+            unset), or None if the contest does not exist
+    """
+    _ensure_loaded()
+    return _windows.get(str(contest_id))
+
+def is_contest_published(contest_id):
+    """Check whether a contest exists and is published"""
+    _ensure_loaded()
+    contest = _contests.get(str(contest_id))
+    return bool(contest and contest.get('published'))
+
+def contest_has_problem(contest_id, problem_id):
+    """Check whether a problem is part of a contest's problem set"""
+    _ensure_loaded()
+    return str(problem_id) in _problem_sets.get(str(contest_id), ())
@@ -1,8 +1,18 @@
-from services.db_service import get_db, get_db_client # Import get_db_client
+from services.db_service import get_db
+from pymongo.errors import DuplicateKeyError
 from bson.objectid import ObjectId
 from datetime import datetime
 from models.contest import Contest  # Import the model
-from models.submission import Submission  # For submissions
+from utils.cache_utils import TTLCache
+from utils.validators import fields_projection
+from services import contest_catalog_service
+from services.index_service import ensure_indexes
+
+# (contest_id, user_id) pairs known to be registered, bounded to recently active users.
+# Registrations are never removed, so a hit is authoritative; a miss falls back
+# to the unique (contest_id, user_id) index, covering registrations made by
+# other processes.
+_registrations = TTLCache(maxsize=100000, ttl=6 * 3600)
 
 def get_contest_by_id(contest_id):
     """Get a specific contest by ID"""
@@ -15,38 +25,12 @@ def get_contest_by_id(contest_id):
     except Exception:
         return None
 
-def get_all_contests(filters=None):
-    """Get all contests matching the provided filters"""
-    db = get_db()
-    
-    if filters is None:
-        filters = {}
-        
-    # Only return published contests to regular users
-    if 'admin' not in filters.get('_roles', []):
-        filters['published'] = True
-        
-    # Remove internal filter keys
-    if '_roles' in filters:
-        del filters['_roles']
-        
-    cursor = db.contests.find(filters)
-    contests = list(cursor)
-    
-    # Convert ObjectId to string for JSON serialization
-    for contest in contests:
-        contest['_id'] = str(contest['_id'])
-        if 'problems' in contest:
-            contest['problems'] = [str(p) if isinstance(p, ObjectId) else p for p in contest['problems']]
-            
-    return contests
-
-def get_contest_by_id(contest_id):
-    """Get a specific contest by ID"""
+def get_contest_by_id(contest_id, fields=None):
+    """Get a specific contest by ID, optionally limited to `fields`"""
     db = get_db()
     
     try:
-        contest = db.contests.find_one({'_id': ObjectId(contest_id)})
+        contest = db.contests.find_one({'_id': ObjectId(contest_id)}, fields_projection(fields))
         if contest:
             contest['_id'] = str(contest['_id'])
             if 'problems' in contest:
@@ -72,6 +56,7 @@ def create_new_contest(contest_data):
         ]
     
     result = db.contests.insert_one(contest_data)
+    contest_catalog_service.refresh_contest(result.inserted_id)
     return str(result.inserted_id)
 
 def update_contest_by_id(contest_id, contest_data):
@@ -94,6 +79,8 @@ def update_contest_by_id(contest_id, contest_data):
             {'$set': contest_data}
         )
         
+        if result.matched_count > 0:
+            contest_catalog_service.refresh_contest(contest_id)
         return result.matched_count > 0
     except Exception:
         return False
@@ -104,96 +91,103 @@ def delete_contest_by_id(contest_id):
     
     try:
         result = db.contests.delete_one({'_id': ObjectId(contest_id)})
+        if result.deleted_count > 0:
+            contest_catalog_service.remove_contest(contest_id)
         return result.deleted_count > 0
     except Exception:
         return False
 
+def _remember_registration(contest_id, user_id):
+    _registrations.set((str(contest_id), str(user_id)), True)
+
+def is_user_registered(contest_id, user_id):
+    """Check whether a user is registered for a contest"""
+    if _registrations.get((str(contest_id), str(user_id))):
+        return True
+
+    db = get_db()
+    if db.contest_registrations.find_one(
+        {'contest_id': ObjectId(contest_id), 'user_id': ObjectId(user_id)},
+        {'_id': 1}
+    ):
+        _remember_registration(contest_id, user_id)
+        return True
+    return False
+
 def register_user_for_contest(contest_id, user_id):
     """Register a user for a contest"""
     db = get_db()
-    client = get_db_client()
 
     try:
-        with client.start_session() as session:
-            with session.start_transaction():
-                # Check if contest exists and is open for registration
-                contest = db.contests.find_one({'_id': ObjectId(contest_id)}, session=session)
-                
-                if not contest:
-                    return False, "Contest not found"
-                    
-                now = datetime.utcnow()
-                if contest.get('registration_end') and now > contest['registration_end']:
-                    return False, "Registration period has ended"
-                    
-                if now > contest['start_time']:
-                    return False, "Contest has already started"
-                    
-                # Check if user is already registered
-                if db.contest_registrations.find_one({
-                    'contest_id': ObjectId(contest_id),
-                    'user_id': ObjectId(user_id)
-                }, session=session):
-                    return False, "User is already registered for this contest"
-                    
-                # Register user
-                db.contest_registrations.insert_one({
-                    'contest_id': ObjectId(contest_id),
-                    'user_id': ObjectId(user_id),
-                    'registered_at': now
-                }, session=session)
-                
-                return True, "Registration successful"
+        # Check if contest exists and is open for registration
+        window = contest_catalog_service.get_contest_window(contest_id)
+        if not window:
+            return False, "Contest not found"
+
+        start_time, _, registration_end = window
+        now = datetime.utcnow()
+        if registration_end and now > registration_end:
+            return False, "Registration period has ended"
+
+        if not start_time or now > start_time:
+            return False, "Contest has already started"
+
+        # The unique (contest_id, user_id) index rejects repeat registrations
+        ensure_indexes('contest_registrations')
+        db.contest_registrations.insert_one({
+            'contest_id': ObjectId(contest_id),
+            'user_id': ObjectId(user_id),
+            'registered_at': now
+        })
+    except DuplicateKeyError:
+        _remember_registration(contest_id, user_id)
+        return False, "User is already registered for this contest"
     except Exception as e:
         # Consider logging the exception here: log_exception(e)
         return False, f"Registration failed: {str(e)}"
 
+    _remember_registration(contest_id, user_id)
+    return True, "Registration successful"
+
 def submit_contest_solution(contest_id, problem_id, user_id, solution):
     """Submit a solution for a contest problem"""
     db = get_db()
-    client = get_db_client()
     
     try:
-        with client.start_session() as session:
-            with session.start_transaction():
-                # Check if contest exists and is active
-                contest = db.contests.find_one({'_id': ObjectId(contest_id)}, session=session)
-                
-                if not contest:
-                    return False, "Contest not found", None
-                    
-                now = datetime.utcnow()
-                if now < contest['start_time']:
-                    return False, "Contest has not started yet", None
-                    
-                if now > contest['end_time']:
-                    return False, "Contest has ended", None
-                    
-                # Check if problem belongs to contest
-                # Note: contest['problems'] contains ObjectIds, so direct comparison is fine
-                if ObjectId(problem_id) not in contest.get('problems', []):
-                    return False, "Problem is not part of this contest", None
-                    
-                # Check if user is registered for contest
-                if not db.contest_registrations.find_one({
-                    'contest_id': ObjectId(contest_id),
-                    'user_id': ObjectId(user_id)
-                }, session=session):
-                    return False, "User is not registered for this contest", None
-                    
-                # Create submission
-                submission = {
-                    'contest_id': ObjectId(contest_id),
-                    'problem_id': ObjectId(problem_id),
-                    'user_id': ObjectId(user_id),
-                    'solution': solution,
-                    'submitted_at': now,
-                    'status': 'pending'  # Will be processed by evaluation service
-                }
-                
-                result = db.submissions.insert_one(submission, session=session)
-                
-                return True, "Solution submitted successfully", str(result.inserted_id)
+        # Check if contest exists and is active
+        window = contest_catalog_service.get_contest_window(contest_id)
+        if not window:
+            return False, "Contest not found", None
+
+        start_time, end_time, _ = window
+        now = datetime.utcnow()
+        if not start_time or now < start_time:
+            return False, "Contest has not started yet", None
+
+        if not end_time or now > end_time:
+            return False, "Contest has ended", None
+
+        # Check if problem belongs to contest
+        if not contest_catalog_service.contest_has_problem(contest_id, problem_id):
+            return False, "Problem is not part of this contest", None
+
+        # Check if user is registered for contest
+        if not is_user_registered(contest_id, user_id):
+            return False, "User is not registered for this contest", None
+
+        # Create submission
+        submission = {
+            'contest_id': ObjectId(contest_id),
+            'problem_id': ObjectId(problem_id),
+            'user_id': ObjectId(user_id),
+            'solution': solution,
+            'submitted_at': now,
+            'status': 'pending'  # Will be processed by evaluation service
+        }
+
+        result = db.submissions.insert_one(submission)
+
+        return True, "Solution submitted successfully", str(result.inserted_id)
     except Exception as e:
         # Consider logging the exception here: log_exception(e)
-        return False, f"Submission failed: {str(e)}", None
\ No newline at end of file
+        return False, f"Submission failed: {str(e)}", None
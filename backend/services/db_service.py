@@ -5,6 +5,7 @@ import sys
 from datetime import datetime, timezone
 from datetime import datetime, timezone
 from bson import ObjectId
+from utils.date_utils import to_utc_datetime
 
 # Fix the import error by changing from relative to absolute import
 sys.path.append('/Users/daoming/Documents/Github/goAIME')
@@ -66,52 +67,6 @@ def close_db():
         _client.close()
         _client = None
 
-def create_indexes():
-    """Create necessary database indexes"""
-    db = get_db()
-    
-    # Users collection indexes
-    db.users.create_index('email', unique=True)
-    db.users.create_index('username', unique=True)
-    
-    # Problems collection indexes
-    db.problems.create_index('title')
-    db.problems.create_index('difficulty')
-    db.problems.create_index('category')
-    db.problems.create_index([('created_at', -1)])
-    db.problems.create_index('contest_id')
-    db.problems.create_index('problem_number')
-    db.problems.create_index([('contest_id', 1), ('problem_number', 1)])
-    
-    # Contests collection indexes
-    db.contests.create_index('title')
-    db.contests.create_index('start_time')
-    db.contests.create_index('end_time')
-    db.contests.create_index('published')
-    
-    # Submissions collection indexes
-    db.submissions.create_index([('user_id', 1), ('problem_id', 1)])
-    db.submissions.create_index([('contest_id', 1), ('problem_id', 1)])
-    
-    # Problem Sessions collection indexes
-    # TTL index for automatic cleanup of old sessions after 48 hours of inactivity
-    db.problem_sessions.create_index("last_updated_at", expireAfterSeconds=172800)
-    
-    # User Sessions collection indexes
-    db.sessions.create_index([('username', 1), ('session_id', 1)])
-    db.sessions.create_index('created_at')
-    db.sessions.create_index('score')
-    db.sessions.create_index('total_attempted')
-    db.sessions.create_index([('username', 1), ('created_at', -1)])
-    db.sessions.create_index([('username', 1), ('score', -1)])
-    db.sessions.create_index([('contest', 1), ('year', 1)])
-    db.sessions.create_index('mode')
-    db.sessions.create_index('session_status')
-    db.sessions.create_index('performance_metrics.total_metrics.total_correct')
-    db.sessions.create_index('performance_metrics.average_metrics.accuracy_percentage')
-    
-    logger.info("Database indexes created successfully")
-
 def save_user_session(username, session_data):
     """
     Save a user session to the database with enhanced problem tracking
@@ -168,6 +123,16 @@ def save_user_session(username, session_data):
         }
         result = db.sessions.insert_one(document)
         logger.info(f"Created new session: {result.inserted_id}")
+        
+        # Keep the user's summary stats current without a write on the save path
+        if username:
+            from services.write_buffer_service import buffer_update
+            buffer_update(
+                'users',
+                {'username': username},
+                inc_fields={'stats.session_count': 1},
+                max_fields={'stats.best_score': enhanced_session_data.get('score', 0)}
+            )
         return str(result.inserted_id)
 
 
@@ -296,9 +261,9 @@ def enhance_session_data(session_data, username=None):
     # If user_id is still missing, try to look it up by username
     if not user_id and final_username:
         try:
-            user_doc = db.users.find_one({"username": final_username})
-            if user_doc:
-                user_id = str(user_doc.get('_id'))
+            # Imported here: the identity service itself depends on this module
+            from services.identity_service import get_user_id_by_username
+            user_id = get_user_id_by_username(final_username)
         except Exception:
             pass
     
@@ -306,8 +271,9 @@ def enhance_session_data(session_data, username=None):
     enhanced_data = {
         'session_id': session_data.get('session_id'),
         'session_status': session_data.get('session_status', 'completed'),
-        'created_at': session_data.get('created_at', datetime.now(timezone.utc)),
-        'completed_at': session_data.get('completed_at', datetime.now(timezone.utc).isoformat()),
+        # Dates are always stored as BSON dates (clients may send ISO strings)
+        'created_at': to_utc_datetime(session_data.get('created_at')) or datetime.now(timezone.utc),
+        'completed_at': to_utc_datetime(session_data.get('completed_at')) or datetime.now(timezone.utc),
         'username': final_username,
         'user_id': user_id,
         'year': session_data.get('year'),
@@ -0,0 +1,301 @@
+"""
+Batch grading of contest submissions.
+
+Contest submissions are written as 'pending' and graded here, off the request
+path. Workers claim submissions one at a time with find_one_and_update, which
+marks each as 'grading' under a lease (owner and expiry), so any number of
+worker processes can run side by side without grading anything twice; a lease
+left behind by a crashed worker expires and the submission is claimed again.
+A claimed batch is graded against the current answers of its problems, read
+with one query per batch (so an edited correct_answer takes effect on the
+next batch in every worker process), and written back with a single
+unordered bulk_write.
+"""
+
+import os
+import re
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from services.db_service import get_db
+from utils.logging_utils import log_event, log_exception
+
+# Submissions claimed per batch
+DEFAULT_BATCH_SIZE = 100
+# How long a claimed submission stays reserved for its worker
+DEFAULT_LEASE_SECONDS = 60
+# Sleep between polls when the queue is empty
+DEFAULT_POLL_INTERVAL = 1.0
+# Window for the throughput and lag metrics
+METRICS_WINDOW_SECONDS = 60
+
+# "D", "(D)", "D)", "D) $\frac{109}{33}$" (but not free text such as "a cat")
+_CHOICE_PATTERN = re.compile(r'^\(?([A-Ea-e])(?:\)(?:\s.*)?)?$', re.DOTALL)
+# AIME answers are integers 0-999, possibly zero-padded or wrapped in $...$
+_INTEGER_PATTERN = re.compile(r'^\$?\s*(\d{1,3})\s*\$?$')
+
+_metrics_lock = threading.Lock()
+_recent_batches = deque()   # (finished_at, graded, total_lag_seconds, max_lag_seconds)
+_totals = {'graded': 0, 'errors': 0, 'batches': 0}
+
+def normalize_answer(value):
+    """
+    Normalize an answer for comparison
+
+    Multiple-choice answers reduce to their upper-case letter and AIME answers
+    to a canonical integer string; anything else is compared as trimmed,
+    lower-cased text.
+
+    Returns:
+        str: Normalized answer, or None for an empty answer
+    """
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return str(value)
+
+    text = str(value).strip()
+    if not text:
+        return None
+
+    match = _CHOICE_PATTERN.match(text)
+    if match:
+        return match.group(1).upper()
+
+    match = _INTEGER_PATTERN.match(text)
+    if match:
+        return str(int(match.group(1)))
+
+    return text.lower()
+
+def get_answer_key(problem_ids):
+    """
+    Read the current answers of the given problems
+
+    Read from the database on every batch rather than from the in-process
+    catalog, which long-running workers would never see refreshed.
+
+    Args:
+        problem_ids (iterable): Problem IDs (ObjectId or str)
+
+    Returns:
+        dict: problem_id string -> normalized answer
+    """
+    ids = {ObjectId(problem_id) for problem_id in problem_ids if ObjectId.is_valid(problem_id)}
+    if not ids:
+        return {}
+
+    key = {}
+    for problem in get_db().problems.find({'_id': {'$in': list(ids)}}, {'correct_answer': 1}):
+        answer = normalize_answer(problem.get('correct_answer'))
+        if answer is not None:
+            key[str(problem['_id'])] = answer
+    return key
+
+def new_worker_id():
+    """Generate an ID identifying this worker in submission leases"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+def claim_batch(worker_id, batch_size=DEFAULT_BATCH_SIZE, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """
+    Claim up to batch_size pending submissions, oldest first
+
+    Args:
+        worker_id (str): Lease owner
+        batch_size (int): Maximum number of submissions to claim
+        lease_seconds (int): Lease duration
+
+    Returns:
+        list: Claimed submission documents
+    """
+    db = get_db()
+    claimed = []
+
+    for _ in range(batch_size):
+        now = datetime.utcnow()
+        submission = db.submissions.find_one_and_update(
+            {'$or': [
+                {'status': 'pending'},
+                # Lease abandoned by a worker that died mid-batch
+                {'status': 'grading', 'lease_expires_at': {'$lt': now}}
+            ]},
+            {'$set': {
+                'status': 'grading',
+                'lease_owner': worker_id,
+                'lease_expires_at': now + timedelta(seconds=lease_seconds)
+            }},
+            sort=[('submitted_at', ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+        if not submission:
+            break
+        claimed.append(submission)
+
+    return claimed
+
+def grade_submission(submission, answer_key):
+    """
+    Grade a single submission
+
+    Returns:
+        tuple: (status, results) where status is 'graded' or 'error'
+    """
+    expected = answer_key.get(str(submission.get('problem_id')))
+    if expected is None:
+        return 'error', {'error': 'No answer key for problem'}
+
+    correct = normalize_answer(submission.get('solution')) == expected
+    return 'graded', {'correct': correct, 'score': 1 if correct else 0}
+
+def grade_batch(worker_id, submissions):
+    """
+    Grade claimed submissions and write the results back in one bulk_write
+
+    Args:
+        worker_id (str): Lease owner the submissions were claimed by
+        submissions (list): Claimed submission documents
+
+    Returns:
+        dict: Batch summary (graded, errors, written, max_lag_seconds)
+    """
+    if not submissions:
+        return {'graded': 0, 'errors': 0, 'written': 0, 'max_lag_seconds': 0}
+
+    answer_key = get_answer_key(submission.get('problem_id') for submission in submissions)
+    now = datetime.utcnow()
+    operations = []
+    errors = 0
+    total_lag = max_lag = 0.0
+
+    for submission in submissions:
+        status, results = grade_submission(submission, answer_key)
+        errors += status == 'error'
+
+        lag = (now - submission['submitted_at']).total_seconds() if submission.get('submitted_at') else 0.0
+        total_lag += lag
+        max_lag = max(max_lag, lag)
+
+        operations.append(UpdateOne(
+            # Only write if the lease was not lost to another worker meanwhile
+            {'_id': submission['_id'], 'lease_owner': worker_id},
+            {
+                '$set': {'status': status, 'results': results, 'graded_at': now},
+                '$unset': {'lease_owner': '', 'lease_expires_at': ''}
+            }
+        ))
+
+    result = get_db().submissions.bulk_write(operations, ordered=False)
+    _record_batch(len(submissions), errors, total_lag, max_lag)
+
+    return {
+        'graded': len(submissions) - errors,
+        'errors': errors,
+        'written': result.modified_count,
+        'max_lag_seconds': round(max_lag, 3)
+    }
+
+def _record_batch(count, errors, total_lag, max_lag):
+    finished_at = time.monotonic()
+    with _metrics_lock:
+        _totals['graded'] += count - errors
+        _totals['errors'] += errors
+        _totals['batches'] += 1
+        _recent_batches.append((finished_at, count, total_lag, max_lag))
+        while _recent_batches and _recent_batches[0][0] < finished_at - METRICS_WINDOW_SECONDS:
+            _recent_batches.popleft()
+
+def get_worker_metrics():
+    """
+    Get grading metrics for workers running in this process
+
+    Returns:
+        dict: Totals plus throughput and lag over the last METRICS_WINDOW_SECONDS
+    """
+    cutoff = time.monotonic() - METRICS_WINDOW_SECONDS
+    with _metrics_lock:
+        recent = [batch for batch in _recent_batches if batch[0] >= cutoff]
+        totals = dict(_totals)
+
+    processed = sum(batch[1] for batch in recent)
+    return {
+        **totals,
+        'window_seconds': METRICS_WINDOW_SECONDS,
+        'submissions_per_second': round(processed / METRICS_WINDOW_SECONDS, 3),
+        'average_lag_seconds': round(sum(batch[2] for batch in recent) / processed, 3) if processed else None,
+        'max_lag_seconds': round(max(batch[3] for batch in recent), 3) if recent else None
+    }
+
+def get_queue_metrics():
+    """
+    Get grading metrics from the database, covering every worker process
+
+    Returns:
+        dict: Queue depth, age of the oldest pending submission, and recent throughput and lag
+    """
+    db = get_db()
+    now = datetime.utcnow()
+    since = now - timedelta(seconds=METRICS_WINDOW_SECONDS)
+
+    oldest = db.submissions.find_one(
+        {'status': 'pending'}, {'submitted_at': 1}, sort=[('submitted_at', ASCENDING)]
+    )
+    recent = list(db.submissions.aggregate([
+        {'$match': {'status': {'$in': ['graded', 'error']}, 'graded_at': {'$gte': since}}},
+        {'$project': {'lag': {'$subtract': ['$graded_at', '$submitted_at']}}},
+        {'$group': {'_id': None, 'count': {'$sum': 1}, 'avg_lag': {'$avg': '$lag'}, 'max_lag': {'$max': '$lag'}}}
+    ]))
+    recent = recent[0] if recent else {'count': 0, 'avg_lag': None, 'max_lag': None}
+
+    return {
+        'pending': db.submissions.count_documents({'status': 'pending'}),
+        'in_progress': db.submissions.count_documents({'status': 'grading'}),
+        'oldest_pending_seconds': round((now - oldest['submitted_at']).total_seconds(), 3) if oldest else None,
+        'window_seconds': METRICS_WINDOW_SECONDS,
+        'graded_in_window': recent['count'],
+        'submissions_per_second': round(recent['count'] / METRICS_WINDOW_SECONDS, 3),
+        # $subtract on dates yields milliseconds
+        'average_lag_seconds': round(recent['avg_lag'] / 1000, 3) if recent['avg_lag'] is not None else None,
+        'max_lag_seconds': round(recent['max_lag'] / 1000, 3) if recent['max_lag'] is not None else None
+    }
+
+def run_worker(batch_size=DEFAULT_BATCH_SIZE, lease_seconds=DEFAULT_LEASE_SECONDS,
+               poll_interval=DEFAULT_POLL_INTERVAL, stop_event=None, once=False):
+    """
+    Claim and grade submissions until stopped
+
+    Args:
+        batch_size (int): Submissions claimed per batch
+        lease_seconds (int): Lease duration for claimed submissions
+        poll_interval (float): Seconds to wait when the queue is empty
+        stop_event (threading.Event): Set to stop the worker (optional)
+        once (bool): Drain the queue once and return instead of polling
+
+    Returns:
+        dict: Worker metrics when the worker stops
+    """
+    worker_id = new_worker_id()
+    stop_event = stop_event or threading.Event()
+    log_event('grading.worker_started', {'worker_id': worker_id, 'batch_size': batch_size})
+
+    while not stop_event.is_set():
+        try:
+            submissions = claim_batch(worker_id, batch_size, lease_seconds)
+            if submissions:
+                summary = grade_batch(worker_id, submissions)
+                log_event('grading.batch', {'worker_id': worker_id, **summary}, level='debug')
+                continue
+        except Exception as e:
+            log_exception(e, {'worker_id': worker_id})
+
+        if once:
+            break
+        stop_event.wait(poll_interval)
+
+    metrics = get_worker_metrics()
+    log_event('grading.worker_stopped', {'worker_id': worker_id, **metrics})
+    return metrics
@@ -0,0 +1,113 @@
+"""
+Cached identity lookups for authenticated requests.
+
+Verified JWTs are cached by token string until they expire (or CLAIMS_TTL,
+whichever is sooner), user roles by user ID, and user IDs by username, so
+in steady state an authenticated or admin request decodes nothing and reads
+no user document. Anything that changes a user's role or identity must call
+invalidate_user; role entries also expire after ROLE_TTL, which bounds how
+long another process can serve a stale role.
+"""
+
+import time
+import jwt
+from bson.objectid import ObjectId
+from flask import current_app
+from services.db_service import get_db
+from utils.cache_utils import TTLCache
+
+# Longest a verified token is trusted without decoding it again
+CLAIMS_TTL = 300
+# Longest a role is served from cache (other processes' role changes become visible after this)
+ROLE_TTL = 60
+# User IDs never change for a username, but usernames can be freed by deleting a user
+USER_ID_TTL = 3600
+MAX_ENTRIES = 10000
+
+_claims = TTLCache(MAX_ENTRIES, CLAIMS_TTL)     # token -> decoded payload
+_roles = TTLCache(MAX_ENTRIES, ROLE_TTL)        # user_id -> role
+_user_ids = TTLCache(MAX_ENTRIES, USER_ID_TTL)  # username -> user_id
+
+def verify_token_claims(token):
+    """
+    Verify a JWT and return its payload
+
+    Returns:
+        dict: Decoded payload, or None if the token is invalid or expired
+    """
+    claims = _claims.get(token)
+    if claims is not None:
+        if claims.get('exp', 0) > time.time():
+            return claims
+        _claims.pop(token)
+        return None
+
+    try:
+        claims = jwt.decode(
+            token,
+            current_app.config.get('JWT_SECRET_KEY', 'dev-secret-key'),
+            algorithms=['HS256']
+        )
+    except jwt.InvalidTokenError:
+        return None
+
+    remaining = claims.get('exp', 0) - time.time()
+    if remaining > 0:
+        _claims.set(token, claims, ttl=min(CLAIMS_TTL, remaining))
+    return claims
+
+def get_user_role(user_id):
+    """
+    Get a user's role
+
+    Returns:
+        str: The role, or None if the user does not exist
+    """
+    user_id = str(user_id)
+    role = _roles.get(user_id)
+    if role is not None:
+        return role
+
+    if not ObjectId.is_valid(user_id):
+        return None
+    user = get_db().users.find_one({'_id': ObjectId(user_id)}, {'role': 1, 'username': 1})
+    if not user:
+        return None
+
+    role = user.get('role', 'user')
+    _roles.set(user_id, role)
+    if user.get('username'):
+        _user_ids.set(user['username'], user_id)
+    return role
+
+def get_user_id_by_username(username):
+    """
+    Get a user's ID from their username
+
+    Returns:
+        str: The user ID, or None if no user has this username
+    """
+    user_id = _user_ids.get(username)
+    if user_id is not None:
+        return user_id
+
+    user = get_db().users.find_one({'username': username}, {'_id': 1})
+    if not user:
+        return None
+
+    user_id = str(user['_id'])
+    _user_ids.set(username, user_id)
+    return user_id
+
+def invalidate_user(user_id=None, username=None):
+    """Drop cached identity data after a user's role, username or existence changed"""
+    if user_id is not None:
+        _roles.pop(str(user_id))
+    if username is not None:
+        _user_ids.pop(username)
+
+def clear_identity_cache():
+    """Drop every cached token, role and user ID (e.g. after rotating JWT_SECRET_KEY)"""
+    _claims.clear()
+    _roles.clear()
+    _user_ids.clear()
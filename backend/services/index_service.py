@@ -0,0 +1,239 @@
+"""
+Declarative index registry.
+
+Every index the application relies on is declared once in INDEXES. At
+startup reconcile_indexes() compares the declarations with list_indexes()
+and builds only what is missing, in a background thread, so booting a
+worker costs one listIndexes per collection instead of a create_index
+round trip per index. get_index_report() adds $indexStats usage so unused
+(write-amplifying) indexes can be found and dropped.
+"""
+
+import threading
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from services.db_service import get_db
+from utils.logging_utils import log_event, log_exception
+
+# Options that distinguish two indexes on the same keys
+_COMPARED_OPTIONS = ('unique', 'sparse', 'expireAfterSeconds')
+
+def _index(keys, **options):
+    if isinstance(keys, str):
+        keys = [(keys, ASCENDING)]
+    return {'keys': tuple(keys), 'options': options}
+
+INDEXES = {
+    'users': [
+        _index('email', unique=True),
+        _index('username', unique=True),
+    ],
+    'problems': [
+        _index('title'),
+        _index('difficulty'),
+        _index('category'),
+        # Keyset pagination over the newest problems
+        _index([('created_at', DESCENDING), ('_id', DESCENDING)]),
+        _index('contest_id'),
+        _index('problem_number'),
+        _index([('contest_id', ASCENDING), ('problem_number', ASCENDING)]),
+        # Catalog sync in every process polls for recently updated problems
+        _index('updated_at'),
+    ],
+    'contests': [
+        _index('title'),
+        _index('start_time'),
+        _index('end_time'),
+        _index('published'),
+    ],
+    'contest_registrations': [
+        # Unique so that registering is a single insert (duplicates raise DuplicateKeyError)
+        _index([('contest_id', ASCENDING), ('user_id', ASCENDING)], unique=True),
+    ],
+    'submissions': [
+        _index([('user_id', ASCENDING), ('problem_id', ASCENDING)]),
+        _index([('contest_id', ASCENDING), ('problem_id', ASCENDING)]),
+        # Grading workers claim the oldest pending submissions; also serves status-only queries
+        _index([('status', ASCENDING), ('submitted_at', ASCENDING)]),
+        # Leaderboards follow submissions as they are graded
+        _index('graded_at'),
+    ],
+    'assets': [
+        # An upload replaces the owner's asset in the same slot
+        _index([('user_id', ASCENDING), ('asset_type', ASCENDING), ('metadata.name', ASCENDING)]),
+    ],
+    'asset_blobs': [
+        # Unreferenced blob collection
+        _index([('ref_count', ASCENDING), ('released_at', ASCENDING)]),
+    ],
+    'asset_uploads': [
+        # Pending direct uploads are forgotten after a day (the staged object expires by bucket lifecycle)
+        _index('created_at', expireAfterSeconds=86400),
+    ],
+    'problem_sessions': [
+        # TTL index for automatic cleanup of old sessions after 48 hours of inactivity
+        _index('last_updated_at', expireAfterSeconds=172800),
+    ],
+    'sessions': [
+        _index([('username', ASCENDING), ('session_id', ASCENDING)]),
+        _index('created_at'),
+        _index([('username', ASCENDING), ('created_at', DESCENDING)]),
+        # Per-user history, newest first (stats and progress dashboards)
+        _index([('username', ASCENDING), ('completed_at', DESCENDING)]),
+        _index([('username', ASCENDING), ('score', DESCENDING)]),
+        _index([('contest', ASCENDING), ('year', ASCENDING)]),
+        _index('mode'),
+        _index('session_status'),
+        _index('performance_metrics.total_metrics.total_correct'),
+        _index('performance_metrics.average_metrics.accuracy_percentage'),
+    ],
+}
+
+_build_thread = None
+_ensured = set()      # collections checked by ensure_indexes() in this process
+
+def _key_signature(keys):
+    return tuple((field, direction) for field, direction in keys)
+
+def _option_signature(options):
+    return {name: options[name] for name in _COMPARED_OPTIONS if options.get(name)}
+
+def _diff_collection(db, collection, declared):
+    existing = {}
+    for info in db[collection].list_indexes():
+        if info['name'] != '_id_':
+            existing[_key_signature(info['key'].items())] = info
+
+    missing, conflicting = [], []
+    for index in declared:
+        info = existing.pop(_key_signature(index['keys']), None)
+        if info is None:
+            missing.append(index)
+        elif _option_signature(info) != _option_signature(index['options']):
+            # Same keys, different options: needs a manual drop, never done automatically
+            conflicting.append((index, info['name']))
+
+    return {
+        'missing': missing,
+        'conflicting': conflicting,
+        'undeclared': [info['name'] for info in existing.values()]
+    }
+
+def diff_indexes(db=None):
+    """
+    Compare declared indexes with the ones that exist
+
+    Returns:
+        dict: collection -> {'missing': [declared index], 'conflicting': [(declared, existing name)],
+            'undeclared': [existing index name]}
+    """
+    db = db if db is not None else get_db()
+    return {collection: _diff_collection(db, collection, declared) for collection, declared in INDEXES.items()}
+
+def ensure_indexes(collection):
+    """
+    Make sure a collection's declared indexes exist, building missing ones now
+
+    For code whose correctness depends on an index (e.g. duplicates rejected
+    by a unique index) and cannot rely on the background build started by
+    reconcile_indexes(). Checked once per process per collection.
+
+    Raises:
+        RuntimeError: A declared index exists with different options
+        OperationFailure: A missing index could not be built (e.g. existing duplicates)
+    """
+    if collection in _ensured:
+        return
+
+    db = get_db()
+    changes = _diff_collection(db, collection, INDEXES[collection])
+    if changes['conflicting']:
+        names = ', '.join(name for _, name in changes['conflicting'])
+        raise RuntimeError(f"Indexes on {collection} differ from their declaration: {names}")
+    if changes['missing']:
+        names = db[collection].create_indexes([
+            IndexModel(list(index['keys']), **index['options']) for index in changes['missing']
+        ])
+        log_event('db.indexes_built', {'collection': collection, 'indexes': names})
+
+    _ensured.add(collection)
+
+def _build_missing(plan):
+    db = get_db()
+    for collection, changes in plan.items():
+        if not changes['missing']:
+            continue
+        try:
+            names = db[collection].create_indexes([
+                IndexModel(list(index['keys']), **index['options']) for index in changes['missing']
+            ])
+            log_event('db.indexes_built', {'collection': collection, 'indexes': names})
+        except OperationFailure as e:
+            log_exception(e, {'collection': collection})
+
+def reconcile_indexes(background=True):
+    """
+    Build declared indexes that do not exist yet
+
+    Args:
+        background (bool): Build in a daemon thread and return immediately
+
+    Returns:
+        dict: The plan from diff_indexes()
+    """
+    global _build_thread
+
+    plan = diff_indexes()
+    summary = {
+        collection: {
+            'missing': len(changes['missing']),
+            'conflicting': [name for _, name in changes['conflicting']],
+            'undeclared': changes['undeclared']
+        }
+        for collection, changes in plan.items()
+        if changes['missing'] or changes['conflicting'] or changes['undeclared']
+    }
+    log_event('db.indexes_reconciled', summary or {'status': 'up to date'})
+
+    if any(changes['missing'] for changes in plan.values()):
+        if background:
+            _build_thread = threading.Thread(target=_build_missing, args=(plan,), name='index-build', daemon=True)
+            _build_thread.start()
+        else:
+            _build_missing(plan)
+
+    return plan
+
+def get_index_report():
+    """
+    Report every index with its $indexStats usage
+
+    Counters reset when the server restarts and are per replica set member,
+    so judge "unused" over a long enough uptime before dropping anything.
+
+    Returns:
+        dict: collection -> list of {name, key, declared, ops, since}
+    """
+    db = get_db()
+    report = {}
+
+    for collection in sorted(set(INDEXES) | set(db.list_collection_names())):
+        if collection.startswith('system.'):
+            continue
+        declared = {_key_signature(index['keys']) for index in INDEXES.get(collection, [])}
+        entries = []
+        try:
+            for stats in db[collection].aggregate([{'$indexStats': {}}]):
+                entries.append({
+                    'name': stats['name'],
+                    'key': dict(stats['key']),
+                    'declared': stats['name'] == '_id_' or _key_signature(stats['key'].items()) in declared,
+                    'ops': stats['accesses']['ops'],
+                    'since': stats['accesses']['since']
+                })
+        except OperationFailure as e:
+            log_exception(e, {'collection': collection})
+            continue
+        report[collection] = sorted(entries, key=lambda entry: entry['ops'])
+
+    return report
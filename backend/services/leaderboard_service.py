@@ -0,0 +1,379 @@
+"""
+Live contest leaderboards.
+
+Each watched contest has an in-memory board: the problems every contestant
+has solved and a sorted list of rank keys (-solved, penalty, user_id), so a
+rank is one bisect and the top k is a slice. Penalty is the total time from
+contest start to each first correct submission. Boards are loaded once from
+the graded submissions, then kept current by a single background sync per
+process that reads submissions graded since the previous pass; however many
+clients watch a board, Mongo sees one query per sync interval.
+
+Clients follow a board over server-sent events. A stream waits for the
+board's version to change and then sends the latest snapshot, so any number
+of changes between two sends are coalesced into one event, and the encoded
+snapshot is shared by every stream watching the board. A stream ends when
+its board is dropped (contest unpublished) and clients reconnect.
+
+Every open stream occupies a server thread for as long as it is followed.
+With sync workers that is a whole worker thread per watcher, so streams are
+capped at MAX_STREAMS per process (further requests get 503) and the
+stream endpoint should be served by workers with an async worker class
+(e.g. gunicorn -k gevent), where a waiting stream costs a greenlet.
+"""
+
+import json
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from bson.objectid import ObjectId
+from services import contest_catalog_service
+from services.db_service import get_db
+from utils.logging_utils import log_event, log_exception
+
+# Entries sent in a snapshot
+DEFAULT_TOP_K = 50
+# Seconds between syncs of graded submissions into the boards
+SYNC_INTERVAL_SECONDS = 1.0
+# Re-read window covering graders whose bulk_write lands after a later sync started
+SYNC_LOOKBACK_SECONDS = 10
+# Minimum seconds between two events on one stream
+STREAM_MIN_INTERVAL_SECONDS = 1.0
+# A comment line is sent after this many idle seconds to keep proxies from closing the stream
+STREAM_HEARTBEAT_SECONDS = 15
+# Boards nobody has read or watched for this long are dropped
+BOARD_IDLE_SECONDS = 3600
+# Open streams allowed per process (each holds a server thread or greenlet)
+MAX_STREAMS = 100
+
+_lock = threading.RLock()
+_boards = {}          # contest_id -> _Board
+_sync_thread = None
+_sync_since = None    # start of the previous sync (graded_at watermark)
+_stream_slots = threading.BoundedSemaphore(MAX_STREAMS)
+
+class _Board:
+    """Ranking state for one contest (all access under the module lock)"""
+
+    def __init__(self, contest_id, start_time):
+        self.contest_id = contest_id
+        self.start_time = start_time
+        self.solved = {}       # user_id -> {problem_id: seconds from start}
+        self.keys = []         # sorted (-solved, penalty, user_id)
+        self.key_by_user = {}
+        self.usernames = {}
+        self.version = 0
+        self.watchers = 0
+        self.closed = False    # Dropped from the registry; streams end
+        self.last_used = time.monotonic()
+        self.changed = threading.Condition(_lock)
+        self._payload = None   # (version, encoded snapshot)
+
+    def apply(self, user_id, problem_id, submitted_at):
+        """Record a correct submission; returns False if the problem was already solved"""
+        solved = self.solved.setdefault(user_id, {})
+        if problem_id in solved:
+            return False
+
+        old_key = self.key_by_user.get(user_id)
+        if old_key is not None:
+            del self.keys[bisect_left(self.keys, old_key)]
+
+        elapsed = (submitted_at - self.start_time).total_seconds() if self.start_time and submitted_at else 0
+        solved[problem_id] = max(0, int(elapsed))
+
+        key = (-len(solved), sum(solved.values()), user_id)
+        insort(self.keys, key)
+        self.key_by_user[user_id] = key
+        return True
+
+    def rank(self, user_id):
+        """Competition rank (ties share a rank), or None if the user has not solved anything"""
+        key = self.key_by_user.get(user_id)
+        if key is None:
+            return None
+        # (solved, penalty) sorts before every (solved, penalty, user_id) in the tie group
+        return bisect_left(self.keys, key[:2]) + 1
+
+    def entry(self, key, rank):
+        return {
+            'rank': rank,
+            'user_id': key[2],
+            'username': self.usernames.get(key[2]),
+            'solved': -key[0],
+            'penalty_seconds': key[1]
+        }
+
+    def top(self, k):
+        entries = []
+        rank = 0
+        previous = None
+        for index, key in enumerate(self.keys[:k]):
+            if key[:2] != previous:
+                rank, previous = index + 1, key[:2]
+            entries.append(self.entry(key, rank))
+        return entries
+
+    def snapshot(self, k=DEFAULT_TOP_K):
+        return {
+            'contest_id': self.contest_id,
+            'version': self.version,
+            'participants': len(self.keys),
+            'top': self.top(k)
+        }
+
+    def encoded_snapshot(self):
+        """The default snapshot as an SSE data payload, encoded once per version"""
+        if self._payload is None or self._payload[0] != self.version:
+            self._payload = (self.version, json.dumps(self.snapshot()))
+        return self._payload[1]
+
+def _correct_submissions(query):
+    query = dict(query, status='graded')
+    query['results.correct'] = True
+    return get_db().submissions.find(
+        query,
+        {'contest_id': 1, 'user_id': 1, 'problem_id': 1, 'submitted_at': 1}
+    ).sort('submitted_at', 1)
+
+def _fetch_usernames(user_ids):
+    """Look up usernames by user ID (never call while holding the lock)"""
+    ids = [ObjectId(user_id) for user_id in user_ids if ObjectId.is_valid(user_id)]
+    if not ids:
+        return {}
+    return {str(user['_id']): user.get('username') for user in get_db().users.find({'_id': {'$in': ids}}, {'username': 1})}
+
+def _load_board(contest_id):
+    """Build a board from the database (outside the lock; the board is not shared yet)"""
+    window = contest_catalog_service.get_contest_window(contest_id)
+    if not window or not ObjectId.is_valid(contest_id):
+        return None
+
+    board = _Board(contest_id, window[0])
+    for submission in _correct_submissions({'contest_id': ObjectId(contest_id)}):
+        board.apply(str(submission['user_id']), str(submission['problem_id']), submission.get('submitted_at'))
+    board.usernames.update(_fetch_usernames(list(board.solved)))
+    board.version = 1
+    return board
+
+def get_board(contest_id):
+    """
+    Get the live board for a contest, loading it on first use
+
+    Returns:
+        _Board: The board, or None if the contest does not exist or is not published
+    """
+    global _sync_since
+
+    if not contest_catalog_service.is_contest_published(contest_id):
+        with _lock:
+            _drop_board(contest_id)
+        return None
+
+    with _lock:
+        board = _boards.get(contest_id)
+        if board is None and _sync_since is None:
+            # Anything graded from now on is picked up by the sync
+            _sync_since = datetime.utcnow()
+
+    if board is None:
+        # Load without the lock so readers of other boards are not stalled by the queries
+        loaded = _load_board(contest_id)
+        if loaded is None:
+            return None
+        with _lock:
+            board = _boards.get(contest_id)
+            if board is None:
+                board = _boards[contest_id] = loaded
+                _start_sync_thread()
+                log_event('leaderboard.loaded', {'contest_id': contest_id, 'participants': len(board.keys)})
+
+    with _lock:
+        board.last_used = time.monotonic()
+    return board
+
+def get_leaderboard(contest_id, k=DEFAULT_TOP_K, user_id=None):
+    """
+    Get the top k of a contest leaderboard
+
+    Args:
+        contest_id (str): Contest ID
+        k (int): Number of entries
+        user_id (str): Also report this user's rank (optional)
+
+    Returns:
+        dict: Snapshot with top entries (and 'me' when user_id is given), or None if the contest does not exist
+    """
+    board = get_board(contest_id)
+    if board is None:
+        return None
+
+    with _lock:
+        snapshot = board.snapshot(k)
+        if user_id:
+            snapshot['me'] = _user_entry(board, str(user_id))
+        return snapshot
+
+def _user_entry(board, user_id):
+    rank = board.rank(user_id)
+    return board.entry(board.key_by_user[user_id], rank) if rank else None
+
+def sync_boards():
+    """
+    Apply submissions graded since the previous sync to every loaded board
+
+    Returns:
+        int: Number of boards that changed
+    """
+    global _sync_since
+
+    with _lock:
+        contest_ids = list(_boards)
+        since = _sync_since
+    if not contest_ids:
+        return 0
+
+    started = datetime.utcnow()
+    # Grading is idempotent on a board (first solve wins), so re-reading the lookback window is harmless
+    submissions = list(_correct_submissions({
+        'contest_id': {'$in': [ObjectId(contest_id) for contest_id in contest_ids]},
+        'graded_at': {'$gt': since - timedelta(seconds=SYNC_LOOKBACK_SECONDS)}
+    }))
+
+    # Resolve new contestants' names before taking the lock
+    with _lock:
+        unknown = set()
+        for submission in submissions:
+            board = _boards.get(str(submission['contest_id']))
+            if board and str(submission['user_id']) not in board.usernames:
+                unknown.add(str(submission['user_id']))
+    usernames = _fetch_usernames(unknown)
+
+    changed = {}   # board -> user IDs with new solves
+    with _lock:
+        for submission in submissions:
+            board = _boards.get(str(submission['contest_id']))
+            user_id = str(submission['user_id'])
+            if board and board.apply(user_id, str(submission['problem_id']), submission.get('submitted_at')):
+                changed.setdefault(board, set()).add(user_id)
+
+        for board, user_ids in changed.items():
+            for user_id in user_ids:
+                if user_id in usernames:
+                    board.usernames.setdefault(user_id, usernames[user_id])
+            board.version += 1
+            board.changed.notify_all()
+
+        _sync_since = started
+        _evict_idle_boards()
+
+    return len(changed)
+
+def _drop_board(contest_id):
+    """Remove a board and end its streams (caller holds the lock)"""
+    board = _boards.pop(contest_id, None)
+    if board is not None:
+        board.closed = True
+        board.changed.notify_all()
+
+def _evict_idle_boards():
+    """Drop boards without watchers that have not been read recently (caller holds the lock)"""
+    cutoff = time.monotonic() - BOARD_IDLE_SECONDS
+    for contest_id, board in list(_boards.items()):
+        if board.watchers == 0 and board.last_used < cutoff:
+            _drop_board(contest_id)
+
+def _sync_loop():
+    while True:
+        time.sleep(SYNC_INTERVAL_SECONDS)
+        try:
+            sync_boards()
+        except Exception as e:
+            log_exception(e, {'component': 'leaderboard_sync'})
+
+def _start_sync_thread():
+    """Start the background sync once per process (caller holds the lock)"""
+    global _sync_thread
+
+    if _sync_thread is None:
+        _sync_thread = threading.Thread(target=_sync_loop, name='leaderboard-sync', daemon=True)
+        _sync_thread.start()
+
+class _Stream:
+    """SSE response body holding one of the process's stream slots until it is closed"""
+
+    def __init__(self, events):
+        self._events = events
+        self._open = True
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._events)
+
+    def close(self):
+        # Called by the WSGI server when the response ends, even if it was never iterated
+        if self._open:
+            self._open = False
+            self._events.close()
+            _stream_slots.release()
+
+def stream_leaderboard(contest_id, user_id=None):
+    """
+    Open a server-sent event stream for a contest leaderboard
+
+    Sends a 'leaderboard' event with the current snapshot, then another each
+    time the board changes (at most one per STREAM_MIN_INTERVAL_SECONDS,
+    carrying the latest state). With user_id, each is followed by a 'rank'
+    event for that user. The stream ends once get_board() no longer returns
+    the board it follows (unpublished or dropped).
+
+    Args:
+        contest_id (str): Contest ID (the board must exist, see get_board)
+        user_id (str): Report this user's rank too (optional)
+
+    Returns:
+        Iterable of SSE-formatted events (pass it to the response unwrapped,
+        so the server's close() frees the slot), or None if MAX_STREAMS
+        streams are already open in this process
+    """
+    if not _stream_slots.acquire(blocking=False):
+        return None
+    return _Stream(_stream_events(contest_id, user_id))
+
+def _stream_events(contest_id, user_id):
+    board = get_board(contest_id)
+    if board is None:
+        return
+
+    with _lock:
+        board.watchers += 1
+    try:
+        version = None
+        # get_board also marks the board used, so it is not evicted while followed
+        while get_board(contest_id) is board:
+            with _lock:
+                if board.version == version:
+                    board.changed.wait_for(
+                        lambda: board.version != version or board.closed,
+                        timeout=STREAM_HEARTBEAT_SECONDS
+                    )
+                if board.closed:
+                    return
+
+                if board.version == version:
+                    events = ': heartbeat\n\n'
+                else:
+                    version = board.version
+                    events = f"event: leaderboard\nid: {version}\ndata: {board.encoded_snapshot()}\n\n"
+                    if user_id:
+                        events += f"event: rank\ndata: {json.dumps(_user_entry(board, str(user_id)))}\n\n"
+
+            yield events
+            # Coalesce: whatever changes arrive meanwhile go out as one event
+            time.sleep(STREAM_MIN_INTERVAL_SECONDS)
+    finally:
+        with _lock:
+            board.watchers -= 1
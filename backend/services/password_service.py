@@ -0,0 +1,183 @@
+"""
+Password hashing on a bounded process pool.
+
+bcrypt is deliberately slow (tens to hundreds of milliseconds of CPU per
+call). Running it on request threads lets a burst of logins occupy every
+core the API worker has. Hashes and checks run instead on a small dedicated
+process pool, and at most PASSWORD_HASH_MAX_PENDING operations may be
+running or queued at once. Past that, callers get PasswordHasherBusy
+immediately (the login route turns it into 503 with Retry-After) instead of
+everyone waiting behind the queue.
+
+This module is imported by the pool's worker processes, so it keeps its
+imports light.
+"""
+
+import multiprocessing
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+
+# Longest a caller waits for a queued hash before giving up
+HASH_TIMEOUT_SECONDS = 10
+# Retry-After hint for callers turned away while the pool is saturated
+RETRY_AFTER_SECONDS = 2
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool is saturated"""
+
+    def __init__(self, retry_after=RETRY_AFTER_SECONDS):
+        super().__init__("Password hashing is saturated")
+        self.retry_after = retry_after
+
+_lock = threading.Lock()
+_pool = None
+_slots = None          # BoundedSemaphore sized to the pending limit
+_workers = 0
+_max_pending = 0
+_metrics = {'in_flight': 0, 'completed': 0, 'rejected': 0, 'failed': 0, 'total_seconds': 0.0}
+
+def _hash(password):
+    return bcrypt.hashpw(password, bcrypt.gensalt())
+
+def _check(password, hashed):
+    return bcrypt.checkpw(password, hashed)
+
+def _get_pool():
+    global _pool, _slots, _workers, _max_pending
+
+    with _lock:
+        if _slots is None:
+            from config import get_config
+            config = get_config()
+            _workers = config.PASSWORD_HASH_WORKERS
+            _max_pending = config.PASSWORD_HASH_MAX_PENDING
+            # Created once: jobs of a pool that broke still release their slots here
+            _slots = threading.BoundedSemaphore(_max_pending)
+        if _pool is None:
+            # spawn: forking a process that holds MongoClient threads and locks is unsafe
+            _pool = ProcessPoolExecutor(max_workers=_workers, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+def _reset_pool(broken):
+    global _pool
+
+    with _lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False)
+
+def _release_slot(future):
+    _slots.release()
+    with _lock:
+        _metrics['in_flight'] -= 1
+
+def _run(function, *args):
+    pool = _get_pool()
+    if not _slots.acquire(blocking=False):
+        with _lock:
+            _metrics['rejected'] += 1
+        raise PasswordHasherBusy()
+
+    started = time.monotonic()
+    with _lock:
+        _metrics['in_flight'] += 1
+    try:
+        future = pool.submit(function, *args)
+    except BrokenProcessPool:
+        _release_slot(None)
+        return _broken(pool)
+    except BaseException:
+        _release_slot(None)
+        raise
+    # The slot stays taken until the pool has actually finished the job, even if
+    # this caller stops waiting, so MAX_PENDING bounds the work queued in the pool
+    future.add_done_callback(_release_slot)
+
+    try:
+        result = future.result(timeout=HASH_TIMEOUT_SECONDS)
+    except FuturesTimeoutError:
+        with _lock:
+            _metrics['failed'] += 1
+        raise PasswordHasherBusy()
+    except BrokenProcessPool:
+        return _broken(pool)
+
+    with _lock:
+        _metrics['completed'] += 1
+        _metrics['total_seconds'] += time.monotonic() - started
+    return result
+
+def _broken(pool):
+    """A worker died (e.g. OOM-killed); start a fresh pool for later calls and turn the caller away"""
+    _reset_pool(pool)
+    with _lock:
+        _metrics['failed'] += 1
+    raise PasswordHasherBusy()
+
+def hash_password(password):
+    """
+    Hash a password with bcrypt on the hashing pool
+
+    Returns:
+        bytes: bcrypt hash
+
+    Raises:
+        PasswordHasherBusy: If the pool is saturated, too slow or broken
+    """
+    return _run(_hash, password.encode('utf-8'))
+
+def check_password(password, hashed):
+    """
+    Check a password against a bcrypt hash on the hashing pool
+
+    Returns:
+        bool: True if the password matches
+
+    Raises:
+        PasswordHasherBusy: If the pool is saturated, too slow or broken
+    """
+    return _run(_check, password.encode('utf-8'), hashed)
+
+@contextmanager
+def bulk_hasher(workers=None):
+    """
+    Open a dedicated hashing pool for bulk jobs (never the request pool)
+
+    Args:
+        workers (int): Worker processes (defaults to every CPU)
+
+    Yields:
+        callable: hash_many(passwords) returning bcrypt hashes in the same order
+    """
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        def hash_many(passwords):
+            encoded = [password.encode('utf-8') for password in passwords]
+            return list(pool.map(_hash, encoded, chunksize=8))
+        yield hash_many
+
+def get_hasher_metrics():
+    """
+    Get hashing pool metrics
+
+    Returns:
+        dict: Pool size, pending limit, in-flight and queued operations, and totals
+    """
+    with _lock:
+        metrics = dict(_metrics)
+        workers, max_pending = _workers, _max_pending
+
+    completed = metrics.pop('completed')
+    total_seconds = metrics.pop('total_seconds')
+    return {
+        **metrics,
+        'workers': workers,
+        'max_pending': max_pending,
+        # Operations waiting for a free worker process
+        'queued': max(0, metrics['in_flight'] - workers),
+        'completed': completed,
+        'average_seconds': round(total_seconds / completed, 4) if completed else None
+    }
@@ -0,0 +1,109 @@
+"""
+Stateless practice sessions.
+
+Instead of storing the shuffled problem order in `problem_sessions`, the order
+is derived from a random seed and the contest's canonical problem list in the
+catalog. The session state (seed, contest, year, shuffle flag, index) lives in
+an HMAC-signed token held by the client, so starting and advancing a session
+needs no database writes. Each step returns a fresh token; replaying an older
+token returns the same problem again rather than skipping ahead.
+"""
+
+import random
+import secrets
+import time
+from flask import current_app
+from services import catalog_service
+from utils.security_utils import sign_payload, verify_signed_payload
+
+# Same lifetime as the problem_sessions TTL index
+SESSION_TOKEN_MAX_AGE_SECONDS = 172800
+
+def _contest_id(contest, year):
+    return f"{contest.replace(' ', '')}_{year}"
+
+def _signing_key():
+    # JWT_SECRET_KEY is stable across workers, unlike the random SECRET_KEY default
+    return current_app.config.get('JWT_SECRET_KEY', 'dev-secret-key')
+
+def session_order(contest, year, seed, shuffle):
+    """
+    Derive the problem order of a stateless session
+
+    Returns:
+        list: Problem numbers (strings) in session order
+    """
+    problem_numbers = catalog_service.get_contest_problem_numbers(_contest_id(contest, year))
+    if shuffle:
+        random.Random(seed).shuffle(problem_numbers)
+    return problem_numbers
+
+def _encode_state(state):
+    return sign_payload(state, _signing_key())
+
+def create_session_token(contest, year, shuffle=False):
+    """
+    Start a stateless session
+
+    Returns:
+        tuple: (token, problem_numbers), token is None if the contest has no problems
+    """
+    state = {
+        's': secrets.randbits(32),
+        'c': contest,
+        'y': year,
+        'x': bool(shuffle),
+        'i': 0,
+        't': int(time.time())
+    }
+    problem_numbers = session_order(contest, year, state['s'], state['x'])
+    if not problem_numbers:
+        return None, []
+
+    return _encode_state(state), problem_numbers
+
+def decode_session_token(token):
+    """
+    Verify a session token
+
+    Returns:
+        dict: Session state, or None if the token is invalid or expired
+    """
+    state = verify_signed_payload(token, _signing_key())
+    if not state:
+        return None
+
+    if time.time() - state.get('t', 0) > SESSION_TOKEN_MAX_AGE_SECONDS:
+        return None
+
+    return state
+
+def advance_session(state):
+    """
+    Resolve the current problem of a session and build the token for the next step
+
+    Args:
+        state (dict): Session state from decode_session_token
+
+    Returns:
+        tuple: (problem, session_progress, next_token); problem is None at the end of the set
+    """
+    problem_numbers = session_order(state['c'], state['y'], state['s'], state['x'])
+    index = state['i']
+    total = len(problem_numbers)
+
+    if index >= total:
+        return None, None, None
+
+    problem = catalog_service.get_contest_problem(
+        _contest_id(state['c'], state['y']),
+        problem_numbers[index]
+    )
+    session_progress = {
+        'current': index + 1, # User-facing index is 1-based
+        'total': total,
+        'remaining': total - (index + 1)
+    }
+    next_token = _encode_state({**state, 'i': index + 1})
+
+    return problem, session_progress, next_token
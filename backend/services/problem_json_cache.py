@@ -0,0 +1,87 @@
+"""
+Pre-serialized problem responses.
+
+Hot problem reads are answered with cached response bytes: the full
+success_response envelope for a problem is encoded once per (_id,
+last-modified) and written straight into the response, skipping model
+construction and JSON encoding. The problem update and delete services
+invalidate entries explicitly. Writes made by other processes are caught
+by reading the problem's last-modified from the database (a projected
+_id lookup) before trusting the cached bytes; when it differs from the
+in-process catalog, the catalog entry is refreshed first.
+"""
+
+import threading
+from collections import OrderedDict
+from bson.objectid import ObjectId
+from flask import current_app
+from services import catalog_service
+from services.db_service import get_db
+
+# Maximum number of serialized problems kept (least recently used are evicted)
+MAX_ENTRIES = 5000
+
+_lock = threading.Lock()
+_entries = OrderedDict()   # problem_id -> (last_modified, bytes)
+
+def _last_modified(problem):
+    return problem.get('updated_at') or problem.get('created_at')
+
+def get_problem_json(problem_id):
+    """
+    Get the serialized success_response body for a problem
+
+    Returns:
+        bytes: JSON body, or None if the problem does not exist
+    """
+    problem_id = str(problem_id)
+
+    current = get_db().problems.find_one({'_id': ObjectId(problem_id)}, {'updated_at': 1, 'created_at': 1})
+    if not current:
+        invalidate_problem_json(problem_id)
+        return None
+    last_modified = _last_modified(current)
+
+    with _lock:
+        entry = _entries.get(problem_id)
+        if entry is not None:
+            _entries.move_to_end(problem_id)
+
+    if entry is not None and entry[0] == last_modified:
+        return entry[1]
+
+    problem = catalog_service.get_problem(problem_id)
+    if not problem or _last_modified(problem) != last_modified:
+        # Changed by another process since this one's catalog last synced
+        problem = catalog_service.refresh_problem(problem_id)
+        if not problem:
+            invalidate_problem_json(problem_id)
+            return None
+        last_modified = _last_modified(problem)
+
+    # Same encoder as jsonify, so cached and uncached responses are byte-identical
+    body = current_app.json.dumps({'success': True, 'data': problem}).encode('utf-8')
+
+    with _lock:
+        _entries[problem_id] = (last_modified, body)
+        _entries.move_to_end(problem_id)
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+
+    return body
+
+def invalidate_problem_json(problem_id):
+    """Drop the serialized response for a problem"""
+    with _lock:
+        _entries.pop(str(problem_id), None)
+
+def clear_problem_json():
+    """Drop every serialized response"""
+    with _lock:
+        _entries.clear()
+
+def _on_catalog_change(event, problem_id, problem):
+    if event == 'reload':
+        clear_problem_json()
+
+catalog_service.add_catalog_listener(_on_catalog_change)
@@ -2,11 +2,22 @@ from services.db_service import get_db
 from bson.objectid import ObjectId
 from datetime import datetime
 from models.problem import Problem
+from services import catalog_service
+from services.problem_json_cache import invalidate_problem_json
+from utils.cache_utils import TTLCache
 from utils.logging_utils import log_exception, log_event
+from utils.pagination_utils import encode_cursor, decode_cursor, keyset_filter
+from utils.validators import fields_projection
+import json
 import logging
 
-def get_all_problems(filters=None, page=1, per_page=20):
-    """Get paginated problems matching the provided filters"""
+# Cached problem counts keyed by filter, so pages don't pay for an exact count
+COUNT_CACHE_SECONDS = 60
+# Bounded: keys come from client-supplied filters
+_count_cache = TTLCache(maxsize=1000, ttl=COUNT_CACHE_SECONDS)
+
+def get_all_problems(filters=None, page=1, per_page=20, fields=None):
+    """Get paginated problems matching the provided filters, optionally limited to `fields`"""
     db = get_db()
     
     if filters is None:
@@ -25,11 +36,11 @@ def get_all_problems(filters=None, page=1, per_page=20):
         # Calculate pagination
         skip = (page - 1) * per_page
         
-        # Get total count for pagination
-        total = db.problems.count_documents(filters)
+        # Get (cached) total count for pagination
+        total = count_problems(filters)
         
         # Get paginated problems
-        cursor = db.problems.find(filters) \
+        cursor = db.problems.find(filters, fields_projection(fields)) \
             .sort('created_at', -1) \
             .skip(skip) \
             .limit(per_page)
@@ -46,17 +57,91 @@ def get_all_problems(filters=None, page=1, per_page=20):
         log_exception(e, {'filters': filters, 'page': page})
         return [], 0
 
-def get_problem_by_id(problem_id):
-    """Get a specific problem by ID"""
+def get_problems_after(filters=None, cursor=None, per_page=20, fields=None):
+    """
+    Get problems matching the provided filters using keyset pagination
+    on (created_at, _id), newest first
+
+    Args:
+        filters (dict): Mongo filters
+        cursor (str): Continuation token from the previous page (None for the first page)
+        per_page (int): Number of problems per page
+        fields (list): Fields to return (optional, all fields if omitted)
+
+    Returns:
+        tuple: (problems, next_cursor), next_cursor is None on the last page
+
+    Raises:
+        ValueError: If the cursor is not a valid continuation token
+    """
+    db = get_db()
+
+    query = dict(filters or {})
+    query.pop('_roles', None)
+
+    if cursor:
+        position = decode_cursor(cursor)
+        if position is None:
+            raise ValueError("Invalid cursor")
+        query = {'$and': [query, keyset_filter('created_at', *position)]}
+
+    # The sort key is always fetched because the continuation token needs it
+    projection = fields_projection(fields)
+    if projection is not None:
+        projection['created_at'] = 1
+
+    # Fetch one extra document to know whether another page exists
+    cursor_docs = db.problems.find(query, projection) \
+        .sort([('created_at', -1), ('_id', -1)]) \
+        .limit(per_page + 1)
+    problems = list(cursor_docs)
+
+    next_cursor = None
+    if len(problems) > per_page:
+        problems = problems[:per_page]
+        last = problems[-1]
+        next_cursor = encode_cursor(last.get('created_at'), last['_id'])
+
+    for problem_data in problems:
+        problem_data['_id'] = str(problem_data['_id'])
+        if fields and 'created_at' not in fields:
+            problem_data.pop('created_at', None)
+
+    return problems, next_cursor
+
+def count_problems(filters=None):
+    """
+    Get an estimated count of problems matching the provided filters.
+    Unfiltered counts come from collection metadata; filtered counts are
+    cached for COUNT_CACHE_SECONDS.
+    """
+    db = get_db()
+
+    filters = {k: v for k, v in (filters or {}).items() if k != '_roles'}
+    if not filters:
+        return db.problems.estimated_document_count()
+
+    key = json.dumps(filters, sort_keys=True, default=str)
+    total = _count_cache.get(key)
+    if total is not None:
+        return total
+
+    total = db.problems.count_documents(filters)
+    _count_cache.set(key, total)
+    return total
+
+def get_problem_by_id(problem_id, fields=None):
+    """Get a specific problem by ID, optionally limited to `fields`"""
     db = get_db()
     
     try:
-        problem_data = db.problems.find_one({'_id': ObjectId(problem_id)})
+        problem_data = db.problems.find_one({'_id': ObjectId(problem_id)}, fields_projection(fields))
         if not problem_data:
             return None
             
-        problem = Problem.from_dict(problem_data)
-        return problem.to_json()
+        # Convert ObjectId to string for JSON serialization
+        problem_data['_id'] = str(problem_data['_id'])
+        return problem_data
     except Exception as e:
         log_exception(e, {'problem_id': problem_id})
         return None
@@ -82,6 +167,7 @@ def create_new_problem(problem_data):
         # Insert into database
         result = db.problems.insert_one(problem.to_dict(include_solution=True))
         problem_id = str(result.inserted_id)
+        catalog_service.refresh_problem(problem_id)
         
         log_event('problem.created', {
             'problem_id': problem_id,
@@ -113,6 +199,8 @@ def update_problem_by_id(problem_id, problem_data):
         )
         
         if result.modified_count > 0:
+            catalog_service.refresh_problem(problem_id)
+            invalidate_problem_json(problem_id)
             log_event('problem.updated', {
                 'problem_id': problem_id
             }, problem_data.get('updated_by'))
@@ -136,6 +224,8 @@ def delete_problem_by_id(problem_id):
         result = db.problems.delete_one({'_id': ObjectId(problem_id)})
         
         if result.deleted_count > 0:
+            catalog_service.remove_problem(problem_id)
+            invalidate_problem_json(problem_id)
             log_event('problem.deleted', {
                 'problem_id': problem_id
             })
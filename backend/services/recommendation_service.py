@@ -0,0 +1,148 @@
+"""
+Adaptive next-problem recommendations.
+
+Catalog problems are kept as NumPy arrays (a row-normalized problem x topic
+matrix and a difficulty level per problem), rebuilt lazily after catalog
+changes. A recommendation scores every problem in one vectorized pass:
+
+    score = topic weakness x difficulty fit x not-recently-seen
+
+where weakness comes from the user's per-topic accuracy as aggregated for the
+progress dashboard, difficulty fit peaks one level above the hardest
+difficulty the user already handles, and problems from recent sessions are
+heavily discounted.
+"""
+
+import threading
+import numpy as np
+from services import catalog_service
+from utils.progress_utils import aggregate_performance
+
+DIFFICULTY_LEVELS = ('easy', 'medium', 'hard')
+# Accuracy at which a difficulty level counts as handled
+MASTERY_ACCURACY = 70
+# Weakness assumed for topics the user has never attempted (mild exploration)
+UNSEEN_TOPIC_WEAKNESS = 0.5
+# Multiplier for problems attempted in the recent sessions
+RECENTLY_SEEN_FACTOR = 0.05
+# Width of the difficulty fit curve, in levels
+DIFFICULTY_SPREAD = 0.75
+
+_lock = threading.Lock()
+_arrays = None   # catalog arrays, None when stale
+
+def _build_arrays():
+    problems = [p for p in catalog_service.list_problems() if p.get('topics')]
+    topics = sorted({topic for p in problems for topic in p['topics']})
+    topic_index = {topic: i for i, topic in enumerate(topics)}
+
+    topic_matrix = np.zeros((len(problems), len(topics)), dtype=np.float32)
+    difficulty = np.full(len(problems), DIFFICULTY_LEVELS.index('medium'), dtype=np.float32)
+    for row, problem in enumerate(problems):
+        for topic in problem['topics']:
+            topic_matrix[row, topic_index[topic]] = 1.0
+        if problem.get('difficulty') in DIFFICULTY_LEVELS:
+            difficulty[row] = DIFFICULTY_LEVELS.index(problem['difficulty'])
+
+    # Average over a problem's topics rather than summing, so multi-topic problems don't dominate
+    topic_matrix /= np.maximum(topic_matrix.sum(axis=1, keepdims=True), 1.0)
+
+    return {
+        'problem_ids': [p['_id'] for p in problems],
+        'id_index': {p['_id']: row for row, p in enumerate(problems)},
+        'contest_ids': np.array([p.get('contest_id') or '' for p in problems]),
+        'topics': topics,
+        'topic_matrix': topic_matrix,
+        'difficulty': difficulty
+    }
+
+def _get_arrays():
+    global _arrays
+
+    with _lock:
+        if _arrays is None:
+            _arrays = _build_arrays()
+        return _arrays
+
+def _target_difficulty(performance):
+    """One level above the hardest difficulty the user has mastered"""
+    mastered = [
+        DIFFICULTY_LEVELS.index(level)
+        for level, data in performance['difficulties'].items()
+        if level in DIFFICULTY_LEVELS and data.get('attempted', 0) > 0
+        and data.get('accuracy', 0) >= MASTERY_ACCURACY
+    ]
+    if not mastered:
+        return 0
+    return min(max(mastered) + 1, len(DIFFICULTY_LEVELS) - 1)
+
+def recommend_problems(sessions, recent_problem_ids=(), k=10, contest_prefix=None):
+    """
+    Rank catalog problems for a user
+
+    Args:
+        sessions (list): The user's session documents (topic/difficulty performance, score, total_attempted)
+        recent_problem_ids (iterable): Problem IDs attempted recently
+        k (int): Number of recommendations
+        contest_prefix (str): Only recommend problems whose contest_id starts with this (optional)
+
+    Returns:
+        list: Recommendations with problem summary and score components, best first
+    """
+    arrays = _get_arrays()
+    if not arrays['problem_ids']:
+        return []
+
+    performance = aggregate_performance(sessions)
+
+    # Per-topic weakness: 1 - accuracy, with a prior for unseen topics
+    weakness_by_topic = np.full(len(arrays['topics']), UNSEEN_TOPIC_WEAKNESS, dtype=np.float32)
+    for i, topic in enumerate(arrays['topics']):
+        data = performance['topics'].get(topic)
+        if data and data.get('attempted', 0) > 0:
+            weakness_by_topic[i] = 1.0 - data['accuracy'] / 100.0
+    weakness = arrays['topic_matrix'] @ weakness_by_topic
+
+    target = _target_difficulty(performance)
+    difficulty_fit = np.exp(-((arrays['difficulty'] - target) ** 2) / (2 * DIFFICULTY_SPREAD ** 2))
+
+    freshness = np.ones(len(arrays['problem_ids']), dtype=np.float32)
+    recent_rows = [arrays['id_index'][pid] for pid in recent_problem_ids if pid in arrays['id_index']]
+    freshness[recent_rows] = RECENTLY_SEEN_FACTOR
+
+    scores = weakness * difficulty_fit * freshness
+    if contest_prefix:
+        scores = np.where(np.char.startswith(arrays['contest_ids'], contest_prefix), scores, -1.0)
+
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+
+    recommendations = []
+    for row in top:
+        if scores[row] < 0:
+            break
+        problem = catalog_service.get_problem(arrays['problem_ids'][row])
+        if not problem:
+            continue
+        recommendations.append({
+            '_id': problem['_id'],
+            'contest_id': problem.get('contest_id'),
+            'problem_number': problem.get('problem_number'),
+            'difficulty': problem.get('difficulty'),
+            'topics': problem.get('topics') or [],
+            'score': round(float(scores[row]), 4),
+            'weakness': round(float(weakness[row]), 4),
+            'difficulty_fit': round(float(difficulty_fit[row]), 4),
+            'recently_seen': bool(freshness[row] < 1)
+        })
+
+    return recommendations
+
+def _on_catalog_change(event, problem_id, problem):
+    global _arrays
+
+    with _lock:
+        _arrays = None
+
+catalog_service.add_catalog_listener(_on_catalog_change)
@@ -0,0 +1,183 @@
+"""
+Full-text problem search.
+
+An inverted index over problem text, topics, contest ID and solution text is
+built from the in-memory catalog and kept current through catalog listeners,
+so searches never scan Mongo. Results are ranked with BM25, with per-field
+weights so a topic or contest match outranks a word buried in a solution.
+"""
+
+import math
+import threading
+from collections import Counter, defaultdict
+from services import catalog_service
+from utils.logging_utils import log_event
+from utils.text_utils import tokenize, tokenize_contest_id
+
+# Term-frequency weight per indexed field
+FIELD_WEIGHTS = {
+    'problem_text': 1.0,
+    'topics': 3.0,
+    'contest_id': 2.0,
+    'solution': 0.5
+}
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_lock = threading.RLock()
+_postings = defaultdict(dict)   # term -> {problem_id: weighted term frequency}
+_doc_terms = {}                 # problem_id -> Counter of weighted term frequencies
+_doc_lengths = {}               # problem_id -> weighted document length
+_doc_meta = {}                  # problem_id -> fields returned in results and facets
+_total_length = 0.0
+_built = False
+
+def _document_terms(problem):
+    terms = Counter()
+    for token in tokenize(problem.get('problem_text')):
+        terms[token] += FIELD_WEIGHTS['problem_text']
+    for topic in problem.get('topics') or []:
+        for token in tokenize(topic):
+            terms[token] += FIELD_WEIGHTS['topics']
+    for token in tokenize_contest_id(problem.get('contest_id')):
+        terms[token] += FIELD_WEIGHTS['contest_id']
+    for token in tokenize(problem.get('solution')):
+        terms[token] += FIELD_WEIGHTS['solution']
+    return terms
+
+def _remove_document(problem_id):
+    """Remove a problem from the index (caller holds the lock)"""
+    global _total_length
+
+    terms = _doc_terms.pop(problem_id, None)
+    if terms is None:
+        return
+    for term in terms:
+        postings = _postings.get(term)
+        if postings is not None:
+            postings.pop(problem_id, None)
+            if not postings:
+                del _postings[term]
+    _total_length -= _doc_lengths.pop(problem_id, 0.0)
+    _doc_meta.pop(problem_id, None)
+
+def _add_document(problem):
+    """Add or replace a problem in the index (caller holds the lock)"""
+    global _total_length
+
+    problem_id = str(problem['_id'])
+    _remove_document(problem_id)
+
+    terms = _document_terms(problem)
+    for term, frequency in terms.items():
+        _postings[term][problem_id] = frequency
+
+    _doc_terms[problem_id] = terms
+    _doc_lengths[problem_id] = sum(terms.values())
+    _total_length += _doc_lengths[problem_id]
+    _doc_meta[problem_id] = {
+        '_id': problem_id,
+        'contest_id': problem.get('contest_id'),
+        'problem_number': problem.get('problem_number'),
+        'difficulty': problem.get('difficulty'),
+        'topics': problem.get('topics') or [],
+        'problem_text': problem.get('problem_text')
+    }
+
+def build_index():
+    """Rebuild the search index from the catalog"""
+    global _total_length, _built
+
+    problems = catalog_service.list_problems()
+    with _lock:
+        _postings.clear()
+        _doc_terms.clear()
+        _doc_lengths.clear()
+        _doc_meta.clear()
+        _total_length = 0.0
+        for problem in problems:
+            _add_document(problem)
+        _built = True
+
+    log_event('search.index_built', {'problem_count': len(problems), 'term_count': len(_postings)})
+    return len(problems)
+
+def search_problems(query, topic=None, difficulty=None, limit=20, offset=0):
+    """
+    Search problems by relevance
+
+    Args:
+        query (str): Free-text query (LaTeX allowed)
+        topic (str): Only return problems with this topic (optional)
+        difficulty (str): Only return problems with this difficulty (optional)
+        limit (int): Maximum number of results
+        offset (int): Number of ranked results to skip
+
+    Returns:
+        dict: {'items': [...], 'total': int, 'facets': {'topics': {...}, 'difficulty': {...}}}
+    """
+    if not _built:
+        build_index()
+
+    terms = set(tokenize(query)) | set(tokenize_contest_id(query))
+
+    with _lock:
+        document_count = len(_doc_lengths)
+        if not terms or not document_count:
+            return {'items': [], 'total': 0, 'facets': {'topics': {}, 'difficulty': {}}}
+
+        average_length = _total_length / document_count
+        scores = defaultdict(float)
+        for term in terms:
+            postings = _postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for problem_id, frequency in postings.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * _doc_lengths[problem_id] / average_length)
+                scores[problem_id] += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+
+        matches = []
+        topic_facets = Counter()
+        difficulty_facets = Counter()
+        for problem_id, score in scores.items():
+            meta = _doc_meta[problem_id]
+            if topic and topic not in meta['topics']:
+                continue
+            if difficulty and meta['difficulty'] != difficulty:
+                continue
+            matches.append((score, problem_id))
+            topic_facets.update(meta['topics'])
+            if meta['difficulty']:
+                difficulty_facets[meta['difficulty']] += 1
+
+        matches.sort(key=lambda match: (-match[0], match[1]))
+        items = [
+            {**_doc_meta[problem_id], 'score': round(score, 4)}
+            for score, problem_id in matches[offset:offset + limit]
+        ]
+
+    return {
+        'items': items,
+        'total': len(matches),
+        'facets': {
+            'topics': dict(topic_facets.most_common()),
+            'difficulty': dict(difficulty_facets)
+        }
+    }
+
+def _on_catalog_change(event, problem_id, problem):
+    if event == 'reload':
+        build_index()
+        return
+    if not _built:
+        return
+    with _lock:
+        if event == 'delete':
+            _remove_document(problem_id)
+        else:
+            _add_document(problem)
+
+catalog_service.add_catalog_listener(_on_catalog_change)
@@ -0,0 +1,152 @@
+"""
+Similar-problem lookup from TF-IDF vectors.
+
+Every catalog problem is vectorized over its text and topics, and the top
+neighbours of each problem are precomputed with chunked sparse matrix
+products. A lookup is then a dictionary read. Catalog changes mark the index
+stale and schedule one rebuild after a short delay, so an upload of a whole
+contest costs a single rebuild.
+"""
+
+import threading
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from services import catalog_service
+from utils.logging_utils import log_event, log_exception
+from utils.text_utils import tokenize
+
+# Neighbours kept per problem; requests may ask for fewer
+MAX_NEIGHBOURS = 20
+# Rows multiplied at a time, bounding the dense similarity block in memory
+CHUNK_SIZE = 512
+# Delay before a rebuild after catalog changes, so bulk uploads batch together
+REBUILD_DELAY_SECONDS = 5.0
+
+_lock = threading.Lock()
+# Serializes builds, so concurrent first requests and scheduled rebuilds build once
+_build_lock = threading.Lock()
+_neighbours = {}      # problem_id -> [(problem_id, similarity), ...] best first
+_built = False
+_rebuild_timer = None
+
+def _problem_terms(problem):
+    terms = tokenize(problem.get('problem_text'))
+    # Topics are whole-phrase features so "Number Theory" does not match any "number"
+    terms.extend(f"topic:{topic.lower()}" for topic in problem.get('topics') or [])
+    return terms
+
+def build_index():
+    """
+    Vectorize the catalog and precompute nearest neighbours
+
+    Returns:
+        int: Number of problems indexed
+    """
+    with _build_lock:
+        return _build()
+
+def _ensure_built():
+    with _build_lock:
+        # Another request may have finished the build while this one waited
+        if not _built:
+            _build()
+
+def _build():
+    global _neighbours, _built
+
+    problems = [p for p in catalog_service.list_problems() if p.get('problem_text')]
+    neighbours = {}
+
+    if len(problems) > 1:
+        vectorizer = TfidfVectorizer(analyzer=_problem_terms, sublinear_tf=True)
+        vectors = vectorizer.fit_transform(problems)  # rows are L2-normalized
+        problem_ids = np.array([p['_id'] for p in problems])
+        k = min(MAX_NEIGHBOURS, len(problems) - 1)
+
+        for start in range(0, len(problems), CHUNK_SIZE):
+            similarities = (vectors[start:start + CHUNK_SIZE] @ vectors.T).toarray()
+            rows = np.arange(similarities.shape[0])
+            # Exclude each problem from its own neighbour list
+            similarities[rows, rows + start] = -1.0
+
+            top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(similarities, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            for row in rows:
+                neighbours[problem_ids[start + row]] = [
+                    (problem_ids[column], float(score))
+                    for column, score in zip(top[row], top_scores[row])
+                    if score > 0
+                ]
+
+    with _lock:
+        _neighbours = neighbours
+        _built = True
+
+    log_event('similarity.index_built', {'problem_count': len(problems)})
+    return len(problems)
+
+def get_similar_problems(problem_id, k=5):
+    """
+    Get the catalog problems most similar to a problem
+
+    Returns:
+        list: Up to k problem summaries with a 'similarity' score, or None if the
+            problem is not indexed
+    """
+    if not _built:
+        _ensure_built()
+
+    neighbours = _neighbours.get(str(problem_id))
+    if neighbours is None:
+        return None
+
+    results = []
+    for neighbour_id, similarity in neighbours:
+        problem = catalog_service.get_problem(neighbour_id)
+        if not problem:
+            continue  # deleted since the last rebuild
+        results.append({
+            '_id': problem['_id'],
+            'contest_id': problem.get('contest_id'),
+            'problem_number': problem.get('problem_number'),
+            'difficulty': problem.get('difficulty'),
+            'topics': problem.get('topics') or [],
+            'similarity': round(similarity, 4)
+        })
+        if len(results) >= k:
+            break
+
+    return results
+
+def _rebuild():
+    global _rebuild_timer
+
+    with _lock:
+        _rebuild_timer = None
+    try:
+        build_index()
+    except Exception as e:
+        log_exception(e, {'task': 'similarity.rebuild'})
+
+def schedule_rebuild(delay=REBUILD_DELAY_SECONDS):
+    """Schedule a rebuild, coalescing with one that is already pending"""
+    global _rebuild_timer
+
+    with _lock:
+        if _rebuild_timer is not None:
+            return
+        _rebuild_timer = threading.Timer(delay, _rebuild)
+        _rebuild_timer.daemon = True
+        _rebuild_timer.start()
+
+def _on_catalog_change(event, problem_id, problem):
+    if event == 'reload':
+        schedule_rebuild(delay=0)
+    elif _built:
+        schedule_rebuild()
+
+catalog_service.add_catalog_listener(_on_catalog_change)
@@ -0,0 +1,339 @@
+"""
+Storage backends for asset bytes.
+
+storage_service decides what to store and where (content-addressed keys,
+reference counts); a backend only moves bytes for a key. Two are provided:
+
+- S3Backend: an S3 bucket (or an S3-compatible server via S3_ENDPOINT_URL),
+  with one pooled client per process and multipart streaming uploads.
+- LocalBackend: a directory on local disk, for development, tests and
+  single-node installs. Keys map to paths under LOCAL_STORAGE_ROOT, so
+  content-addressed keys (blobs/sha256/ab/cd/<hash>) give a sharded layout
+  with at most 256 entries per directory level. Objects are served by the
+  API with send_file (see serve()).
+
+STORAGE_BACKEND selects the backend ('s3' or 'local'); get_backend() returns
+the process-wide instance. boto3 is only imported when an S3Backend is
+created, so the local backend needs no AWS packages.
+"""
+
+import base64
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from flask import redirect, send_file
+from werkzeug.exceptions import NotFound
+
+MB = 1024 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+# Content-addressed objects never change, so clients may cache them for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Served files are user uploads: never sniff them into another type, and
+# sandbox anything a browser does render as a document
+SERVED_FILE_HEADERS = {
+    'X-Content-Type-Options': 'nosniff',
+    'Content-Security-Policy': 'sandbox'
+}
+
+class SourceChanged(Exception):
+    """The source of a conditional copy no longer matches the expected version"""
+
+class StorageBackend(ABC):
+    """Interface every storage backend implements"""
+
+    name = None
+
+    @abstractmethod
+    def put(self, key, fileobj, content_type, public=True):
+        """Stream a file object to key, replacing any existing object"""
+
+    @abstractmethod
+    def copy(self, source_key, key, content_type, public=True, if_match=None):
+        """
+        Copy an object to another key without passing its bytes through the API
+
+        With if_match (an etag from sha256()), raises SourceChanged instead of
+        copying if the source has been replaced since it was checksummed.
+        """
+
+    @abstractmethod
+    def delete(self, key):
+        """Delete an object (a missing object is not an error)"""
+
+    @abstractmethod
+    def size(self, key):
+        """Size of an object in bytes, or None if it does not exist"""
+
+    @abstractmethod
+    def sha256(self, key):
+        """
+        SHA-256 of an object's bytes, computed by the storage side
+
+        Returns:
+            tuple: (hex SHA-256, etag of the version that was checksummed)
+        """
+
+    @abstractmethod
+    def url(self, key):
+        """URL clients fetch the object from"""
+
+    def presigned_upload(self, key, content_type, size, expires_in):
+        """
+        Presigned form upload straight to storage
+
+        Returns:
+            dict: {'url', 'fields'} for a multipart/form-data POST, or None if unsupported
+        """
+        return None
+
+    @abstractmethod
+    def serve(self, key, content_type, etag=None):
+        """Flask response for GET requests to url(key)"""
+
+class S3Backend(StorageBackend):
+    """
+    Objects in an S3 bucket
+
+    One boto3 client is shared by the whole process: creating a client
+    resolves credentials and endpoints and starts with a cold connection
+    pool, so doing it per call costs far more than the request itself.
+    boto3 clients are thread-safe, so request threads and the transfer
+    manager's upload threads share its pool (sized by S3_MAX_POOL_CONNECTIONS).
+    """
+
+    name = 's3'
+
+    def __init__(self, config):
+        # Imported here so the local backend runs without boto3 installed
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config as BotoConfig
+
+        self.bucket = config.S3_BUCKET_NAME
+        self.endpoint_url = config.S3_ENDPOINT_URL
+        self.transfer_config = TransferConfig(
+            multipart_threshold=config.S3_MULTIPART_THRESHOLD_MB * MB,
+            multipart_chunksize=config.S3_MULTIPART_CHUNKSIZE_MB * MB,
+            # Part uploads run on these threads and draw from the client's pool
+            max_concurrency=min(10, config.S3_MAX_POOL_CONNECTIONS)
+        )
+        self.client = boto3.session.Session().client(
+            's3',
+            aws_access_key_id=config.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
+            region_name=config.AWS_REGION,
+            endpoint_url=self.endpoint_url,
+            config=BotoConfig(
+                max_pool_connections=config.S3_MAX_POOL_CONNECTIONS,
+                retries={'max_attempts': 5, 'mode': 'adaptive'},
+                # SigV4 for presigned uploads too (SigV2 is deprecated and unsupported in newer regions)
+                signature_version='s3v4',
+                # MinIO and most stand-ins only support path-style addressing
+                s3={'addressing_style': 'path' if self.endpoint_url else 'auto'}
+            )
+        )
+
+    def _acl(self, public):
+        return 'public-read' if public else 'private'
+
+    def put(self, key, fileobj, content_type, public=True):
+        # Streams; multipart past the threshold
+        self.client.upload_fileobj(
+            fileobj,
+            self.bucket,
+            key,
+            ExtraArgs={'ContentType': content_type, 'ACL': self._acl(public)},
+            Config=self.transfer_config
+        )
+
+    def copy(self, source_key, key, content_type, public=True, if_match=None):
+        conditions = {'CopySourceIfMatch': if_match} if if_match else {}
+        try:
+            self.client.copy_object(
+                Bucket=self.bucket,
+                Key=key,
+                CopySource={'Bucket': self.bucket, 'Key': source_key},
+                ACL=self._acl(public),
+                MetadataDirective='REPLACE',
+                ContentType=content_type,
+                **conditions
+            )
+        except self.client.exceptions.ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'PreconditionFailed':
+                raise SourceChanged(source_key) from e
+            raise
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def size(self, key):
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)['ContentLength']
+        except self.client.exceptions.ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+    def sha256(self, key):
+        # Copying the object onto itself makes S3 compute the checksum; no bytes reach the API
+        head = self.client.head_object(Bucket=self.bucket, Key=key)
+        result = self.client.copy_object(
+            Bucket=self.bucket,
+            Key=key,
+            CopySource={'Bucket': self.bucket, 'Key': key},
+            ChecksumAlgorithm='SHA256',
+            MetadataDirective='REPLACE',
+            ContentType=head.get('ContentType', 'application/octet-stream')
+        )
+        # The checksum belongs to the version this copy created, which its ETag names
+        copied = result.get('CopyObjectResult', {})
+        checksum = copied.get('ChecksumSHA256')
+        return (base64.b64decode(checksum).hex() if checksum else None), copied.get('ETag')
+
+    def url(self, key):
+        if self.endpoint_url:
+            return f'{self.endpoint_url.rstrip("/")}/{self.bucket}/{key}'
+        return f'https://{self.bucket}.s3.amazonaws.com/{key}'
+
+    def presigned_upload(self, key, content_type, size, expires_in):
+        return self.client.generate_presigned_post(
+            self.bucket,
+            key,
+            Fields={'Content-Type': content_type},
+            Conditions=[
+                {'Content-Type': content_type},
+                ['content-length-range', size, size]
+            ],
+            ExpiresIn=expires_in
+        )
+
+    def serve(self, key, content_type, etag=None):
+        return redirect(self.url(key))
+
+class LocalBackend(StorageBackend):
+    """
+    Objects as files under a root directory
+
+    Writes go to a temporary file in the target directory and are renamed
+    into place, so readers never see a partial object. A replaced object is
+    a new file, so an open file keeps the version it was opened at; etags
+    identify that version by inode, mtime and size.
+    """
+
+    name = 'local'
+
+    def __init__(self, config):
+        self.root = os.path.abspath(config.LOCAL_STORAGE_ROOT)
+        self.url_prefix = config.LOCAL_STORAGE_URL_PREFIX.rstrip('/')
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key):
+        """Absolute path of a key, refusing keys that escape the root"""
+        path = os.path.abspath(os.path.join(self.root, key))
+        if os.path.commonpath([self.root, path]) != self.root or path == self.root:
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def _write(self, key, copy):
+        path = self.path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as target:
+                copy(target)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def put(self, key, fileobj, content_type, public=True):
+        self._write(key, lambda target: shutil.copyfileobj(fileobj, target, READ_CHUNK_SIZE))
+
+    def _etag(self, f):
+        stat = os.fstat(f.fileno())
+        return f'{stat.st_ino:x}-{stat.st_mtime_ns:x}-{stat.st_size:x}'
+
+    def copy(self, source_key, key, content_type, public=True, if_match=None):
+        with open(self.path(source_key), 'rb') as source:
+            if if_match and self._etag(source) != if_match:
+                raise SourceChanged(source_key)
+            self._write(key, lambda target: shutil.copyfileobj(source, target, READ_CHUNK_SIZE))
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def size(self, key):
+        try:
+            return os.path.getsize(self.path(key))
+        except FileNotFoundError:
+            return None
+
+    def sha256(self, key):
+        digest = hashlib.sha256()
+        with open(self.path(key), 'rb') as f:
+            for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b''):
+                digest.update(chunk)
+            return digest.hexdigest(), self._etag(f)
+
+    def url(self, key):
+        return f'{self.url_prefix}/{key}'
+
+    def serve(self, key, content_type, etag=None):
+        """
+        Serve a file with send_file
+
+        conditional=True answers Range requests with 206 partial content and
+        If-None-Match / If-Modified-Since with 304. The body is passed to the
+        WSGI server's file wrapper, which gunicorn and most servers send with
+        sendfile(2); with USE_X_SENDFILE set, Flask instead hands the path to
+        the front proxy in an X-Sendfile header.
+        """
+        path = self.path(key)
+        if not os.path.isfile(path):
+            raise NotFound()
+        response = send_file(
+            path,
+            mimetype=content_type,
+            conditional=True,
+            etag=etag if etag is not None else True,
+            max_age=IMMUTABLE_MAX_AGE
+        )
+        response.cache_control.immutable = True
+        response.headers.update(SERVED_FILE_HEADERS)
+        return response
+
+BACKENDS = {
+    S3Backend.name: S3Backend,
+    LocalBackend.name: LocalBackend,
+}
+
+_lock = threading.Lock()
+_backend = None
+
+def get_backend():
+    """
+    Get the process-wide storage backend selected by STORAGE_BACKEND
+
+    Returns:
+        StorageBackend: Shared, thread-safe backend
+    """
+    global _backend
+
+    if _backend is not None:
+        return _backend
+
+    with _lock:
+        if _backend is None:
+            from config import get_config
+            config = get_config()
+            if config.STORAGE_BACKEND not in BACKENDS:
+                raise ValueError(f"Unknown STORAGE_BACKEND: {config.STORAGE_BACKEND}")
+            _backend = BACKENDS[config.STORAGE_BACKEND](config)
+        return _backend
@@ -1,30 +1,239 @@
-import os
-import boto3
-from botocore.exceptions import ClientError
+"""
+Asset storage.
+
+Asset bytes are content-addressed: an upload is hashed (SHA-256) while it
+is spooled and stored once under blobs/sha256/ab/cd/<hash>. The asset_blobs
+collection counts the assets referencing each blob, so the same default
+sound or avatar uploaded by thousands of users is one object, and every
+API upload after the first completes without writing to storage.
+Blobs whose count drops to zero are deleted by collect_unreferenced_blobs()
+once they have been unreferenced for a grace period.
+
+Bytes live in the configured storage backend (services/storage_backends.py:
+S3, or local disk). With S3, clients can also upload straight to the bucket
+(start_direct_upload and complete_direct_upload) so no API worker is tied up
+streaming the file. Direct uploads land under uploads/ first; give that
+prefix a lifecycle rule expiring objects after a day to clean up uploads
+that are never completed.
+"""
+
+import hashlib
+import tempfile
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from models.asset import Asset  # Import Asset from models
 from services.db_service import get_db
+from services.storage_backends import SourceChanged, get_backend
+from utils.cache_utils import TTLCache
 from utils.validators import is_valid_object_id
 from utils.logging_utils import log_event, log_exception
 from utils.security_utils import sanitize_html
 import mimetypes
-    
-# AWS S3 Configuration
-def get_s3_client():
-    return boto3.client(
-        's3',
-        aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID'),
-        aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY'),
-        region_name=os.environ.get('AWS_REGION', 'us-east-1')
+
+MB = 1024 * 1024
+# Uploads up to this size are spooled in memory, larger ones to a temporary file
+SPOOL_MAX_MEMORY = 1 * MB
+READ_CHUNK_SIZE = 64 * 1024
+# Unreferenced blobs are kept this long so a concurrent upload can still reuse them
+BLOB_GRACE_PERIOD = timedelta(hours=24)
+# A deletion claim older than this is assumed abandoned and retried
+BLOB_DELETE_CLAIM_SECONDS = 300
+# An upload meeting a blob mid-deletion waits up to attempts * seconds for it to finish
+BLOB_DELETE_WAIT_ATTEMPTS = 50
+BLOB_DELETE_WAIT_SECONDS = 0.1
+# Content type prefix each asset type must have
+ASSET_CONTENT_TYPES = {'image': 'image/', 'sound': 'audio/'}
+# Types under those prefixes that browsers run scripts in
+BLOCKED_CONTENT_TYPES = {'image/svg+xml'}
+UPLOAD_FAILED_MESSAGE = "Failed to upload asset"
+BLOB_KEY_PREFIX = 'blobs/sha256/'
+
+# Content types of served blobs (blob keys have no extension)
+_blob_types = TTLCache(maxsize=10000, ttl=3600)
+
+def get_object_url(key):
+    """URL clients fetch a stored object from"""
+    return get_backend().url(key)
+
+def blob_key(content_hash):
+    """Object key of a content-addressed blob, sharded by the first two hash bytes"""
+    return f'{BLOB_KEY_PREFIX}{content_hash[:2]}/{content_hash[2:4]}/{content_hash}'
+
+class UploadTooLarge(ValueError):
+    """An upload exceeded ASSET_MAX_UPLOAD_MB"""
+
+def _spool(file, max_size=None):
+    """
+    Copy an upload into a spooled temporary file, hashing and counting it on the way
+
+    Raises:
+        UploadTooLarge: The upload has more than max_size bytes (checked while
+            reading, so an oversized upload is never spooled whole)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    for chunk in iter(lambda: file.read(READ_CHUNK_SIZE), b''):
+        size += len(chunk)
+        if max_size is not None and size > max_size:
+            spool.close()
+            raise UploadTooLarge(f"File must be at most {max_size} bytes")
+        digest.update(chunk)
+        spool.write(chunk)
+    spool.seek(0)
+    return spool, digest.hexdigest(), size
+
+def _asset_mime_type(filename, asset_type):
+    """
+    Content type of an asset file, from its name
+
+    Returns:
+        tuple: (mime_type, error message or None if the type is allowed for asset_type)
+    """
+    mime_type = mimetypes.guess_type(filename or '')[0] or 'application/octet-stream'
+    prefix = ASSET_CONTENT_TYPES.get(asset_type)
+    if prefix is None or not mime_type.startswith(prefix) or mime_type in BLOCKED_CONTENT_TYPES:
+        return mime_type, f"{mime_type} files cannot be used as {asset_type} assets"
+    return mime_type, None
+
+def _add_blob_reference(content_hash, size, mime_type):
+    """
+    Count one more reference to a blob, creating its record if needed
+
+    The reference is counted before any upload so a concurrent release can
+    never drop a blob someone is about to use. A blob being deleted by
+    collect_unreferenced_blobs() cannot gain references; this waits for the
+    deletion to finish and then starts a fresh record.
+
+    Returns:
+        bool: True if the blob's bytes are already stored
+    """
+    db = get_db()
+    for _ in range(BLOB_DELETE_WAIT_ATTEMPTS):
+        try:
+            previous = db.asset_blobs.find_one_and_update(
+                {'_id': content_hash, 'deleting_at': {'$exists': False}},
+                {
+                    '$inc': {'ref_count': 1},
+                    '$unset': {'released_at': ''},
+                    '$setOnInsert': {
+                        'key': blob_key(content_hash),
+                        'size': size,
+                        'mime_type': mime_type,
+                        'created_at': datetime.utcnow()
+                    }
+                },
+                upsert=True
+            )
+            return previous is not None and bool(previous.get('stored'))
+        except DuplicateKeyError:
+            # The record exists but is being deleted (the upsert could not match it)
+            time.sleep(BLOB_DELETE_WAIT_SECONDS)
+    raise RuntimeError(f"Blob {content_hash} is still being deleted")
+
+def _mark_blob_stored(content_hash):
+    get_db().asset_blobs.update_one({'_id': content_hash}, {'$set': {'stored': True}})
+
+def _reference_blob(content_hash, spool, size, mime_type):
+    """
+    Add a reference to a blob, uploading it only if it is not stored yet
+
+    Returns:
+        bool: True if the bytes were uploaded, False if an existing blob was reused
+    """
+    if _add_blob_reference(content_hash, size, mime_type):
+        return False
+
+    try:
+        get_backend().put(blob_key(content_hash), spool, mime_type, public=True)
+    except Exception:
+        release_blob(content_hash)
+        raise
+
+    _mark_blob_stored(content_hash)
+    return True
+
+def release_blob(content_hash):
+    """
+    Drop one reference to a blob
+
+    released_at is stamped in the same write, so a blob at zero references
+    always carries the time it became unreferenced. The object itself is
+    left for collect_unreferenced_blobs().
+
+    Returns:
+        int: References left, or None if the blob is unknown
+    """
+    blob = get_db().asset_blobs.find_one_and_update(
+        {'_id': content_hash, 'ref_count': {'$gt': 0}},
+        {'$inc': {'ref_count': -1}, '$set': {'released_at': datetime.utcnow()}},
+        return_document=ReturnDocument.AFTER
     )
+    return blob['ref_count'] if blob else None
+
+def collect_unreferenced_blobs(grace_period=BLOB_GRACE_PERIOD):
+    """
+    Delete blobs nobody has referenced for the grace period
+
+    Each blob is first claimed with deleting_at (only while it still has no
+    references; claimed blobs cannot gain any), then its object is deleted,
+    then its record. A claim left by a run that died midway is retried once
+    it is BLOB_DELETE_CLAIM_SECONDS old.
 
-BUCKET_NAME = os.environ.get('S3_BUCKET_NAME', 'goaime-users')
+    Args:
+        grace_period (timedelta): How long a blob must have been unreferenced
+
+    Returns:
+        int: Number of blobs deleted
+    """
+    db = get_db()
+    backend = get_backend()
+    now = datetime.utcnow()
+    cutoff = now - grace_period
+    claimable = {
+        'ref_count': 0,
+        'released_at': {'$lte': cutoff},
+        '$or': [
+            {'deleting_at': {'$exists': False}},
+            {'deleting_at': {'$lte': now - timedelta(seconds=BLOB_DELETE_CLAIM_SECONDS)}}
+        ]
+    }
+    deleted = 0
+
+    for candidate in db.asset_blobs.find(claimable, {'_id': 1}):
+        blob = db.asset_blobs.find_one_and_update(
+            {'_id': candidate['_id'], **claimable},
+            {'$set': {'deleting_at': datetime.utcnow(), 'stored': False}},
+            return_document=ReturnDocument.AFTER
+        )
+        if blob is None:
+            continue  # Referenced again since the find
+        try:
+            backend.delete(blob['key'])
+        except Exception as e:
+            log_exception(e, {'blob': blob['_id']})
+            # Give the blob back (still unstored, so a new reference re-uploads it); the next run retries
+            db.asset_blobs.update_one({'_id': blob['_id']}, {'$unset': {'deleting_at': ''}})
+            continue
+        db.asset_blobs.delete_one({'_id': blob['_id'], 'ref_count': 0, 'deleting_at': blob['deleting_at']})
+        deleted += 1
+
+    log_event('storage.blobs_collected', {'deleted': deleted})
+    return deleted
 
 def create_user_folders(username):
-    """Create S3 folder structure for a new user"""
+    """
+    Create the per-user folder structure (S3 folder placeholders; a no-op on local disk,
+    where directories are created on write)
+    """
     try:
-        s3 = get_s3_client()
-        s3.put_object(Bucket=BUCKET_NAME, Key=f'{username}/assets/')
-        s3.put_object(Bucket=BUCKET_NAME, Key=f'{username}/problems/')
+        backend = get_backend()
+        if backend.name == 's3':
+            backend.client.put_object(Bucket=backend.bucket, Key=f'{username}/assets/')
+            backend.client.put_object(Bucket=backend.bucket, Key=f'{username}/problems/')
         
         log_event('storage.folders_created', {'username': username})
         return True
@@ -32,73 +241,285 @@ def create_user_folders(username):
         log_exception(e, {'username': username})
         return False
 
-def upload_asset(user_id, username, file, asset_type, asset_name):
-    """Upload user asset (image or sound) to S3 and store metadata in DB"""
+def upload_asset(user_id, file, asset_type, asset_name):
+    """
+    Upload a user asset (image or sound) and store its metadata in the DB
+
+    The bytes are stored once per distinct content (see blob_key); an asset
+    with the same type and name replaces the user's previous one.
+
+    Args:
+        user_id (str): Owner's user ID
+        file: Uploaded file (werkzeug FileStorage or a binary file object with a filename)
+        asset_type (str): 'image' or 'sound'
+        asset_name (str): Slot name, e.g. 'correct' or 'incorrect'
+
+    Returns:
+        tuple: (success, message, asset JSON); the message is
+            UPLOAD_FAILED_MESSAGE for storage errors, otherwise it describes
+            what is wrong with the upload
+    """
     if not is_valid_object_id(user_id):
-        return None
-        
+        return False, "Invalid user ID", None
+
+    filename = getattr(file, 'filename', None)
+    mime_type, error = _asset_mime_type(filename, asset_type)
+    if error:
+        return False, error, None
+
     # Sanitize inputs
     asset_name = sanitize_html(asset_name)
-    username = sanitize_html(username)
-    
-    db = get_db()
     
     try:
-        # Determine file extension
-        filename = file.filename
-        file_extension = filename.split(".")[-1]
-        
-        # Create S3 path
-        file_path = f'{username}/assets/{asset_type}s/{asset_name}.{file_extension}'
-        
-        # Get file size
-        file.seek(0, os.SEEK_END)
-        file_size = file.tell()
-        file.seek(0)  # Reset file pointer
-        
-        # Determine mime type
-        mime_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        max_size, _ = _upload_limits()
+        spool, content_hash, file_size = _spool(getattr(file, 'stream', file), max_size)
+        with spool:
+            uploaded = _reference_blob(content_hash, spool, file_size, mime_type)
         
-        # Upload to S3
-        s3 = get_s3_client()
-        s3.upload_fileobj(
-            file, 
-            BUCKET_NAME, 
-            file_path,
-            ExtraArgs={
-                'ContentType': mime_type,
-                'ACL': 'public-read'  # Make the file publicly accessible
-            }
-        )
-        
-        # Generate URL
-        asset_url = f'https://{BUCKET_NAME}.s3.amazonaws.com/{file_path}'
-        
-        # Create asset record
-        asset = Asset(
-            filename=filename,
-            asset_type=asset_type,
-            path=file_path,
-            url=asset_url,
-            user_id=user_id,
-            size=file_size,
-            metadata={'original_name': filename, 'mime_type': mime_type}
-        )
-        
-        # Store in database
-        db.assets.insert_one(asset.to_dict())
+        asset = _record_asset(user_id, filename, asset_type, asset_name, content_hash, file_size, mime_type)
         
         log_event('storage.asset_uploaded', {
             'asset_type': asset_type,
             'size': file_size,
-            'path': file_path
+            'content_hash': content_hash,
+            'deduplicated': not uploaded
         }, user_id)
         
-        return asset.to_json()
+        return True, "Asset stored", asset.to_json()
+    except UploadTooLarge as e:
+        return False, str(e), None
     except Exception as e:
         log_exception(e, {
             'user_id': user_id,
             'asset_type': asset_type,
-            'filename': getattr(file, 'filename', 'unknown')
+            'filename': filename or 'unknown'
         })
-        return None
\ No newline at end of file
+        return False, UPLOAD_FAILED_MESSAGE, None
+
+def _record_asset(user_id, filename, asset_type, asset_name, content_hash, size, mime_type):
+    """Store the asset record for a referenced blob and replace the owner's previous asset in the slot"""
+    file_path = blob_key(content_hash)
+    asset = Asset(
+        filename=filename,
+        asset_type=asset_type,
+        path=file_path,
+        url=get_object_url(file_path),
+        user_id=user_id,
+        size=size,
+        content_hash=content_hash,
+        metadata={'original_name': filename, 'mime_type': mime_type, 'name': asset_name}
+    )
+    
+    # Store in database
+    try:
+        get_db().assets.insert_one(asset.to_dict())
+    except Exception:
+        release_blob(content_hash)
+        raise
+    
+    _replace_previous_assets(asset)
+    return asset
+
+def _replace_previous_assets(asset):
+    """Delete the owner's older assets in the same slot and release their blobs"""
+    db = get_db()
+    previous = db.assets.find({
+        'user_id': asset.to_dict()['user_id'],
+        'asset_type': asset.asset_type,
+        'metadata.name': asset.metadata['name'],
+        '_id': {'$ne': asset._id}
+    }, {'content_hash': 1})
+    
+    for old in previous:
+        if db.assets.delete_one({'_id': old['_id']}).deleted_count and old.get('content_hash'):
+            release_blob(old['content_hash'])
+
+def _upload_limits():
+    from config import get_config
+    config = get_config()
+    return config.ASSET_MAX_UPLOAD_MB * MB, config.ASSET_UPLOAD_EXPIRES_SECONDS
+
+def start_direct_upload(user_id, filename, asset_type, asset_name, size, content_hash):
+    """
+    Start an upload that the client sends straight to storage
+
+    The client declares the file's size and SHA-256. If the user already
+    owns an asset with that content, the new asset is recorded right away
+    and nothing is uploaded. Otherwise the client gets a presigned POST
+    limited to the declared size and content type, uploads to a staging key,
+    and then calls complete_direct_upload(), which verifies the bytes (and
+    skips the copy if another user's upload already stored them). Knowing a
+    hash is therefore never enough to attach content, or to learn whether it
+    exists. No file bytes pass through the API. Backends without presigned
+    uploads (local disk) only support the first case.
+
+    Args:
+        user_id (str): Owner's user ID
+        filename (str): Original file name (its extension sets the content type)
+        asset_type (str): 'image' or 'sound'
+        asset_name (str): Slot name, e.g. 'correct' or 'incorrect'
+        size (int): File size in bytes
+        content_hash (str): Hex SHA-256 of the file
+
+    Returns:
+        tuple: (success, message, data) where data holds either 'asset' (already
+            stored) or 'upload_id' and 'upload' (presigned POST url and fields)
+    """
+    max_size, expires_in = _upload_limits()
+    mime_type, error = _asset_mime_type(filename, asset_type)
+    content_hash = (content_hash or '').lower()
+
+    if not is_valid_object_id(user_id):
+        return False, "Invalid user ID", None
+    if error:
+        return False, error, None
+    if not isinstance(size, int) or not 0 < size <= max_size:
+        return False, f"Size must be between 1 and {max_size} bytes", None
+    if len(content_hash) != 64 or any(c not in '0123456789abcdef' for c in content_hash):
+        return False, "content_hash must be a hex SHA-256 digest", None
+    if not asset_name:
+        return False, "Asset name is required", None
+
+    asset_name = sanitize_html(asset_name)
+    db = get_db()
+
+    # Content this user has uploaded before: reference it without any transfer
+    owned = db.assets.find_one({'user_id': user_id, 'content_hash': content_hash}, {'_id': 1})
+    blob = owned and db.asset_blobs.find_one({'_id': content_hash, 'stored': True}, {'size': 1})
+    if blob:
+        if blob['size'] != size:
+            return False, "size does not match the stored content", None
+        if _add_blob_reference(content_hash, size, mime_type):
+            asset = _record_asset(user_id, filename, asset_type, asset_name, content_hash, blob['size'], mime_type)
+            log_event('storage.asset_uploaded', {
+                'asset_type': asset_type,
+                'size': blob['size'],
+                'content_hash': content_hash,
+                'deduplicated': True
+            }, user_id)
+            return True, "Asset stored", {'asset': asset.to_json()}
+        # Collected in the meantime: undo the reference and upload it again
+        release_blob(content_hash)
+
+    upload_id = ObjectId()
+    key = f'uploads/{user_id}/{upload_id}'
+    presigned = get_backend().presigned_upload(key, mime_type, size, expires_in)
+    if presigned is None:
+        return False, f"Direct uploads are not supported by the {get_backend().name} storage backend; upload through POST /api/assets", None
+    db.asset_uploads.insert_one({
+        '_id': upload_id,
+        'user_id': ObjectId(user_id),
+        'key': key,
+        'filename': filename,
+        'asset_type': asset_type,
+        'name': asset_name,
+        'mime_type': mime_type,
+        'size': size,
+        'content_hash': content_hash,
+        'created_at': datetime.utcnow()
+    })
+
+    return True, "Upload the file, then complete the upload", {
+        'upload_id': str(upload_id),
+        'upload': presigned,
+        'expires_in': expires_in
+    }
+
+def _reject_direct_upload(user_id, upload_id, key, content_hash):
+    get_backend().delete(key)
+    log_event('storage.direct_upload_rejected', {'upload_id': upload_id, 'content_hash': content_hash}, user_id)
+    return False, "Uploaded file does not match the declared size and content_hash", None
+
+def complete_direct_upload(user_id, upload_id):
+    """
+    Record the asset for a file the client uploaded with start_direct_upload()
+
+    Checks the staged object's size and SHA-256 against the declared values,
+    then copies it (server-side, and only if the content is not stored yet)
+    to its content-addressed key. The copy is conditional on the checksummed
+    version, so a client replacing the staged object after the check cannot
+    get unverified bytes stored under the hash.
+
+    Args:
+        user_id (str): Owner's user ID
+        upload_id (str): ID returned by start_direct_upload()
+
+    Returns:
+        tuple: (success, message, asset JSON)
+    """
+    if not is_valid_object_id(user_id) or not is_valid_object_id(upload_id):
+        return False, "Upload not found", None
+
+    db = get_db()
+    backend = get_backend()
+    upload = db.asset_uploads.find_one({'_id': ObjectId(upload_id), 'user_id': ObjectId(user_id)})
+    if not upload:
+        return False, "Upload not found", None
+
+    key, content_hash = upload['key'], upload['content_hash']
+    size = backend.size(key)
+    if size is None:
+        return False, "File has not been uploaded yet", None
+
+    checksum, etag = backend.sha256(key) if size == upload['size'] else (None, None)
+    if checksum != content_hash:
+        db.asset_uploads.delete_one({'_id': upload['_id']})
+        return _reject_direct_upload(user_id, upload_id, key, content_hash)
+
+    # Claim the upload so a repeated completion cannot record it twice
+    if not db.asset_uploads.find_one_and_delete({'_id': upload['_id']}):
+        return False, "Upload already completed", None
+
+    if not _add_blob_reference(content_hash, upload['size'], upload['mime_type']):
+        try:
+            backend.copy(key, blob_key(content_hash), upload['mime_type'], public=True, if_match=etag)
+        except SourceChanged:
+            release_blob(content_hash)
+            return _reject_direct_upload(user_id, upload_id, key, content_hash)
+        except Exception:
+            release_blob(content_hash)
+            raise
+        _mark_blob_stored(content_hash)
+    backend.delete(key)
+
+    asset = _record_asset(
+        user_id, upload['filename'], upload['asset_type'], upload['name'],
+        content_hash, upload['size'], upload['mime_type']
+    )
+    log_event('storage.asset_uploaded', {
+        'asset_type': upload['asset_type'],
+        'size': upload['size'],
+        'content_hash': content_hash,
+        'direct': True
+    }, user_id)
+    return True, "Asset stored", asset.to_json()
+
+def serve_object(key):
+    """
+    Serve a stored blob to a client (see StorageBackend.serve)
+
+    Args:
+        key (str): Blob key from an asset's path
+
+    Returns:
+        Response: Flask response, or None if the key is not a stored blob
+    """
+    if not key.startswith(BLOB_KEY_PREFIX):
+        return None
+    content_hash = key.rsplit('/', 1)[-1]
+    if key != blob_key(content_hash):
+        return None
+
+    mime_type = _blob_types.get(content_hash)
+    if mime_type is None:
+        blob = get_db().asset_blobs.find_one({'_id': content_hash, 'stored': True}, {'mime_type': 1})
+        if not blob:
+            return None
+        mime_type = blob.get('mime_type') or 'application/octet-stream'
+        if not mime_type.startswith(tuple(ASSET_CONTENT_TYPES.values())) or mime_type in BLOCKED_CONTENT_TYPES:
+            # Stored before uploads were restricted to these types: never render it
+            mime_type = 'application/octet-stream'
+        _blob_types.set(content_hash, mime_type)
+
+    # The key is the content hash, so it is also a strong ETag
+    return get_backend().serve(key, mime_type, etag=content_hash)
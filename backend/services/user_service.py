@@ -1,13 +1,20 @@
 from services.db_service import get_db
 from bson.objectid import ObjectId
-import bcrypt
 from datetime import datetime
 from models.user import User
 from utils.validators import is_valid_email, is_valid_username
 from utils.logging_utils import log_exception, log_event
+from services.identity_service import invalidate_user
+from services.write_buffer_service import buffer_update
+from services.password_service import hash_password, check_password, PasswordHasherBusy
 
 def authenticate_user(email, password):
-    """Authenticate a user by email and password"""
+    """
+    Authenticate a user by email and password
+    
+    Raises:
+        PasswordHasherBusy: If the password hashing pool is saturated
+    """
     db = get_db()
     
     try:
@@ -21,11 +28,13 @@ def authenticate_user(email, password):
         if not stored_password:
             return None
             
-        if bcrypt.checkpw(password.encode('utf-8'), stored_password):
-            # Update last login time
-            db.users.update_one(
+        if check_password(password, stored_password):
+            # Record the login off the request path (flushed in batches)
+            buffer_update(
+                'users',
                 {'_id': user_data['_id']},
-                {'$set': {'last_login': datetime.utcnow()}}
+                set_fields={'last_login': datetime.utcnow()},
+                inc_fields={'stats.login_count': 1}
             )
             
             # Log successful login
@@ -38,6 +47,8 @@ def authenticate_user(email, password):
             # Log failed login attempt
             log_event('user.authentication_failed', {'email': email}, level='warning')
             return None
+    except PasswordHasherBusy:
+        raise
     except Exception as e:
         log_exception(e, {'email': email})
         return None
@@ -59,7 +70,12 @@ def get_user_by_id(user_id):
         return None
 
 def create_user(username, email, password, role='user'):
-    """Create a new user"""
+    """
+    Create a new user
+    
+    Raises:
+        PasswordHasherBusy: If the password hashing pool is saturated
+    """
     db = get_db()
     
     # Validate inputs
@@ -78,7 +94,7 @@ def create_user(username, email, password, role='user'):
     
     try:
         # Hash the password
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        hashed_password = hash_password(password)
         
         # Create user model instance
         user = User(
@@ -94,6 +110,29 @@ def create_user(username, email, password, role='user'):
         
         log_event('user.created', {'user_id': user_id, 'username': username})
         return True, "User created successfully", user_id
+    except PasswordHasherBusy:
+        raise
     except Exception as e:
         log_exception(e, {'username': username, 'email': email})
-        return False, f"User creation failed: {str(e)}", None
\ No newline at end of file
+        return False, f"User creation failed: {str(e)}", None
+
+def update_user_role(user_id, role):
+    """Change a user's role"""
+    db = get_db()
+    
+    if role not in ('user', 'admin'):
+        return False, "Invalid role"
+    
+    try:
+        result = db.users.update_one({'_id': ObjectId(user_id)}, {'$set': {'role': role}})
+        if result.matched_count == 0:
+            return False, "User not found"
+        
+        # Cached roles would otherwise keep the old privileges until they expire
+        invalidate_user(user_id=user_id)
+        
+        log_event('user.role_changed', {'user_id': str(user_id), 'role': role})
+        return True, "Role updated successfully"
+    except Exception as e:
+        log_exception(e, {'user_id': user_id, 'role': role})
+        return False, f"Role update failed: {str(e)}"
@@ -0,0 +1,130 @@
+"""
+Write-behind buffer for non-critical updates.
+
+Some writes only record bookkeeping nobody waits for: a user's last login
+time, counters. Instead of a round trip on the request path, they are
+buffered in process and merged per target document: $set keeps the latest
+value, $inc sums and $max keeps the largest. A background thread flushes the
+buffer every FLUSH_INTERVAL_SECONDS (or sooner when it grows past
+MAX_BUFFERED_DOCUMENTS) with one unordered bulk_write per collection, so
+thousands of such writes become a few per second.
+
+Buffered updates are lost if the process dies before a flush. Only use this
+for data that can be lost or recomputed (fix_stats rebuilds user stats from
+sessions).
+"""
+
+import atexit
+import threading
+import time
+from pymongo import UpdateOne
+from services.db_service import get_db
+from utils.logging_utils import log_event, log_exception
+
+FLUSH_INTERVAL_SECONDS = 1.0
+# Buffered documents that trigger an early flush
+MAX_BUFFERED_DOCUMENTS = 5000
+
+_lock = threading.Lock()
+_pending = {}   # (collection, match items) -> {'$set': {}, '$inc': {}, '$max': {}}
+_flush_requested = threading.Event()
+_flush_thread = None
+_metrics = {'buffered_updates': 0, 'flushes': 0, 'documents_written': 0, 'failed_flushes': 0, 'last_flush_seconds': None}
+
+def buffer_update(collection, match, set_fields=None, inc_fields=None, max_fields=None):
+    """
+    Queue an update to be written on the next flush
+
+    Args:
+        collection (str): Collection name
+        match (dict): Equality filter identifying one document, e.g. {'_id': user_id}
+        set_fields (dict): Fields to $set (the latest buffered value wins)
+        inc_fields (dict): Fields to $inc (buffered amounts are summed)
+        max_fields (dict): Fields to $max (the largest buffered value wins)
+    """
+    key = (collection, tuple(sorted(match.items())))
+
+    with _lock:
+        update = _pending.setdefault(key, {'$set': {}, '$inc': {}, '$max': {}})
+        if set_fields:
+            update['$set'].update(set_fields)
+        for field, amount in (inc_fields or {}).items():
+            update['$inc'][field] = update['$inc'].get(field, 0) + amount
+        for field, value in (max_fields or {}).items():
+            current = update['$max'].get(field)
+            update['$max'][field] = value if current is None or value > current else current
+        _metrics['buffered_updates'] += 1
+        buffered = len(_pending)
+        _ensure_flush_thread()
+
+    if buffered >= MAX_BUFFERED_DOCUMENTS:
+        _flush_requested.set()
+
+def flush():
+    """
+    Write every buffered update now
+
+    Returns:
+        int: Number of documents updated
+    """
+    global _pending
+
+    with _lock:
+        pending, _pending = _pending, {}
+    if not pending:
+        return 0
+
+    started = time.monotonic()
+    operations = {}
+    for (collection, match_items), update in pending.items():
+        update = {operator: fields for operator, fields in update.items() if fields}
+        operations.setdefault(collection, []).append(UpdateOne(dict(match_items), update))
+
+    db = get_db()
+    written = 0
+    for collection, batch in operations.items():
+        try:
+            result = db[collection].bulk_write(batch, ordered=False)
+            written += result.modified_count
+        except Exception as e:
+            # Non-critical by contract: report and drop rather than grow the buffer without bound
+            with _lock:
+                _metrics['failed_flushes'] += 1
+            log_exception(e, {'collection': collection, 'documents': len(batch)})
+
+    with _lock:
+        _metrics['flushes'] += 1
+        _metrics['documents_written'] += written
+        _metrics['last_flush_seconds'] = round(time.monotonic() - started, 4)
+
+    log_event('write_buffer.flushed', {'documents': len(pending), 'written': written}, level='debug')
+    return written
+
+def _flush_loop():
+    while True:
+        _flush_requested.wait(FLUSH_INTERVAL_SECONDS)
+        _flush_requested.clear()
+        try:
+            flush()
+        except Exception as e:
+            log_exception(e, {'component': 'write_buffer'})
+
+def _ensure_flush_thread():
+    """Start the flush thread once per process (caller holds the lock)"""
+    global _flush_thread
+
+    if _flush_thread is None:
+        _flush_thread = threading.Thread(target=_flush_loop, name='write-buffer-flush', daemon=True)
+        _flush_thread.start()
+        # Write what is left when the process exits normally
+        atexit.register(flush)
+
+def get_buffer_metrics():
+    """
+    Get write buffer metrics
+
+    Returns:
+        dict: Documents waiting, updates buffered, flushes and documents written
+    """
+    with _lock:
+        return {**_metrics, 'pending_documents': len(_pending)}
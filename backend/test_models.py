@@ -0,0 +1,89 @@
+from datetime import datetime
+from bson import ObjectId
+from models import Asset, Contest, Problem, Submission, User
+
+NOW = datetime(2025, 6, 1, 12, 30)
+ISO = '2025-06-01T12:30:00'
+
+def test_user_converters():
+    doc = {'_id': ObjectId(), 'username': 'alice', 'email': 'a@example.com', 'password': 'hash', 'created_at': NOW}
+
+    user = User.from_dict(doc)
+
+    assert user.role == 'user'
+    assert user.to_dict() == {
+        '_id': doc['_id'], 'username': 'alice', 'email': 'a@example.com', 'role': 'user',
+        'created_at': NOW, 'last_login': None
+    }
+    assert user.to_dict(include_password=True)['password'] == 'hash'
+    assert user.to_json() == {
+        '_id': str(doc['_id']), 'username': 'alice', 'email': 'a@example.com', 'role': 'user',
+        'created_at': ISO, 'last_login': None
+    }
+
+def test_asset_converters():
+    doc = {
+        '_id': ObjectId(), 'filename': 'a.png', 'asset_type': 'image', 'path': 'blobs/a', 'url': '/a',
+        'user_id': ObjectId(), 'size': 3, 'content_hash': 'abc', 'created_at': NOW
+    }
+
+    asset = Asset.from_dict(doc)
+
+    assert asset.to_dict() == {**doc, 'metadata': {}}
+    assert asset.to_json() == {
+        **doc, '_id': str(doc['_id']), 'user_id': str(doc['user_id']), 'metadata': {}, 'created_at': ISO
+    }
+
+def test_contest_converters():
+    problems = [ObjectId(), ObjectId()]
+    doc = {
+        '_id': ObjectId(), 'title': 'AMC 10A', 'description': 'Practice', 'start_time': NOW, 'end_time': NOW,
+        'problems': problems, 'created_by': None, 'published': True, 'registration_end': None,
+        'created_at': NOW, 'updated_at': NOW
+    }
+
+    contest = Contest.from_dict(doc)
+
+    assert contest.to_dict() == doc
+    assert contest.to_json() == {
+        **doc, '_id': str(doc['_id']), 'problems': [str(p) for p in problems], 'start_time': ISO,
+        'end_time': ISO, 'created_at': ISO, 'updated_at': ISO
+    }
+
+def test_submission_converters():
+    doc = {
+        '_id': ObjectId(), 'user_id': ObjectId(), 'problem_id': ObjectId(), 'solution': 'D',
+        'contest_id': None, 'submitted_at': NOW
+    }
+
+    submission = Submission.from_dict(doc)
+
+    assert submission.to_dict() == {**doc, 'status': 'pending', 'results': {}, 'execution_time': None}
+    assert submission.to_json() == {
+        **doc, '_id': str(doc['_id']), 'user_id': str(doc['user_id']), 'problem_id': str(doc['problem_id']),
+        'status': 'pending', 'results': {}, 'submitted_at': ISO, 'execution_time': None
+    }
+
+def test_problem_converters_map_stored_keys():
+    doc = {
+        '_id': ObjectId(), 'title': 'Problem 1', 'problem_statement': 'Find x.', 'difficulty': 'easy',
+        'year': 2022, 'contest': 'AMC 10A', 'problem_number': 1, 'detailed_solution': 'x = 2',
+        'similar_questions': [{'difficulty': 'easy', 'question': 'Find y.', 'detailed_solution': 'y = 3', 'extra': 1}],
+        'created_at': NOW, 'updated_at': NOW
+    }
+    expected = {
+        '_id': str(doc['_id']), 'title': 'Problem 1', 'description': 'Find x.', 'difficulty': 'easy',
+        'year': 2022, 'contest': 'AMC 10A', 'problem_number': 1, 'content': {}, 'test_cases': [],
+        'similar_questions': [{'difficulty': 'easy', 'question': 'Find y.', 'detailed_solution': 'y = 3'}],
+        'created_by': None, 'published': False, 'created_at': ISO, 'updated_at': ISO
+    }
+
+    problem = Problem.from_dict(doc)
+
+    assert problem.to_dict() == expected
+    assert problem.to_dict(include_solution=True) == {**expected, 'solution': 'x = 2'}
+    assert problem.to_json() == expected
+
+def test_from_dict_of_none():
+    for model in (User, Asset, Contest, Submission, Problem):
+        assert model.from_dict(None) is None
@@ -0,0 +1,32 @@
+from datetime import datetime
+from bson import ObjectId
+from utils.pagination_utils import encode_cursor, decode_cursor, keyset_filter
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 6, 1, 12, 30)
+    object_id = ObjectId()
+
+    token = encode_cursor(created_at, object_id)
+
+    assert decode_cursor(token) == (created_at, object_id)
+
+def test_cursor_without_sort_value():
+    object_id = ObjectId()
+
+    assert decode_cursor(encode_cursor(None, object_id)) == (None, object_id)
+
+def test_invalid_cursor():
+    assert decode_cursor('not-a-cursor') is None
+    assert decode_cursor('') is None
+
+def test_keyset_filter_includes_documents_missing_sort_field():
+    created_at = datetime(2025, 6, 1)
+    object_id = ObjectId()
+
+    query = keyset_filter('created_at', created_at, object_id)
+
+    assert {'created_at': None} in query['$or']
+    assert keyset_filter('created_at', None, object_id) == {
+        'created_at': None,
+        '_id': {'$lt': object_id}
+    }
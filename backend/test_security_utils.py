@@ -0,0 +1,25 @@
+from utils.security_utils import sign_payload, verify_signed_payload
+
+SECRET = 'test-secret'
+
+def test_signed_payload_round_trip():
+    payload = {'s': 12345, 'c': 'AMC 10A', 'y': '2022', 'x': True, 'i': 3}
+
+    token = sign_payload(payload, SECRET)
+
+    assert verify_signed_payload(token, SECRET) == payload
+
+def test_tampered_payload_is_rejected():
+    token = sign_payload({'i': 3}, SECRET)
+    forged = sign_payload({'i': 20}, SECRET).split('.')[0] + '.' + token.split('.')[1]
+
+    assert verify_signed_payload(forged, SECRET) is None
+
+def test_wrong_secret_is_rejected():
+    token = sign_payload({'i': 3}, SECRET)
+
+    assert verify_signed_payload(token, 'other-secret') is None
+
+def test_malformed_token_is_rejected():
+    assert verify_signed_payload('garbage', SECRET) is None
+    assert verify_signed_payload(None, SECRET) is None
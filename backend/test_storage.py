@@ -0,0 +1,307 @@
+import io
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from botocore.stub import Stubber
+from flask import Flask
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from services import storage_service
+from services.storage_backends import LocalBackend, S3Backend, SourceChanged
+
+class FakeCollection:
+    """Just enough of a pymongo collection for the asset_blobs queries"""
+
+    def __init__(self):
+        self.docs = {}
+
+    def _matches(self, doc, query):
+        for field, condition in query.items():
+            if field == '$or':
+                if not any(self._matches(doc, q) for q in condition):
+                    return False
+                continue
+            value = doc.get(field)
+            if not isinstance(condition, dict):
+                if value != condition:
+                    return False
+                continue
+            for op, arg in condition.items():
+                if op == '$ne' and value == arg:
+                    return False
+                if op == '$exists' and (field in doc) != arg:
+                    return False
+                if op == '$gt' and not (value is not None and value > arg):
+                    return False
+                if op == '$lte' and not (value is not None and value <= arg):
+                    return False
+        return True
+
+    def _apply(self, doc, update, inserting=False):
+        for field, value in update.get('$set', {}).items():
+            doc[field] = value
+        for field, value in update.get('$inc', {}).items():
+            doc[field] = doc.get(field, 0) + value
+        for field in update.get('$unset', {}):
+            doc.pop(field, None)
+        if inserting:
+            doc.update(update.get('$setOnInsert', {}))
+
+    def find(self, query, projection=None):
+        return [dict(doc) for doc in self.docs.values() if self._matches(doc, query)]
+
+    def insert_one(self, doc):
+        self.docs[doc['_id']] = dict(doc)
+
+    def find_one(self, query, projection=None):
+        found = self.find(query)
+        return found[0] if found else None
+
+    def find_one_and_update(self, query, update, upsert=False, return_document=False):
+        for doc in self.docs.values():
+            if self._matches(doc, query):
+                before = dict(doc)
+                self._apply(doc, update)
+                return dict(doc) if return_document else before
+        if upsert:
+            if query['_id'] in self.docs:
+                raise DuplicateKeyError('duplicate _id')
+            doc = {'_id': query['_id']}
+            self._apply(doc, update, inserting=True)
+            self.docs[doc['_id']] = doc
+        return None
+
+    def update_one(self, query, update):
+        self.find_one_and_update(query, update)
+
+    def delete_one(self, query):
+        for doc in self.find(query):
+            del self.docs[doc['_id']]
+            return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+class FakeDB:
+    def __init__(self):
+        self.asset_blobs = FakeCollection()
+        self.assets = FakeCollection()
+        self.asset_uploads = FakeCollection()
+
+class FakeBackend:
+    def __init__(self):
+        self.objects = {}
+
+    def put(self, key, fileobj, content_type, public=True):
+        self.objects[key] = fileobj.read()
+
+    def delete(self, key):
+        self.objects.pop(key, None)
+
+    def url(self, key):
+        return f'/files/{key}'
+
+    def presigned_upload(self, key, content_type, size, expires_in):
+        return {'url': 'https://storage.example.com', 'fields': {'key': key}}
+
+@pytest.fixture
+def storage(monkeypatch):
+    db = FakeDB()
+    backend = FakeBackend()
+    monkeypatch.setattr(storage_service, 'get_db', lambda: db)
+    monkeypatch.setattr(storage_service, 'get_backend', lambda: backend)
+    return db, backend
+
+def reference(data):
+    spool, content_hash, size = storage_service._spool(io.BytesIO(data))
+    with spool:
+        storage_service._reference_blob(content_hash, spool, size, 'image/png')
+    return content_hash
+
+def test_same_content_is_stored_once(storage):
+    db, backend = storage
+
+    first = reference(b'pixels')
+    second = reference(b'pixels')
+
+    assert first == second
+    assert list(backend.objects) == [storage_service.blob_key(first)]
+    assert db.asset_blobs.docs[first]['ref_count'] == 2
+
+def test_release_stamps_unreferenced_blob(storage):
+    db, _ = storage
+    content_hash = reference(b'pixels')
+    reference(b'pixels')
+
+    assert storage_service.release_blob(content_hash) == 1
+    assert storage_service.release_blob(content_hash) == 0
+    assert 'released_at' in db.asset_blobs.docs[content_hash]
+    assert storage_service.release_blob(content_hash) is None
+
+    reference(b'pixels')
+    assert 'released_at' not in db.asset_blobs.docs[content_hash]
+
+def test_collect_deletes_only_expired_unreferenced_blobs(storage):
+    db, backend = storage
+    kept = reference(b'kept')
+    recent = reference(b'recent')
+    expired = reference(b'expired')
+    storage_service.release_blob(recent)
+    storage_service.release_blob(expired)
+    db.asset_blobs.docs[expired]['released_at'] = datetime.utcnow() - timedelta(days=2)
+
+    assert storage_service.collect_unreferenced_blobs() == 1
+
+    assert set(db.asset_blobs.docs) == {kept, recent}
+    assert storage_service.blob_key(expired) not in backend.objects
+
+def test_blob_being_deleted_cannot_gain_references(storage, monkeypatch):
+    db, _ = storage
+    content_hash = reference(b'pixels')
+    db.asset_blobs.docs[content_hash].update(ref_count=0, deleting_at=datetime.utcnow())
+    monkeypatch.setattr(storage_service, 'BLOB_DELETE_WAIT_ATTEMPTS', 2)
+    monkeypatch.setattr(storage_service, 'BLOB_DELETE_WAIT_SECONDS', 0)
+
+    with pytest.raises(RuntimeError):
+        reference(b'pixels')
+    assert db.asset_blobs.docs[content_hash]['ref_count'] == 0
+
+@pytest.fixture
+def local_backend(tmp_path):
+    return LocalBackend(SimpleNamespace(LOCAL_STORAGE_ROOT=str(tmp_path), LOCAL_STORAGE_URL_PREFIX='/api/assets/files'))
+
+def test_local_copy_refuses_replaced_source(local_backend):
+    local_backend.put('uploads/a', io.BytesIO(b'checked'), 'image/png')
+    _, etag = local_backend.sha256('uploads/a')
+    local_backend.put('uploads/a', io.BytesIO(b'swapped'), 'image/png')
+
+    with pytest.raises(SourceChanged):
+        local_backend.copy('uploads/a', 'blobs/b', 'image/png', if_match=etag)
+    assert local_backend.size('blobs/b') is None
+
+def test_local_copy_of_checksummed_source(local_backend):
+    local_backend.put('uploads/a', io.BytesIO(b'checked'), 'image/png')
+    checksum, etag = local_backend.sha256('uploads/a')
+
+    local_backend.copy('uploads/a', 'blobs/b', 'image/png', if_match=etag)
+
+    assert local_backend.sha256('blobs/b')[0] == checksum
+
+def test_s3_copy_refuses_replaced_source():
+    backend = S3Backend(SimpleNamespace(
+        S3_BUCKET_NAME='assets', S3_ENDPOINT_URL=None, S3_MULTIPART_THRESHOLD_MB=8,
+        S3_MULTIPART_CHUNKSIZE_MB=8, S3_MAX_POOL_CONNECTIONS=10, AWS_ACCESS_KEY_ID='key',
+        AWS_SECRET_ACCESS_KEY='secret', AWS_REGION='us-east-1'
+    ))
+    with Stubber(backend.client) as stub:
+        stub.add_client_error(
+            'copy_object', service_error_code='PreconditionFailed', http_status_code=412,
+            expected_params={
+                'Bucket': 'assets', 'Key': 'blobs/b', 'CopySource': {'Bucket': 'assets', 'Key': 'uploads/a'},
+                'ACL': 'public-read', 'MetadataDirective': 'REPLACE', 'ContentType': 'image/png',
+                'CopySourceIfMatch': '"etag"'
+            }
+        )
+        with pytest.raises(SourceChanged):
+            backend.copy('uploads/a', 'blobs/b', 'image/png', if_match='"etag"')
+
+def test_blob_keys_are_sharded_by_hash_prefix():
+    content_hash = 'abcd' + '0' * 60
+
+    assert storage_service.blob_key(content_hash) == f'blobs/sha256/ab/cd/{content_hash}'
+
+def test_local_path_rejects_keys_outside_root(local_backend):
+    assert local_backend.path('blobs/a').startswith(local_backend.root + os.sep)
+    for key in ('../outside', 'blobs/../../outside', '/etc/passwd', '', '.'):
+        with pytest.raises(ValueError):
+            local_backend.path(key)
+
+def test_local_put_is_atomic(local_backend):
+    local_backend.put('blobs/a', io.BytesIO(b'complete'), 'image/png')
+
+    class Broken(io.BytesIO):
+        def read(self, *args):
+            if self.tell():
+                raise OSError('connection reset')
+            return super().read(1)
+
+    with pytest.raises(OSError):
+        local_backend.put('blobs/a', Broken(b'partial'), 'image/png')
+
+    with open(local_backend.path('blobs/a'), 'rb') as f:
+        assert f.read() == b'complete'
+    assert os.listdir(os.path.dirname(local_backend.path('blobs/a'))) == ['a']
+
+@pytest.fixture
+def serving(local_backend):
+    app = Flask(__name__)
+
+    @app.route('/files/<path:key>')
+    def serve(key):
+        return local_backend.serve(key, 'audio/mpeg', etag='hash')
+
+    local_backend.put('blobs/a', io.BytesIO(b'0123456789'), 'audio/mpeg')
+    return app.test_client()
+
+def test_serve_caches_and_hardens_files(serving):
+    response = serving.get('/files/blobs/a')
+
+    assert response.data == b'0123456789'
+    assert response.cache_control.immutable
+    assert response.cache_control.max_age == 365 * 24 * 3600
+    assert response.headers['X-Content-Type-Options'] == 'nosniff'
+    assert response.headers['Content-Security-Policy'] == 'sandbox'
+
+def test_serve_answers_range_and_conditional_requests(serving):
+    partial = serving.get('/files/blobs/a', headers={'Range': 'bytes=2-5'})
+    assert partial.status_code == 206
+    assert partial.data == b'2345'
+
+    assert serving.get('/files/blobs/a', headers={'If-None-Match': '"hash"'}).status_code == 304
+    assert serving.get('/files/blobs/missing').status_code == 404
+
+def upload(data, filename, asset_type='image', user_id=None):
+    file = SimpleNamespace(filename=filename, stream=io.BytesIO(data))
+    return storage_service.upload_asset(user_id or str(ObjectId()), file, asset_type, 'correct')
+
+def test_upload_rejects_types_browsers_render(storage):
+    _, backend = storage
+
+    for filename, asset_type in (('x.html', 'image'), ('x.svg', 'image'), ('x.png', 'sound')):
+        success, message, _ = upload(b'<script>', filename, asset_type)
+        assert not success
+        assert 'cannot be used' in message
+    assert backend.objects == {}
+
+def test_upload_enforces_size_limit(storage, monkeypatch):
+    _, backend = storage
+    monkeypatch.setattr(storage_service, '_upload_limits', lambda: (4, 600))
+
+    assert upload(b'12345', 'x.png') == (False, "File must be at most 4 bytes", None)
+    assert backend.objects == {}
+
+def start_upload(user_id, data):
+    content_hash = storage_service.hashlib.sha256(data).hexdigest()
+    return storage_service.start_direct_upload(user_id, 'x.png', 'image', 'correct', len(data), content_hash)
+
+def test_direct_upload_reuses_only_content_the_user_uploaded(storage, monkeypatch):
+    monkeypatch.setattr(storage_service, '_upload_limits', lambda: (1024, 600))
+    owner, other = str(ObjectId()), str(ObjectId())
+    assert upload(b'pixels', 'x.png', user_id=owner)[0]
+
+    success, _, data = start_upload(owner, b'pixels')
+    assert success and data['asset']['size'] == 6
+
+    # Knowing the hash is not enough: anyone else has to upload the bytes
+    success, _, data = start_upload(other, b'pixels')
+    assert success and 'upload_id' in data
+
+def test_direct_upload_rejects_size_not_matching_stored_content(storage, monkeypatch):
+    monkeypatch.setattr(storage_service, '_upload_limits', lambda: (1024, 600))
+    owner = str(ObjectId())
+    upload(b'pixels', 'x.png', user_id=owner)
+    content_hash = storage_service.hashlib.sha256(b'pixels').hexdigest()
+
+    success, message, _ = storage_service.start_direct_upload(owner, 'x.png', 'image', 'correct', 7, content_hash)
+
+    assert not success
+    assert 'size' in message
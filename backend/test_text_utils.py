@@ -0,0 +1,13 @@
+from utils.text_utils import tokenize, tokenize_contest_id
+
+def test_tokenize_latex():
+    tokens = tokenize(r"What is $3 + \frac{1}{x^2}$?")
+
+    assert tokens == ['3', 'frac', '1', 'x', '2']
+
+def test_tokenize_folds_plurals_and_drops_stopwords():
+    assert tokenize("The triangles and circles") == ['triangle', 'circle']
+
+def test_tokenize_contest_id():
+    assert tokenize_contest_id("AMC10A_2022") == ['amc10a', '2022', 'amc', '10a']
+    assert tokenize_contest_id(None) == []
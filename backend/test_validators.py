@@ -0,0 +1,21 @@
+from utils.validators import parse_field_list, fields_projection
+
+ALLOWED = ('title', 'difficulty', 'topics')
+
+def test_field_list_is_deduplicated_in_order():
+    fields, invalid = parse_field_list(' title,topics,,title ', ALLOWED)
+
+    assert fields == ['title', 'topics']
+    assert invalid == []
+    assert fields_projection(fields) == {'title': 1, 'topics': 1}
+
+def test_field_list_reports_names_outside_allowlist():
+    fields, invalid = parse_field_list('title,title.x,$where', ALLOWED)
+
+    assert fields == ['title', 'title.x', '$where']
+    assert invalid == ['title.x', '$where']
+
+def test_empty_field_list_projects_everything():
+    assert parse_field_list(None, ALLOWED) == (None, [])
+    assert parse_field_list(' , ', ALLOWED) == (None, [])
+    assert fields_projection(None) is None
@@ -2,4 +2,5 @@
 from utils.validators import *
 from utils.response_utils import *
 from utils.date_utils import *
-from utils.security_utils import *
\ No newline at end of file
+from utils.security_utils import *
+from utils.pagination_utils import *
@@ -28,6 +28,34 @@ def parse_iso(date_string):
     except ValueError:
         return None
 
+def to_utc_datetime(value):
+    """
+    Convert a stored date (datetime or ISO string) to a timezone-aware UTC datetime
+    
+    Naive datetimes are taken to be UTC, which is how MongoDB returns them.
+    
+    Returns:
+        datetime: Aware UTC datetime, or None if the value is empty or unparseable
+    """
+    if isinstance(value, str):
+        value = parse_iso(value.strip())
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=pytz.UTC)
+    return value.astimezone(pytz.UTC)
+
+def to_iso_utc(value):
+    """
+    Format a stored date as an ISO string with a UTC offset
+    
+    Used for dates read back from MongoDB (naive UTC datetimes), which jsonify
+    would otherwise render as RFC 822. Strings are passed through unchanged.
+    """
+    if isinstance(value, datetime):
+        return to_utc_datetime(value).isoformat()
+    return value
+
 def is_future_date(dt):
     """Check if date is in the future"""
     if not dt:
@@ -0,0 +1,67 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId, errors
+
+def encode_cursor(sort_value, object_id):
+    """
+    Encode a keyset position as an opaque continuation token
+
+    Args:
+        sort_value: Value of the sort field for the last item on the page
+        object_id: _id of the last item on the page (tie-breaker)
+
+    Returns:
+        str: URL-safe continuation token
+    """
+    if isinstance(sort_value, datetime):
+        position = {"d": sort_value.isoformat()}
+    else:
+        position = {"v": sort_value}
+    position["i"] = str(object_id)
+
+    raw = json.dumps(position, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(token):
+    """
+    Decode a continuation token produced by encode_cursor
+
+    Args:
+        token (str): Continuation token
+
+    Returns:
+        tuple: (sort_value, object_id), or None if the token is invalid
+    """
+    if not token:
+        return None
+
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+
+        if "d" in position:
+            sort_value = datetime.fromisoformat(position["d"])
+        else:
+            sort_value = position.get("v")
+
+        return sort_value, ObjectId(position["i"])
+    except (ValueError, KeyError, TypeError, errors.InvalidId):
+        return None
+
+def keyset_filter(field, sort_value, object_id):
+    """
+    Build the Mongo filter selecting items after a keyset position,
+    for a descending sort on (field, _id)
+
+    Documents without the sort field sort last in descending order,
+    so they always come after a position that has a value.
+    """
+    if sort_value is None:
+        return {field: None, '_id': {'$lt': object_id}}
+
+    return {'$or': [
+        {field: {'$lt': sort_value}},
+        {field: sort_value, '_id': {'$lt': object_id}},
+        {field: None}
+    ]}
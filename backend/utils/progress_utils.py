@@ -0,0 +1,83 @@
+def aggregate_performance(sessions):
+    """
+    Aggregate topic, difficulty and overall performance across user sessions
+
+    Topic accuracy is weighted towards the overall accuracy for topics with
+    fewer than 10 attempts, so sparse topics don't swing to 0% or 100%.
+
+    Args:
+        sessions (list): Session documents with score, total_attempted and
+            optionally topic_performance / difficulty_performance
+
+    Returns:
+        dict: topics, difficulties, total_problems, total_correct and total_score
+    """
+    total_problems = 0
+    total_correct = 0
+    total_score = 0
+
+    all_topics = {}
+    all_difficulties = {}
+
+    for session in sessions:
+        # Aggregate topic performance
+        session_topics = session.get("topic_performance", {})
+        for topic, data in session_topics.items():
+            if topic not in all_topics:
+                all_topics[topic] = {"attempted": 0, "correct": 0}
+
+            all_topics[topic]["attempted"] += data.get("attempted", 0)
+            all_topics[topic]["correct"] += data.get("correct", 0)
+
+        # Aggregate difficulty performance
+        session_difficulties = session.get("difficulty_performance", {})
+        for difficulty, data in session_difficulties.items():
+            if difficulty not in all_difficulties:
+                all_difficulties[difficulty] = {"attempted": 0, "correct": 0}
+
+            all_difficulties[difficulty]["attempted"] += data.get("attempted", 0)
+            all_difficulties[difficulty]["correct"] += data.get("correct", 0)
+
+        # Aggregate overall metrics
+        total_problems += session.get("total_attempted", 0)
+        total_correct += session.get("score", 0)
+        total_score += session.get("score", 0)
+
+    overall_accuracy = (total_correct / total_problems * 100) if total_problems > 0 else 0
+
+    # Calculate accuracy for topics with improved weighting
+    for topic, data in all_topics.items():
+        if data["attempted"] > 0:
+            # Base calculation
+            raw_accuracy = (data["correct"] / data["attempted"]) * 100
+
+            # Apply weight adjustment for topics with few attempts
+            # This helps align with overall accuracy by giving more confidence to topics with more attempts
+            attempt_weight = min(1.0, data["attempted"] / 10)  # Full weight at 10+ attempts
+
+            # Calculate weighted accuracy that's closer to overall accuracy
+            # For topics with very few attempts, this will pull values closer to the overall accuracy
+            data["accuracy"] = (raw_accuracy * attempt_weight) + (overall_accuracy * (1 - attempt_weight))
+
+            # Ensure we log both values for diagnostic purposes
+            data["raw_accuracy"] = raw_accuracy
+            data["weighted_factor"] = attempt_weight
+        else:
+            data["accuracy"] = 0
+            data["raw_accuracy"] = 0
+            data["weighted_factor"] = 0
+
+    # Calculate accuracy for difficulties
+    for difficulty, data in all_difficulties.items():
+        if data["attempted"] > 0:
+            data["accuracy"] = (data["correct"] / data["attempted"]) * 100
+        else:
+            data["accuracy"] = 0
+
+    return {
+        "topics": all_topics,
+        "difficulties": all_difficulties,
+        "total_problems": total_problems,
+        "total_correct": total_correct,
+        "total_score": total_score
+    }
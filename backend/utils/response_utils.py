@@ -1,4 +1,4 @@
-from flask import jsonify
+from flask import jsonify, Response
 
 def success_response(data=None, message=None, status_code=200):
     """
@@ -44,6 +44,34 @@ def error_response(message, status_code=400, errors=None):
         
     return jsonify(response), status_code
 
+def unavailable_response(message, retry_after):
+    """
+    Create a 503 error response telling the client when to retry
+    
+    Args:
+        message (str): Error message
+        retry_after (int): Seconds the client should wait before retrying
+        
+    Returns:
+        Response: Flask response object
+    """
+    response, status_code = error_response(message, 503)
+    response.headers['Retry-After'] = str(retry_after)
+    return response, status_code
+
+def raw_json_response(body, status_code=200):
+    """
+    Create a response from already-serialized JSON bytes
+    
+    Args:
+        body (bytes): Encoded JSON document
+        status_code (int): HTTP status code
+        
+    Returns:
+        Response: Flask response object
+    """
+    return Response(body, status=status_code, mimetype='application/json')
+
 def paginated_response(items, page, total_items, items_per_page):
     """
     Create a paginated response
@@ -69,4 +97,32 @@ def paginated_response(items, page, total_items, items_per_page):
             "has_next": page < total_pages,
             "has_prev": page > 1
         }
+    }
+
+def cursor_paginated_response(items, next_cursor, items_per_page, total_items=None):
+    """
+    Create a cursor (keyset) paginated response
+
+    Args:
+        items (list): List of items for current page
+        next_cursor (str): Continuation token for the next page, None on the last page
+        items_per_page (int): Number of items per page
+        total_items (int): Estimated or cached total, if requested (optional)
+
+    Returns:
+        dict: Paginated response dictionary
+    """
+    pagination = {
+        "next_cursor": next_cursor,
+        "items_per_page": items_per_page,
+        "has_next": next_cursor is not None
+    }
+
+    if total_items is not None:
+        pagination["total_items"] = total_items
+        pagination["total_is_estimate"] = True
+
+    return {
+        "items": items,
+        "pagination": pagination
     }
\ No newline at end of file
@@ -2,6 +2,10 @@ import secrets
 import string
 import re
 import html
+import hmac
+import hashlib
+import base64
+import json
 
 def generate_secure_token(length=32):
     """Generate a cryptographically secure random token"""
@@ -62,4 +66,47 @@ def obfuscate_email(email):
     else:
         obfuscated_username = username[0] + '*' * (len(username) - 2) + username[-1]
         
-    return f"{obfuscated_username}@{domain}"
\ No newline at end of file
+    return f"{obfuscated_username}@{domain}"
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode((text + '=' * (-len(text) % 4)).encode('ascii'))
+
+def sign_payload(payload, secret):
+    """
+    Serialize a small JSON payload into an HMAC-SHA256 signed token
+
+    Args:
+        payload (dict): JSON-serializable data
+        secret (str|bytes): Signing key
+
+    Returns:
+        str: Token of the form <payload>.<signature>
+    """
+    if isinstance(secret, str):
+        secret = secret.encode('utf-8')
+
+    body = _b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+    signature = hmac.new(secret, body.encode('ascii'), hashlib.sha256).digest()
+    return f"{body}.{_b64encode(signature)}"
+
+def verify_signed_payload(token, secret):
+    """
+    Verify a token produced by sign_payload
+
+    Returns:
+        dict: The payload, or None if the token is malformed or the signature is wrong
+    """
+    if isinstance(secret, str):
+        secret = secret.encode('utf-8')
+
+    try:
+        body, signature = token.split('.', 1)
+        expected = hmac.new(secret, body.encode('ascii'), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            return None
+        return json.loads(_b64decode(body))
+    except (ValueError, AttributeError, UnicodeError):
+        return None
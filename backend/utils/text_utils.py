@@ -0,0 +1,48 @@
+import re
+
+# Common English words that carry no meaning for problem search
+STOPWORDS = frozenset("""
+a an and are as at be by for from has if in is it its of on or that the then
+there these this to was what which with how many much find let
+""".split())
+
+_LATEX_COMMAND = re.compile(r'\\([a-zA-Z]+)')
+_TOKEN = re.compile(r'[a-z0-9]+')
+_CONTEST_PART = re.compile(r'[a-z]+|\d+[a-z]?')
+
+def normalize_latex(text):
+    """
+    Turn LaTeX markup into plain words: `\\frac{1}{3}` becomes "frac 1 3",
+    `$x^2$` becomes "x 2". Math delimiters, braces and operators are dropped.
+    """
+    if not text:
+        return ''
+    text = _LATEX_COMMAND.sub(r' \1 ', text)
+    return re.sub(r'[${}^_\\]', ' ', text)
+
+def _stem(token):
+    # Light plural folding ("triangles" -> "triangle") without a stemming library
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss') and not token.isdigit():
+        return token[:-1]
+    return token
+
+def tokenize(text):
+    """
+    Tokenize problem text (LaTeX aware) into lowercase search terms
+
+    Returns:
+        list: Terms in document order (repeats kept for term frequency)
+    """
+    return [
+        _stem(token)
+        for token in _TOKEN.findall(normalize_latex(text).lower())
+        if token not in STOPWORDS
+    ]
+
+def tokenize_contest_id(contest_id):
+    """Tokenize a contest ID like "AMC10A_2022" into ["amc10a", "2022", "amc", "10a"]"""
+    if not contest_id:
+        return []
+    lowered = contest_id.lower()
+    tokens = _TOKEN.findall(lowered)
+    return tokens + [part for part in _CONTEST_PART.findall(lowered) if part not in tokens]
@@ -48,4 +48,41 @@ def validate_required_fields(data, required_fields):
         tuple: (is_valid, missing_fields)
     """
     missing = [field for field in required_fields if field not in data]
-    return (len(missing) == 0, missing)
\ No newline at end of file
+    return (len(missing) == 0, missing)
+
+def parse_field_list(value, allowed=None):
+    """
+    Parse a comma-separated `fields`/`include` query parameter
+    
+    Args:
+        value (str): Raw parameter value (e.g. "title,difficulty")
+        allowed (iterable): Accepted names (optional, any name if omitted)
+        
+    Returns:
+        tuple: (fields, invalid) - fields is None when the parameter is absent or empty
+    """
+    if not value:
+        return None, []
+        
+    fields = []
+    for name in value.split(','):
+        name = name.strip()
+        if name and name not in fields:
+            fields.append(name)
+            
+    if not fields:
+        return None, []
+        
+    invalid = [name for name in fields if allowed is not None and name not in allowed]
+    return fields, invalid
+
+def fields_projection(fields):
+    """
+    Build a Mongo projection for a parsed field list (None projects everything)
+
+    Pass only names checked against an allowlist (parse_field_list's allowed):
+    dotted paths that collide or $-prefixed names make Mongo reject the query.
+    """
+    if not fields:
+        return None
+    return {field: 1 for field in fields}